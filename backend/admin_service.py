@@ -1,14 +1,17 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, UploadFile
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import os
-import shutil
+import hashlib
+import tempfile
 from datetime import datetime
 import logging
 
 from backend.database import User, UserRole, Conversation
 from backend.auth import get_password_hash
-from backend.rag_engine import ClaudeRAG
+from backend.rag_engine import ClaudeRAG, SUPPORTED_EXTENSIONS
+from backend.index_manifest import IndexManifest, HASH_BLOCK_SIZE
+from backend.reindex_jobs import ReindexJobManager
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -101,7 +104,8 @@ def list_documents() -> List[Dict[str, Any]]:
         
     for filename in os.listdir(DOCS_DIR):
         filepath = os.path.join(DOCS_DIR, filename)
-        if os.path.isfile(filepath):
+        # Los temporales de subidas en curso empiezan por "."
+        if os.path.isfile(filepath) and not filename.startswith("."):
             stats = os.stat(filepath)
             files.append({
                 "filename": filename,
@@ -111,31 +115,86 @@ def list_documents() -> List[Dict[str, Any]]:
             })
     return files
 
-def upload_documents(files: List[UploadFile]) -> List[str]:
-    """Guardar archivos subidos."""
-    saved_files = []
-    valid_extensions = {'.pdf', '.docx', '.txt', '.md'}
-    
+def _stream_to_temp(file: UploadFile) -> Tuple[str, str]:
+    """
+    Copiar el archivo subido por bloques a un temporal del directorio de documentos
+    calculando su SHA-256. Devuelve (ruta temporal, hash).
+    """
+    digest = hashlib.sha256()
+    # Prefijo "." para que el vigilante de documentos y el indexado lo ignoren
+    fd, tmp_path = tempfile.mkstemp(dir=DOCS_DIR, prefix=".upload-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            for block in iter(lambda: file.file.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+                buffer.write(block)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
+def upload_documents(
+    files: List[UploadFile],
+    manifest: IndexManifest,
+    jobs: Optional[ReindexJobManager] = None
+) -> Dict[str, List[str]]:
+    """
+    Guardar archivos subidos.
+
+    Cada archivo se escribe en un temporal y se mueve a su destino de forma atómica.
+    Los archivos cuyo contenido (SHA-256) ya está indexado, repetido en la misma
+    subida o pendiente de indexar en la cola de `jobs` (subido antes con otro nombre),
+    se descartan para no volver a calcular sus embeddings. Los guardados quedan
+    reservados en `jobs` hasta que termine su indexado.
+
+    Returns:
+        Dict: "saved" (rutas absolutas a indexar) y "skipped" (nombres duplicados).
+    """
+    saved, skipped = [], []
+    seen_hashes = set()
+
     for file in files:
-        ext = os.path.splitext(file.filename)[1].lower()
-        if ext not in valid_extensions:
+        filename = os.path.basename(file.filename or "")
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS or filename.startswith("."):
             continue
-            
-        file_path = os.path.join(DOCS_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        saved_files.append(file.filename)
-        
-    return saved_files
 
-def delete_document(filename: str):
-    """Eliminar un archivo físico."""
+        file_path = os.path.abspath(os.path.join(DOCS_DIR, filename))
+        tmp_path, sha256 = _stream_to_temp(file)
+        try:
+            if (
+                sha256 in seen_hashes
+                or manifest.find_by_hash(sha256) is not None
+                or (jobs is not None and not jobs.claim_hash(sha256, file_path))
+            ):
+                logger.info(f"Skipping duplicate upload {filename}")
+                skipped.append(filename)
+                continue
+
+            try:
+                os.replace(tmp_path, file_path)
+            except Exception:
+                if jobs is not None:
+                    jobs.release_hash(sha256)
+                raise
+            seen_hashes.add(sha256)
+            saved.append(file_path)
+        finally:
+            # Duplicados y errores: el temporal no debe quedarse en el directorio de documentos
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return {"saved": saved, "skipped": skipped}
+
+def delete_document(filename: str, rag_engine: ClaudeRAG) -> Tuple[str, int]:
+    """Eliminar un archivo físico y sus vectores. Devuelve (ruta del archivo, chunks eliminados)."""
     # Validación básica de seguridad de path traversal
     safe_filename = os.path.basename(filename)
-    file_path = os.path.join(DOCS_DIR, safe_filename)
+    file_path = os.path.abspath(os.path.join(DOCS_DIR, safe_filename))
     
     if os.path.exists(file_path):
         os.remove(file_path)
-        return True
+        # Sin esto los chunks del archivo se seguirían recuperando hasta el próximo reindexado
+        return file_path, rag_engine.remove_file(file_path)
     else:
         raise HTTPException(status_code=404, detail="Archivo no encontrado")
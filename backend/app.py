@@ -5,6 +5,7 @@ import uvicorn
 import logging
 import sys
 import os
+import time
 
 # Add parent directory to path to allow imports from backend
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -28,7 +29,8 @@ from backend.schemas import (
     QueryResponse,
     DocumentInfo,
     DocumentUploadResponse,
-    ReindexResponse,
+    DocumentDeleteResponse,
+    ReindexJobResponse,
     RealtimeUsageResponse,
     ConversationTitleUpdate,
     PasswordUpdate
@@ -36,7 +38,9 @@ from backend.schemas import (
 from backend.config import settings
 
 # RAG & Services
-from backend.rag_engine import ClaudeRAG
+from backend.rag_engine import ClaudeRAG, SUPPORTED_EXTENSIONS
+from backend.reindex_jobs import ReindexJob, ReindexJobManager, ReindexInProgress
+from backend.document_watcher import DocumentWatcher
 from backend.conversation_service import (
     create_conversation,
     get_user_conversations,
@@ -52,6 +56,9 @@ from backend.usage_tracker import track_query
 # Nota: Esto se ejecuta al importar el módulo. Para evitar IO blocker en startup, 
 # ClaudeRAG inicializa cliente ligero. La carga pesada (Chroma) es lazy o rápida.
 rag_engine = ClaudeRAG()
+# Reindexados en segundo plano (uno a la vez) para no bloquear las consultas
+reindex_jobs = ReindexJobManager(rag_engine)
+document_watcher = None
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -85,6 +92,31 @@ async def startup_event():
     finally:
         db.close()
 
+    if settings.DOCUMENT_WATCHER_ENABLED:
+        global document_watcher
+        document_watcher = DocumentWatcher(
+            settings.DOCUMENT_WATCHER_PATH,
+            on_change=_start_watcher_reindex,
+            extensions=SUPPORTED_EXTENSIONS,
+            interval_seconds=settings.DOCUMENT_WATCHER_INTERVAL_SECONDS,
+            debounce_seconds=settings.DOCUMENT_WATCHER_DEBOUNCE_SECONDS
+        )
+        document_watcher.start()
+
+def _start_watcher_reindex() -> bool:
+    """Incremental reindex of the watched folder; False while another reindex runs so the watcher retries."""
+    try:
+        job = reindex_jobs.start("incremental", settings.DOCUMENT_WATCHER_PATH)
+    except ReindexInProgress:
+        return False
+    logger.info(f"Document watcher started reindex job {job.id}")
+    return True
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if document_watcher is not None:
+        document_watcher.stop()
+
 # ==========================================
 # RAG QUERY ENDPOINTS
 # ==========================================
@@ -132,7 +164,14 @@ async def query_rag(
     try:
         # ask() espera query y historial de chat
         # Modificamos ask() para aceptar chat_history list[dict]
-        result = rag_engine.ask(request.question, conversation_history=chat_history)
+        result = rag_engine.ask(
+            request.question,
+            conversation_history=chat_history,
+            rerank=request.rerank,
+            mmr_lambda=request.mmr_lambda,
+            where=request.where,
+            where_document=request.where_document
+        )
         
         answer = result.get("answer", "No answer generated.")
         sources = result.get("sources", [])
@@ -186,9 +225,9 @@ from backend.admin_service import (
 )
 from backend.auth import require_admin
 from backend.usage_tracker import get_user_usage, get_all_users_usage, get_realtime_usage
-from backend.schemas import UserUsageResponse, UsageStatsResponse
+from backend.schemas import UserUsageResponse, UsageStatsResponse, RagStatsResponse, BatchSearchRequest, BatchSearchResponse
 from fastapi import UploadFile, File
-from typing import List
+from typing import List, Literal
 from datetime import date
 
 # --- USER MANAGEMENT ---
@@ -289,29 +328,110 @@ async def admin_delete_user(
     status_code=status.HTTP_201_CREATED,
     response_model=DocumentUploadResponse
 )
-async def admin_upload_docs(
+def admin_upload_docs(
     files: List[UploadFile] = File(...)
 ):
-    saved = upload_documents(files)
-    return {"uploaded": len(saved), "files": saved}
+    # Sync route: the streamed copy and hashing run in the threadpool, not the event loop
+    result = upload_documents(files, rag_engine.doc_processor.manifest, reindex_jobs)
+    # Each new file is indexed on its own, right after any reindex in progress
+    jobs = [reindex_jobs.enqueue_file(file_path) for file_path in result["saved"]]
+    return {
+        "uploaded": len(result["saved"]),
+        "files": [os.path.basename(file_path) for file_path in result["saved"]],
+        "skipped": result["skipped"],
+        "index_jobs": [job.id for job in jobs]
+    }
+
+def _reindex_job_response(job: ReindexJob) -> dict:
+    """Job state plus, once finished, its statistics mapped to ReindexResponse."""
+    data = job.to_dict()
+    stats = data.pop("result")
+    data["result"] = None
+    if stats and stats.get("status") != "error":
+        # Map keys to Schema
+        data["result"] = {
+            "status": stats.get("status"),
+            "chunks_indexed": stats.get("chunks_indexed", 0),
+            "time_seconds": stats.get("elapsed_time_seconds", 0.0),
+            "documents_processed": stats.get("documents_found", 0),
+            "mode": job.mode,
+            "documents_added": stats.get("documents_added", 0),
+            "documents_updated": stats.get("documents_updated", 0),
+            "documents_skipped": stats.get("documents_skipped", 0),
+            "documents_removed": stats.get("documents_removed", 0),
+            "documents_failed": stats.get("documents_failed", 0),
+            "embedding_chunks_per_second": stats.get("embedding_chunks_per_second", 0.0),
+            "embedding_cache_hits": stats.get("embedding_cache_hits", 0),
+            "embedding_cache_misses": stats.get("embedding_cache_misses", 0)
+        }
+    return data
 
 @app.post(
     "/admin/documents/reindex",
     tags=["Admin"],
     dependencies=[Depends(require_admin)],
-    summary="Reindexar Todo",
-    response_model=ReindexResponse
+    summary="Reindexar Documentos",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=ReindexJobResponse
 )
-async def admin_reindex():
-    """Ejecuta reindexado completo de ChromaDB."""
-    stats = rag_engine.reindex_all()
-    # Map keys to Schema
-    return {
-        "status": stats.get("status"),
-        "chunks_indexed": stats.get("chunks_indexed", 0),
-        "time_seconds": stats.get("elapsed_time_seconds", 0.0),
-        "documents_processed": stats.get("documents_found", 0)
-    }
+async def admin_reindex(mode: Literal["incremental", "full"] = "incremental"):
+    """
+    Lanza un reindexado en segundo plano y devuelve el trabajo creado; su progreso se
+    consulta en /admin/documents/reindex/jobs/{job_id}. Por defecto solo procesa archivos
+    nuevos, modificados o eliminados; con mode=full reconstruye el índice completo en una
+    colección nueva y cambia a ella al terminar, sin dejar de responder consultas. Solo
+    puede haber un reindexado en curso (409 si ya hay uno).
+    """
+    try:
+        job = reindex_jobs.start(mode)
+    except ReindexInProgress as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Ya hay un reindexado en curso (job {e.job.id if e.job else 'desconocido'})"
+        )
+    return _reindex_job_response(job)
+
+@app.get(
+    "/admin/documents/reindex/jobs",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    summary="Listar Reindexados",
+    response_model=List[ReindexJobResponse]
+)
+async def admin_list_reindex_jobs():
+    """Trabajos de reindexado recientes, del más nuevo al más antiguo."""
+    return [_reindex_job_response(job) for job in reindex_jobs.list()]
+
+@app.get(
+    "/admin/documents/reindex/jobs/{job_id}",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    summary="Estado de Reindexado",
+    response_model=ReindexJobResponse
+)
+async def admin_get_reindex_job(job_id: str):
+    """Fase, archivos procesados, chunks indexados y tiempo estimado restante."""
+    job = reindex_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo de reindexado no encontrado")
+    return _reindex_job_response(job)
+
+@app.post(
+    "/admin/documents/reindex/jobs/{job_id}/cancel",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    summary="Cancelar Reindexado",
+    response_model=ReindexJobResponse
+)
+async def admin_cancel_reindex_job(job_id: str):
+    """
+    Solicita la cancelación. En modo incremental lo ya indexado se conserva; en modo full
+    se descarta la generación a medio construir y se sigue sirviendo la anterior.
+    """
+    job = reindex_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo de reindexado no encontrado")
+    return _reindex_job_response(job)
 
 @app.get(
     "/admin/documents",
@@ -325,14 +445,18 @@ async def admin_list_docs():
 
 @app.delete(
     "/admin/documents/{filename}",
-    status_code=status.HTTP_204_NO_CONTENT,
     tags=["Admin"],
     dependencies=[Depends(require_admin)],
-    summary="Eliminar Documento"
+    summary="Eliminar Documento",
+    description="Elimina el archivo y sus chunks del índice.",
+    response_model=DocumentDeleteResponse
 )
-async def admin_delete_doc(filename: str):
-    delete_document(filename)
-    return None
+def admin_delete_doc(filename: str):
+    path, removed = delete_document(filename, rag_engine)
+    # A reindex already running may have read the file: once it ends, this job removes
+    # whatever it indexed again (the file is gone, so index_file only deletes)
+    reindex_jobs.enqueue_file(path)
+    return {"filename": os.path.basename(filename), "vectors_removed": removed}
 
 # --- STATS ---
 
@@ -384,6 +508,44 @@ async def admin_realtime_stats(
 ):
     return get_realtime_usage(db, hours)
 
+@app.get(
+    "/admin/rag/stats",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    summary="Métricas RAG",
+    response_model=RagStatsResponse
+)
+async def admin_rag_stats():
+    """Tamaño de la colección y aciertos de las cachés de embeddings."""
+    return rag_engine.doc_processor.stats()
+
+@app.post(
+    "/admin/search/batch",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    summary="Búsqueda en Lote",
+    response_model=BatchSearchResponse
+)
+def admin_batch_search(request: BatchSearchRequest):
+    """
+    Recupera los chunks de varias preguntas en una sola pasada (embeddings en lote y
+    una única consulta vectorial), sin llamar a Claude. Pensado para evaluaciones y
+    generación de FAQs. Es síncrono para que FastAPI lo ejecute en el threadpool.
+    """
+    start = time.perf_counter()
+    results = rag_engine.doc_processor.search_many(
+        request.queries,
+        top_k=request.top_k,
+        hybrid=request.hybrid,
+        mmr_lambda=request.mmr_lambda,
+        where=request.where,
+        where_document=request.where_document
+    )
+    return {
+        "results": [{"query": query, "chunks": chunks} for query, chunks in zip(request.queries, results)],
+        "time_seconds": round(time.perf_counter() - start, 3)
+    }
+
 # ==========================================
 # SYSTEM ENDPOINTS
 # ==========================================
@@ -0,0 +1,101 @@
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+
+# Add parent directory to path to allow imports from backend
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from backend.config import settings
+from backend.embeddings import load_embedding_model
+from backend.rag_engine import load_file
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+SAMPLE_TEXTS = [
+    "¿Cuál es el plazo de entrega estándar para pedidos nacionales?",
+    "La garantía cubre defectos de fabricación durante 24 meses desde la fecha de compra.",
+    "Descuento por volumen: 5% a partir de 100 unidades y 10% a partir de 500 unidades.",
+    "El contrato CT-2024/015 incluye soporte técnico 24x7 y mantenimiento preventivo.",
+    "Procedure for returning defective products and requesting a replacement.",
+]
+
+
+def load_sample_chunks(folder_path: str, limit: int):
+    """Chunk documents the same way indexing does; fall back to built-in samples."""
+    files = []
+    for ext in ['*.pdf', '*.docx', '*.txt', '*.md']:
+        files.extend(glob.glob(os.path.join(folder_path, '**', ext), recursive=True))
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50, length_function=len)
+    chunks = []
+    for file_path in sorted(files):
+        document = load_file(file_path)
+        if document is not None:
+            chunks.extend(splitter.split_text(document.page_content))
+        if len(chunks) >= limit:
+            break
+
+    if not chunks:
+        logger.warning(f"No documents found in {folder_path}, using built-in sample texts.")
+        chunks = SAMPLE_TEXTS * max(1, limit // len(SAMPLE_TEXTS))
+    return chunks[:limit]
+
+
+def measure(model, texts, batch_size: int):
+    """Encode texts once to warm up, then time a full pass."""
+    model.encode(texts[:batch_size], batch_size=batch_size, normalize_embeddings=True, show_progress_bar=False)
+    start = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False)
+    elapsed = time.perf_counter() - start
+    return vectors, len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PyTorch and ONNX embedding backends (parity + throughput)")
+    parser.add_argument("--docs", type=str, default="data/documents", help="Folder with documents to sample chunks from")
+    parser.add_argument("--limit", type=int, default=1000, help="Number of chunks to embed")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE, help="Encode batch size")
+    parser.add_argument("--onnx-file", type=str, default=settings.EMBEDDING_ONNX_FILE, help="ONNX export to compare")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="Fail if any vector is less similar than this")
+    args = parser.parse_args()
+
+    texts = load_sample_chunks(args.docs, args.limit)
+    logger.info(f"Benchmarking on {len(texts)} chunks (batch size {args.batch_size})")
+
+    torch_vectors, torch_rate = measure(load_embedding_model(MODEL_NAME, "torch"), texts, args.batch_size)
+    onnx_vectors, onnx_rate = measure(load_embedding_model(MODEL_NAME, "onnx", args.onnx_file), texts, args.batch_size)
+
+    cosine = np.sum(torch_vectors * onnx_vectors, axis=1)
+
+    print("\n" + "="*50)
+    print("📐 Embedding Backend Comparison")
+    print("="*50)
+    print(f"PyTorch:            {torch_rate:8.1f} chunks/sec")
+    print(f"ONNX ({args.onnx_file}): {onnx_rate:8.1f} chunks/sec")
+    print(f"Speed-up:           {onnx_rate / torch_rate:8.2f}x")
+    print(f"Cosine parity:      mean={cosine.mean():.4f} min={cosine.min():.4f}")
+    print("="*50 + "\n")
+
+    if cosine.min() < args.min_cosine:
+        logger.error(f"Parity check failed: min cosine {cosine.min():.4f} < {args.min_cosine}")
+        sys.exit(1)
+    logger.info("Parity check passed.")
+
+
+if __name__ == "__main__":
+    main()
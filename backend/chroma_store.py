@@ -0,0 +1,161 @@
+import logging
+import threading
+from typing import Optional
+
+import chromadb
+import httpx
+from chromadb.config import Settings as ChromaSettings
+from chromadb.utils import embedding_functions
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from backend.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+def create_persistent_client(persistence_path: str):
+    """Embedded Chroma client storing data under persistence_path (single process only)."""
+    logger.info(f"Initializing ChromaDB Client at {persistence_path}...")
+    try:
+        return chromadb.PersistentClient(path=persistence_path)
+    except Exception as e:
+        logger.error(f"Failed to initialize ChromaDB: {e}")
+        raise
+
+
+def create_http_client(
+    host: str,
+    port: int,
+    ssl: bool = False,
+    auth_token: Optional[str] = None,
+    timeout_seconds: float = 30.0,
+    connect_timeout_seconds: float = 5.0,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10
+):
+    """
+    Client of a standalone Chroma server, shared by any number of backend replicas.
+
+    Requests go through one pooled HTTP session (keep-alive connections up to
+    max_connections). Chroma creates that session without a timeout, so the
+    timeouts are applied to it after the client is built.
+    """
+    logger.info(f"Connecting to Chroma server at {'https' if ssl else 'http'}://{host}:{port}...")
+    client = chromadb.HttpClient(
+        host=host,
+        port=port,
+        ssl=ssl,
+        headers={"Authorization": f"Bearer {auth_token}"} if auth_token else None,
+        settings=ChromaSettings(
+            anonymized_telemetry=False,
+            chroma_http_max_connections=max_connections,
+            chroma_http_max_keepalive_connections=max_keepalive_connections
+        )
+    )
+    session = getattr(getattr(client, "_server", None), "_session", None)
+    if isinstance(session, httpx.Client):
+        session.timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+    else:
+        logger.warning("Could not apply timeouts to the Chroma HTTP session (unsupported chromadb version)")
+    return client
+
+
+class LazySentenceTransformerEmbeddingFunction(embedding_functions.SentenceTransformerEmbeddingFunction):
+    """
+    SentenceTransformerEmbeddingFunction that loads its model on first call.
+
+    Chunk and query embeddings are computed by DocumentProcessor (with the configured
+    EMBEDDING_BACKEND) and passed explicitly, so the function is bound only to keep the
+    collection's embedding-function config. Loading it up front would pull PyTorch
+    into ONNX-only nodes.
+    """
+
+    def __init__(self, model_name: str, **kwargs):
+        # Attributes read by name() / get_config() on chromadb versions that persist the config
+        self.model_name = model_name
+        self.device = kwargs.get("device", "cpu")
+        self.normalize_embeddings = kwargs.get("normalize_embeddings", False)
+        self.kwargs = {key: value for key, value in kwargs.items() if key not in ("device", "normalize_embeddings")}
+        self._init_kwargs = kwargs
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def __call__(self, input):
+        with self._load_lock:
+            if not self._loaded:
+                logger.info(f"Loading Chroma embedding function for {self.model_name}")
+                super().__init__(model_name=self.model_name, **self._init_kwargs)
+                self._loaded = True
+        return super().__call__(input)
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    Chroma collection behind the VectorStore interface, on an embedded
+    PersistentClient or on an HttpClient connected to a Chroma server.
+    """
+
+    name = "chroma"
+
+    def __init__(self, client, collection_name: str, model_name: str):
+        """
+        Open (or create) the collection.
+
+        Args:
+            client: Chroma client (see create_persistent_client / create_http_client).
+            collection_name (str): Collection holding the chunks.
+            model_name (str): Embedding model bound to the collection, so collections
+                created by earlier versions keep opening with the same function.
+        """
+        self.client = client
+        self.collection_name = collection_name
+        self.embedding_fn = LazySentenceTransformerEmbeddingFunction(model_name=model_name)
+        self.collection = self._open_collection()
+
+    # The server may still be starting when a replica boots
+    @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=1, max=10), reraise=True)
+    def _open_collection(self):
+        return self.client.get_or_create_collection(
+            name=self.collection_name,
+            embedding_function=self.embedding_fn
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def delete(self, ids=None, where=None):
+        self.collection.delete(ids=ids, where=where)
+
+    def get(self, ids=None, where=None, where_document=None, limit=None, offset=None, include=None):
+        kwargs = {"include": include} if include is not None else {}
+        return self.collection.get(
+            ids=ids, where=where, where_document=where_document, limit=limit, offset=offset, **kwargs
+        )
+
+    def query(self, query_embeddings, n_results=10, where=None, where_document=None, include=None):
+        kwargs = {"include": include} if include is not None else {}
+        return self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            where_document=where_document,
+            **kwargs
+        )
+
+    def drop(self):
+        self.client.delete_collection(self.collection_name)
+        logger.info(f"Collection '{self.collection_name}' deleted.")
+
+    def reset(self):
+        try:
+            self.client.delete_collection(self.collection_name)
+            logger.info("Collection deleted.")
+        except Exception as e:
+            logger.warning(f"Collection deletion failed (might not exist): {e}")
+        self.collection = self._open_collection()
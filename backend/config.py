@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, EmailStr
+from typing import Literal, Optional
 
 class Settings(BaseSettings):
     """
@@ -27,6 +28,64 @@ class Settings(BaseSettings):
     CLAUDE_INPUT_PRICE_PER_MILLION: float = Field(3.0, description="Cost per million input tokens")
     CLAUDE_OUTPUT_PRICE_PER_MILLION: float = Field(15.0, description="Cost per million output tokens")
     
+    # Ingestion
+    INGEST_WORKERS: int = Field(0, ge=0, description="Processes used to parse documents (0 = one per CPU core, 1 = sequential)")
+    INGEST_QUEUE_SIZE: int = Field(32, ge=1, description="Max documents parsed ahead of chunking/embedding")
+    INGEST_BATCH_SIZE: int = Field(256, ge=1, description="Chunks buffered before each embed + commit")
+    CHUNKING_MODE: Literal["characters", "tokens"] = Field("characters", description="Measure chunk size in characters or in tokens of CHUNK_TOKENIZER")
+    CHUNK_SIZE: int = Field(500, ge=1, description="Max characters per chunk (CHUNKING_MODE=characters)")
+    CHUNK_OVERLAP: int = Field(50, ge=0, description="Characters shared by consecutive chunks (CHUNKING_MODE=characters)")
+    CHUNK_SIZE_TOKENS: int = Field(150, ge=1, description="Max tokens per chunk (CHUNKING_MODE=tokens; keep within the embedding model window)")
+    CHUNK_OVERLAP_TOKENS: int = Field(15, ge=0, description="Tokens shared by consecutive chunks (CHUNKING_MODE=tokens)")
+    STRUCTURED_CHUNKING_ENABLED: bool = Field(True, description="Split Markdown/DOCX documents by heading sections and store the section path")
+    CHUNK_TOKENIZER: str = Field("cl100k_base", description="tiktoken encoding used to count chunk tokens")
+    PDF_TEXT_CACHE_ENABLED: bool = Field(True, description="Cache extracted PDF page texts on disk keyed by file hash")
+    PDF_PAGE_WORKERS: int = Field(0, ge=0, description="Processes extracting the pages of a large PDF loaded on its own (0 = one per CPU core)")
+    PDF_PARALLEL_MIN_PAGES: int = Field(50, ge=1, description="Page count from which PDF extraction is parallelized")
+    EMBEDDING_BACKEND: Literal["torch", "onnx"] = Field("torch", description="Embedding inference backend (onnx requires optimum[onnxruntime])")
+    EMBEDDING_ONNX_FILE: str = Field("onnx/model_quint8_avx2.onnx", description="ONNX export used by the onnx backend (int8-quantized by default)")
+    EMBEDDING_CACHE_ENABLED: bool = Field(True, description="Cache chunk embeddings on disk keyed by model + text hash")
+    EMBEDDING_BATCH_SIZE: int = Field(256, ge=1, description="Chunks per SentenceTransformer.encode / collection write batch")
+    DOCUMENT_WATCHER_ENABLED: bool = Field(False, description="Watch the documents folder and incrementally reindex on changes")
+    DOCUMENT_WATCHER_PATH: str = Field("data/documents/", description="Folder watched for document changes")
+    DOCUMENT_WATCHER_INTERVAL_SECONDS: float = Field(2.0, gt=0, description="Time between folder scans")
+    DOCUMENT_WATCHER_DEBOUNCE_SECONDS: float = Field(5.0, ge=0, description="Quiet period after the last change before reindexing")
+    
+    # Retrieval
+    VECTOR_STORE: Literal["chroma", "numpy", "memory", "pgvector"] = Field("chroma", description="Vector store: Chroma (HNSW), in-process NumPy exact search, memory (NumPy, not persisted) or pgvector (PostgreSQL)")
+    NUMPY_STORE_DTYPE: Literal["float32", "float16"] = Field("float32", description="Storage precision of the NumPy vector store")
+    CHROMA_MODE: Literal["embedded", "http"] = Field("embedded", description="Chroma on local files (single process) or a standalone Chroma server (many replicas)")
+    CHROMA_HOST: str = Field("localhost", description="Chroma server host (CHROMA_MODE=http)")
+    CHROMA_PORT: int = Field(8000, description="Chroma server port (CHROMA_MODE=http)")
+    CHROMA_SSL: bool = Field(False, description="Use HTTPS to reach the Chroma server")
+    CHROMA_AUTH_TOKEN: Optional[str] = Field(None, description="Bearer token for the Chroma server, if it requires one")
+    CHROMA_TIMEOUT_SECONDS: float = Field(30.0, gt=0, description="Read/write timeout of Chroma server requests")
+    CHROMA_CONNECT_TIMEOUT_SECONDS: float = Field(5.0, gt=0, description="Connect timeout of Chroma server requests")
+    CHROMA_MAX_CONNECTIONS: int = Field(20, ge=1, description="Pooled HTTP connections to the Chroma server per process")
+    CHROMA_MAX_KEEPALIVE_CONNECTIONS: int = Field(10, ge=0, description="Idle connections kept alive in the pool")
+    PGVECTOR_INDEX: Literal["hnsw", "ivfflat"] = Field("hnsw", description="Approximate nearest neighbour index of the pgvector store")
+    PGVECTOR_HNSW_M: int = Field(16, ge=2, description="HNSW graph degree")
+    PGVECTOR_HNSW_EF_CONSTRUCTION: int = Field(64, ge=4, description="HNSW build-time candidate list size")
+    PGVECTOR_HNSW_EF_SEARCH: int = Field(40, ge=1, description="Minimum HNSW query-time candidate list size (raised to the results requested)")
+    PGVECTOR_IVFFLAT_LISTS: int = Field(100, ge=1, description="Max IVFFlat inverted lists (the index uses about rows / 1000, built after indexing)")
+    PGVECTOR_IVFFLAT_PROBES: int = Field(10, ge=1, description="Minimum IVFFlat lists scanned per query (recall vs latency)")
+    GENERATION_DROP_DELAY_SECONDS: float = Field(30.0, ge=0, description="With a shared vector store, time other replicas get to switch to a new generation before the old one is dropped")
+    CONTEXT_MAX_TOKENS: int = Field(3000, ge=1, description="Token budget of the retrieved context sent to Claude")
+    QUERY_EMBEDDING_CACHE_SIZE: int = Field(1024, ge=0, description="Query embeddings kept in the in-process LRU cache (0 = disabled)")
+    HYBRID_SEARCH_ENABLED: bool = Field(True, description="Fuse BM25 lexical results with dense results")
+    HYBRID_DENSE_K: int = Field(5, ge=1, description="Minimum dense candidates retrieved in hybrid mode (more when the caller asks for more)")
+    HYBRID_LEXICAL_K: int = Field(20, ge=1, description="Minimum BM25 candidates retrieved in hybrid mode (more when the caller asks for more)")
+    RRF_K: int = Field(60, ge=1, description="Reciprocal rank fusion constant")
+    MMR_ENABLED: bool = Field(False, description="Diversify retrieved chunks with maximal marginal relevance by default")
+    MMR_LAMBDA: float = Field(0.7, ge=0.0, le=1.0, description="MMR trade-off (1.0 = relevance only, 0.0 = diversity only)")
+    MMR_FETCH_K: int = Field(20, ge=1, description="Candidates considered by MMR")
+    RERANK_ENABLED: bool = Field(False, description="Rerank retrieved candidates with a cross-encoder by default")
+    RERANK_MODEL: str = Field("cross-encoder/mmarco-mMiniLMv2-L12-H384-v1", description="Cross-encoder model (multilingual)")
+    RERANK_CANDIDATES: int = Field(50, ge=1, description="Candidates retrieved before reranking")
+    RERANK_TOP_K: int = Field(3, ge=1, description="Chunks kept after reranking")
+    RERANK_BATCH_SIZE: int = Field(16, ge=1, description="Pairs scored per cross-encoder batch")
+    RERANK_TIME_BUDGET_MS: float = Field(300.0, gt=0, description="Max time spent reranking per request")
+    
     # App
     BACKEND_URL: str = Field("http://localhost:8000", description="Backend base URL")
     FRONTEND_URL: str = Field("http://localhost:8501", description="Frontend base URL")
@@ -100,6 +100,16 @@ class UsageStats(Base):
         UniqueConstraint('user_id', 'date', name='uq_user_date_stats'),
     )
 
+# Vector collection served under a logical name, shared by every backend replica
+class CollectionAliasRecord(Base):
+    __tablename__ = "collection_aliases"
+
+    alias = Column(String, primary_key=True)
+    collection = Column(String, nullable=False)
+    # Bumped by every write to the served collection, so replicas refresh their BM25 index
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
 # --- Dependency ---
 def get_db() -> Generator[Session, None, None]:
     """
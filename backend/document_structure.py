@@ -0,0 +1,146 @@
+import re
+import bisect
+from typing import Iterable, List, Optional, Tuple
+
+SECTION_SEPARATOR = " > "
+
+MARKDOWN_HEADING = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+MARKDOWN_FENCE = re.compile(r"^[ \t]*(```|~~~)")
+# Built-in Word heading styles, in English and Spanish installations
+DOCX_HEADING_STYLE = re.compile(r"^(?:heading|t[ií]tulo)\s*(\d)$", re.IGNORECASE)
+
+
+class SectionTracker:
+    """
+    Builds section boundaries while walking a document: the offset where each
+    section starts and its heading path ("Manual > Precios > Descuentos").
+    """
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.paths: List[str] = []
+        self._headings: List[Tuple[int, str]] = []
+        self._body_since_heading = True
+
+    def heading(self, offset: int, level: int, title: str):
+        self._headings = [(lvl, text) for lvl, text in self._headings if lvl < level]
+        self._headings.append((level, title.strip()))
+        path = SECTION_SEPARATOR.join(text for _, text in self._headings)
+        if self.starts and not self._body_since_heading:
+            # Heading directly followed by a subheading: keep it in the subsection
+            # instead of producing a chunk with nothing but the heading
+            self.paths[-1] = path
+        else:
+            self.starts.append(offset)
+            self.paths.append(path)
+        self._body_since_heading = False
+
+    def body(self, text: str):
+        if text.strip():
+            self._body_since_heading = True
+
+
+def markdown_sections(content: str) -> Tuple[List[int], List[str]]:
+    """
+    Section boundaries of a Markdown document from its ATX headings ("#" to "######"),
+    ignoring fenced code blocks.
+
+    Returns:
+        Tuple: (section_starts, section_paths); text before the first heading has no section.
+    """
+    tracker = SectionTracker()
+    in_fence = False
+    offset = 0
+    for line in content.splitlines(keepends=True):
+        if MARKDOWN_FENCE.match(line):
+            in_fence = not in_fence
+            tracker.body(line)
+        else:
+            match = None if in_fence else MARKDOWN_HEADING.match(line.rstrip("\r\n"))
+            if match:
+                tracker.heading(offset, len(match.group(1)), match.group(2))
+            else:
+                tracker.body(line)
+        offset += len(line)
+    return tracker.starts, tracker.paths
+
+
+def docx_heading_level(style_name: Optional[str]) -> Optional[int]:
+    """Heading level of a DOCX paragraph style ("Title" -> 0, "Heading 2" -> 2), None for body text."""
+    if not style_name:
+        return None
+    if style_name.strip().lower() in ("title", "título", "titulo"):
+        return 0
+    match = DOCX_HEADING_STYLE.match(style_name.strip())
+    return int(match.group(1)) if match else None
+
+
+def docx_text_and_sections(paragraphs: Iterable) -> Tuple[str, List[int], List[str]]:
+    """
+    Text of DOCX paragraphs joined by newlines, with section boundaries taken from
+    their heading styles.
+
+    Args:
+        paragraphs (Iterable): python-docx paragraphs (DocxDocument(...).paragraphs).
+
+    Returns:
+        Tuple: (content, section_starts, section_paths).
+    """
+    tracker = SectionTracker()
+    parts = []
+    offset = 0
+    for paragraph in paragraphs:
+        text = paragraph.text
+        style = paragraph.style.name if paragraph.style is not None else None
+        level = docx_heading_level(style)
+        if level is not None and text.strip():
+            tracker.heading(offset, level, text)
+        else:
+            tracker.body(text)
+        parts.append(text)
+        offset += len(text) + 1
+    return "\n".join(parts), tracker.starts, tracker.paths
+
+
+def split_sections(content: str, starts: List[int], paths: List[str]) -> List[Tuple[int, str, str]]:
+    """
+    Cut a document at its section boundaries.
+
+    Returns:
+        List[Tuple[int, str, str]]: (offset, text, section path) per non-empty section; text
+        before the first heading gets an empty path.
+    """
+    bounds = ([0] if not starts or starts[0] > 0 else []) + list(starts) + [len(content)]
+    labels = ([""] if not starts or starts[0] > 0 else []) + list(paths)
+    sections = []
+    for start, end, path in zip(bounds, bounds[1:], labels):
+        text = content[start:end]
+        if text.strip():
+            sections.append((start, text, path))
+    return sections
+
+
+def join_pages(pages: List[str]) -> Tuple[str, List[int], List[int]]:
+    """
+    Join page texts into one document (list join, linear in its size).
+
+    Returns:
+        Tuple: (content, page_starts, page_numbers) where page_starts[i] is the offset
+        of the i-th non-empty page in content and page_numbers[i] its 1-based number.
+    """
+    parts, starts, numbers = [], [], []
+    offset = 0
+    for number, text in enumerate(pages, start=1):
+        if not text:
+            continue
+        starts.append(offset)
+        numbers.append(number)
+        parts.append(text)
+        offset += len(text) + 1
+    return "\n".join(parts), starts, numbers
+
+
+def page_at(offset: int, page_starts: List[int], page_numbers: List[int]) -> int:
+    """1-based page number containing the character offset of a joined document."""
+    index = bisect.bisect_right(page_starts, offset) - 1
+    return page_numbers[max(index, 0)]
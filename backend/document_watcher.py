@@ -0,0 +1,113 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_folder(folder_path: str, extensions: Iterable[str]) -> Dict[str, Tuple[int, float]]:
+    """
+    (size, mtime) of every supported file under folder_path, recursively.
+
+    Args:
+        folder_path (str): Folder to scan.
+        extensions (Iterable[str]): Lowercase extensions to include, e.g. (".pdf", ".md").
+    """
+    extensions = tuple(extensions)
+    snapshot = {}
+    for root, dirs, files in os.walk(folder_path):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            if name.startswith(".") or not name.lower().endswith(extensions):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Deleted between listing and stat
+            snapshot[path] = (stat.st_size, stat.st_mtime)
+    return snapshot
+
+
+class DocumentWatcher:
+    """
+    Polls the documents folder and triggers an incremental reindex when files are
+    created, modified or deleted. Changes are debounced: the reindex starts once the
+    folder has been stable for debounce_seconds, so copies in progress and bursts of
+    uploads produce a single run.
+    """
+
+    def __init__(
+        self,
+        folder_path: str,
+        on_change: Callable[[], bool],
+        extensions: Iterable[str],
+        interval_seconds: float = 2.0,
+        debounce_seconds: float = 5.0
+    ):
+        """
+        Args:
+            folder_path (str): Folder to watch.
+            on_change (Callable[[], bool]): Starts the reindex. Returns False when it could
+                not start (e.g. a reindex is already running); it is retried on the next poll.
+            extensions (Iterable[str]): Supported file extensions.
+            interval_seconds (float): Time between polls.
+            debounce_seconds (float): Quiet period required before triggering.
+        """
+        self.folder_path = os.path.abspath(folder_path)
+        self.on_change = on_change
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.interval_seconds = interval_seconds
+        self.debounce_seconds = debounce_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="document-watcher", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Watching {self.folder_path} for document changes "
+            f"(poll {self.interval_seconds}s, debounce {self.debounce_seconds}s)"
+        )
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        previous = snapshot_folder(self.folder_path, self.extensions)
+        pending = False
+        last_change = 0.0
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                current = snapshot_folder(self.folder_path, self.extensions)
+            except Exception as e:
+                logger.warning(f"Document watcher scan failed: {e}")
+                continue
+
+            if current != previous:
+                changed = len(current.keys() ^ previous.keys()) + sum(
+                    1 for path in current.keys() & previous.keys() if current[path] != previous[path]
+                )
+                logger.debug(f"Document watcher: {changed} files changed")
+                previous = current
+                pending = True
+                last_change = time.monotonic()
+                continue
+
+            if pending and time.monotonic() - last_change >= self.debounce_seconds:
+                try:
+                    started = self.on_change()
+                except Exception as e:
+                    logger.error(f"Document watcher could not start reindex: {e}")
+                    started = False
+                if started:
+                    logger.info("Document changes detected: incremental reindex started.")
+                    pending = False
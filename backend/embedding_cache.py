@@ -0,0 +1,259 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Optional, Dict
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, use one cache per process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+KEY_SIZE = 16  # bytes of blake2b digest stored per cached vector
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only changes hit the same cache entry."""
+    return " ".join(text.split())
+
+
+def text_key(model_name: str, text: str) -> bytes:
+    """Cache key for a chunk: digest of model name + normalized text."""
+    digest = hashlib.blake2b(digest_size=KEY_SIZE)
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.digest()
+
+
+class EmbeddingCache:
+    """
+    On-disk, content-addressed cache of chunk embeddings for one model.
+
+    Layout (inside cache_dir/<model>):
+        meta.json    -> {"model": ..., "dim": ...}
+        keys.bin     -> KEY_SIZE-byte keys, one per row
+        vectors.f32  -> float32 matrix (rows x dim), read through np.memmap
+
+    Both files are append-only; row i of vectors.f32 belongs to key i of keys.bin.
+    Several processes (e.g. uvicorn workers) may share them: appends happen under an
+    exclusive file lock after picking up the rows other processes appended.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        """
+        Initialize the cache, loading the key index if it exists.
+
+        Args:
+            cache_dir (str): Base directory for embedding caches.
+            model_name (str): Embedding model name (part of every key).
+        """
+        self.model_name = model_name
+        self.path = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self.keys_path = os.path.join(self.path, "keys.bin")
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.meta_path = os.path.join(self.path, "meta.json")
+        self.lock_path = os.path.join(self.path, "lock")
+        os.makedirs(self.path, exist_ok=True)
+
+        self.dim: Optional[int] = None
+        self.index: Dict[bytes, int] = {}
+        self.rows = 0  # rows on disk known to this process (keys may repeat across processes)
+        self.hits = 0
+        self.misses = 0
+        self._vectors: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process using these cache files."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        try:
+            with self._file_lock():
+                with open(self.meta_path, "r", encoding="utf-8") as f:
+                    self.dim = json.load(f)["dim"]
+                with open(self.keys_path, "rb") as f:
+                    raw = f.read()
+                # Rows only count if both the key and the full vector were written
+                vector_rows = os.path.getsize(self.vectors_path) // (self.dim * 4)
+                rows = min(len(raw) // KEY_SIZE, vector_rows)
+                # Drop any partially written tail so future appends stay aligned
+                # (safe under the lock: no other process is appending)
+                os.truncate(self.keys_path, rows * KEY_SIZE)
+                os.truncate(self.vectors_path, rows * self.dim * 4)
+            self.index = {}
+            for i in range(rows):
+                self.index.setdefault(raw[i * KEY_SIZE:(i + 1) * KEY_SIZE], i)
+            self.rows = rows
+            logger.info(f"Embedding cache loaded: {rows} vectors ({self.model_name})")
+        except Exception as e:
+            logger.warning(f"Could not load embedding cache at {self.path}, starting empty: {e}")
+            self.dim = None
+            self.index = {}
+            self.rows = 0
+
+    def _refresh(self):
+        """
+        Pick up rows appended by other processes. Vectors are written before their
+        keys, so every complete key on disk has its vector.
+        """
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        try:
+            disk_rows = os.path.getsize(self.keys_path) // KEY_SIZE
+        except OSError:
+            return
+        if disk_rows <= self.rows:
+            return
+        with open(self.keys_path, "rb") as f:
+            f.seek(self.rows * KEY_SIZE)
+            raw = f.read((disk_rows - self.rows) * KEY_SIZE)
+        for i in range(len(raw) // KEY_SIZE):
+            self.index.setdefault(raw[i * KEY_SIZE:(i + 1) * KEY_SIZE], self.rows + i)
+        self.rows += len(raw) // KEY_SIZE
+
+    def _matrix(self) -> np.memmap:
+        if self._vectors is None or self._vectors.shape[0] != self.rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.rows, self.dim))
+        return self._vectors
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for texts.
+
+        Returns:
+            List[Optional[List[float]]]: Cached vector per text, or None on a miss.
+        """
+        keys = [text_key(self.model_name, text) for text in texts]
+        with self._lock:
+            self._refresh()
+            rows = [self.index.get(key) for key in keys]
+            found = [row for row in rows if row is not None]
+            self.hits += len(found)
+            self.misses += len(rows) - len(found)
+            if not found:
+                return [None] * len(texts)
+            matrix = self._matrix()
+            return [matrix[row].tolist() if row is not None else None for row in rows]
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """Append embeddings for texts that are not cached yet."""
+        if not texts:
+            return
+        with self._lock, self._file_lock():
+            # Rows appended by other processes since the last look decide our row numbers
+            self._refresh()
+            array = np.asarray(vectors, dtype=np.float32)
+            if self.dim is None:
+                self.dim = int(array.shape[1])
+                # Start from clean files in case of leftovers without metadata
+                open(self.keys_path, "wb").close()
+                open(self.vectors_path, "wb").close()
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+
+            new_keys, new_rows, seen = [], [], set()
+            for text, row in zip(texts, array):
+                key = text_key(self.model_name, text)
+                if key in self.index or key in seen:
+                    continue
+                seen.add(key)
+                new_keys.append(key)
+                new_rows.append(row)
+            if not new_keys:
+                return
+
+            # Vectors first, then keys: a crash in between only loses the tail
+            with open(self.vectors_path, "ab") as f:
+                f.write(np.stack(new_rows).astype(np.float32).tobytes())
+            with open(self.keys_path, "ab") as f:
+                f.write(b"".join(new_keys))
+            for offset, key in enumerate(new_keys):
+                self.index[key] = self.rows + offset
+            self.rows += len(new_keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and number of cached vectors."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.index)}
+
+
+class QueryEmbeddingCache:
+    """
+    In-process, size-bounded LRU cache of query text -> embedding.
+    Tracks hits, misses and an estimate of the embedding time saved by hits.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        Args:
+            max_size (int): Maximum number of cached queries (0 disables caching).
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.miss_ms_total = 0.0
+        self.saved_ms = 0.0
+
+    def get(self, query: str) -> Optional[List[float]]:
+        """Return the cached embedding for a query, marking it as recently used."""
+        key = normalize_text(query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Each hit saves roughly the average cost of a miss
+            self.saved_ms += self.miss_ms_total / max(self.misses, 1)
+            return vector
+
+    def put(self, query: str, vector: List[float], elapsed_ms: float):
+        """Store a freshly computed embedding and the time it took."""
+        key = normalize_text(query)
+        with self._lock:
+            self.miss_ms_total += elapsed_ms
+            if self.max_size <= 0:
+                return
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit rate, counters and estimated milliseconds saved."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "saved_ms": round(self.saved_ms, 1),
+            "size": len(self._entries),
+            "max_size": self.max_size
+        }
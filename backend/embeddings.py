@@ -0,0 +1,43 @@
+import logging
+from typing import Optional
+
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = ("torch", "onnx")
+
+
+def embedding_model_id(model_name: str, backend: str = "torch", onnx_file: Optional[str] = None) -> str:
+    """
+    Identifier of a model + backend combination. Quantized ONNX vectors differ slightly
+    from PyTorch ones, so caches must not mix them.
+    """
+    if backend == "onnx":
+        return f"{model_name}@onnx:{onnx_file or 'model.onnx'}"
+    return model_name
+
+
+def load_embedding_model(model_name: str, backend: str = "torch", onnx_file: Optional[str] = None) -> SentenceTransformer:
+    """
+    Load a sentence-transformers model on the selected inference backend.
+
+    Args:
+        model_name (str): Hugging Face model name.
+        backend (str): "torch" (PyTorch) or "onnx" (ONNX Runtime, requires optimum[onnxruntime]).
+        onnx_file (Optional[str]): ONNX file inside the model repo, e.g. an int8-quantized
+            export such as "onnx/model_quint8_avx2.onnx". Defaults to the fp32 export.
+
+    Returns:
+        SentenceTransformer: Model exposing the usual encode() API.
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}'. Expected one of {EMBEDDING_BACKENDS}")
+
+    if backend == "onnx":
+        logger.info(f"Loading embedding model {model_name} on ONNX Runtime ({onnx_file or 'model.onnx'})...")
+        model_kwargs = {"file_name": onnx_file, "provider": "CPUExecutionProvider"} if onnx_file else {"provider": "CPUExecutionProvider"}
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs)
+
+    logger.info(f"Loading embedding model {model_name} on PyTorch...")
+    return SentenceTransformer(model_name)
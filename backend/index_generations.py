@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import logging
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.config import settings
+from backend.database import CollectionAliasRecord, engine
+from backend.lexical_index import BM25Index
+from backend.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class IndexGeneration:
+    """
+    One complete copy of the searchable indexes: a vector store collection and the
+    BM25 index built from the same chunks. Counts its in-flight readers so it is only
+    dropped once they are done.
+    """
+
+    def __init__(self, name: str, vector_store: VectorStore, lexical_index: BM25Index):
+        self.name = name
+        self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self._readers = 0
+        self._idle = threading.Condition()
+
+    def acquire(self):
+        with self._idle:
+            self._readers += 1
+
+    def release(self):
+        with self._idle:
+            self._readers -= 1
+            if self._readers == 0:
+                self._idle.notify_all()
+
+    @property
+    def readers(self) -> int:
+        return self._readers
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Wait until no reader uses this generation. Returns False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._readers == 0, timeout=timeout)
+
+    def drop(self):
+        """Delete the collection and the BM25 index file of this generation."""
+        self.vector_store.drop()
+        self.lexical_index.clear()
+        if os.path.exists(self.lexical_index.index_path):
+            os.remove(self.lexical_index.index_path)
+        logger.info(f"Index generation '{self.name}' dropped.")
+
+
+class CollectionAlias:
+    """
+    Maps the logical collection name to the physical generation currently served,
+    persisted in a small JSON file replaced atomically. Only visible to processes
+    sharing the data directory, so it is used with local vector stores.
+    """
+
+    shared = False
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): JSON file holding {alias: collection name}.
+        """
+        self.path = path
+
+    def _read(self) -> Dict[str, str]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read collection alias file {self.path}: {e}")
+            return {}
+
+    def resolve(self, alias: str) -> str:
+        """Physical collection for alias (the alias itself for indexes built before generations)."""
+        return self._read().get(alias, alias)
+
+    def state(self, alias: str) -> Tuple[str, int]:
+        """(physical collection, change version). Local stores have no other writers: version 0."""
+        return self.resolve(alias), 0
+
+    def bump(self, alias: str) -> int:
+        """Record a write to the served collection. Returns the new change version."""
+        return 0
+
+    def set(self, alias: str, name: str):
+        aliases = self._read()
+        aliases[alias] = name
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(aliases, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class DatabaseCollectionAlias:
+    """
+    Collection alias stored in the application database (table "collection_aliases"),
+    for vector stores shared by several backend replicas (pgvector, Chroma server):
+    every replica sees a switch made by any of them.
+    """
+
+    shared = True
+
+    def __init__(self, engine, fallback: Optional[CollectionAlias] = None):
+        """
+        Args:
+            engine: SQLAlchemy engine of the application database.
+            fallback (Optional[CollectionAlias]): Alias file read while the table has no
+                entry yet (deployments that switched generations before the table existed).
+        """
+        self.engine = engine
+        self.fallback = fallback
+        # The RAG engine can start before init_db() runs
+        CollectionAliasRecord.__table__.create(bind=engine, checkfirst=True)
+
+    def resolve(self, alias: str) -> str:
+        return self.state(alias)[0]
+
+    def state(self, alias: str) -> Tuple[str, int]:
+        """(physical collection, change version) in one read."""
+        with Session(self.engine) as session:
+            record = session.get(CollectionAliasRecord, alias)
+            if record is not None:
+                return record.collection, record.version
+        return (self.fallback.resolve(alias) if self.fallback is not None else alias), 0
+
+    def set(self, alias: str, name: str):
+        self._write(alias, name)
+
+    def bump(self, alias: str) -> int:
+        """Record a write to the served collection. Returns the new change version."""
+        return self._write(alias, None)
+
+    def _write(self, alias: str, name: Optional[str]) -> int:
+        with Session(self.engine) as session, session.begin():
+            record = session.get(CollectionAliasRecord, alias, with_for_update=True)
+            if record is None:
+                collection = name or (self.fallback.resolve(alias) if self.fallback is not None else alias)
+                record = CollectionAliasRecord(alias=alias, collection=collection, version=0)
+                session.add(record)
+            elif name is not None:
+                record.collection = name
+            record.version += 1
+            return record.version
+
+
+def create_collection_alias(persistence_path: str):
+    """
+    Alias store for the vector store selected in settings: the application database
+    when the store is shared by several replicas, a JSON file under persistence_path otherwise.
+    """
+    alias_file = CollectionAlias(os.path.join(persistence_path, "collection_alias.json"))
+    if is_shared_vector_store():
+        return DatabaseCollectionAlias(engine, fallback=alias_file)
+    return alias_file
+
+
+def is_shared_vector_store() -> bool:
+    """Whether the configured vector store is shared by every backend replica."""
+    return settings.VECTOR_STORE == "pgvector" or (settings.VECTOR_STORE == "chroma" and settings.CHROMA_MODE == "http")
+
+
+def new_generation_name(alias: str) -> str:
+    """
+    Versioned collection name, e.g. company_docs_20261017093512_3f9a1c. The random
+    suffix keeps rebuilds started within the same second from reusing a name.
+    """
+    return f"{alias}_{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+import logging
+import time
+import threading
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    Compute the SHA-256 hex digest of a file, reading it in blocks.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IndexManifest:
+    """
+    Tracks which files are indexed in the vector store (path, size, mtime, content hash),
+    so a reindex only has to process files that are new, changed or deleted.
+
+    Thread-safe: reindex jobs update it while request handlers look files up.
+    """
+
+    def __init__(self, manifest_path: str):
+        """
+        Initialize the manifest, loading it from disk if it exists.
+
+        Args:
+            manifest_path (str): Path of the JSON file backing the manifest.
+        """
+        self.manifest_path = manifest_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._last_save = 0.0
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        """Load entries from disk. A missing or corrupt file yields an empty manifest."""
+        entries = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    entries = json.load(f).get("files", {})
+            except Exception as e:
+                logger.warning(f"Could not read index manifest {self.manifest_path}, starting empty: {e}")
+        with self._lock:
+            self.entries = entries
+
+    def save(self):
+        """Persist entries atomically (write to a temp file, then rename)."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"files": self.entries}, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+            self._last_save = time.time()
+
+    def is_save_due(self, interval_seconds: float = 5.0) -> bool:
+        """Whether the last save is at least interval_seconds old (checkpointing during long runs)."""
+        return time.time() - self._last_save >= interval_seconds
+
+    def clear(self):
+        """Forget every tracked file."""
+        with self._lock:
+            self.entries = {}
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.entries.get(file_path)
+
+    def paths(self) -> List[str]:
+        """Paths of every tracked file (a copy, safe to iterate while the manifest changes)."""
+        with self._lock:
+            return list(self.entries)
+
+    def update(self, file_path: str, size: int, mtime: float, sha256: str):
+        """Record the current state of an indexed file."""
+        with self._lock:
+            self.entries[file_path] = {"size": size, "mtime": mtime, "sha256": sha256}
+
+    def find_by_hash(self, sha256: str) -> Optional[str]:
+        """Path of an indexed file with this content hash, if any."""
+        with self._lock:
+            for file_path, entry in self.entries.items():
+                if entry["sha256"] == sha256:
+                    return file_path
+        return None
+
+    def remove(self, file_path: str):
+        with self._lock:
+            self.entries.pop(file_path, None)
+
+    def is_unchanged(self, file_path: str, size: int, mtime: float) -> bool:
+        """Cheap check: same size and mtime as recorded means the file was not touched."""
+        entry = self.get(file_path)
+        return entry is not None and entry["size"] == size and entry["mtime"] == mtime
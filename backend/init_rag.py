@@ -57,13 +57,16 @@ def create_admin_user():
     finally:
         db.close()
 
-def index_documents():
+def index_documents(full: bool = False):
     logger.info("Starting document indexing...")
     try:
         rag = ClaudeRAG()
         # Default path data/documents relative to project root
         doc_path = "data/documents"
-        stats = rag.reindex_all(folder_path=doc_path)
+        if full:
+            stats = rag.reindex_all(folder_path=doc_path)
+        else:
+            stats = rag.reindex_incremental(folder_path=doc_path)
         logger.info(f"Indexing complete. Stats: {stats}")
     except Exception as e:
         logger.error(f"Error indexing documents: {e}")
@@ -91,7 +94,8 @@ def main():
     
     parser.add_argument("--init-db", action="store_true", help="Initialize database tables")
     parser.add_argument("--create-admin", action="store_true", help="Create default admin user")
-    parser.add_argument("--index-docs", action="store_true", help="Index documents from data/documents")
+    parser.add_argument("--index-docs", action="store_true", help="Index new/changed documents from data/documents")
+    parser.add_argument("--full-reindex", action="store_true", help="With --index-docs, drop the collection and rebuild it")
     parser.add_argument("--test-query", type=str, help="Run a test query")
     
     args = parser.parse_args()
@@ -108,7 +112,7 @@ def main():
         create_admin_user()
         
     if args.index_docs:
-        index_documents()
+        index_documents(full=args.full_reindex)
         
     if args.test_query:
         run_test_query(args.test_query)
@@ -0,0 +1,203 @@
+import os
+import re
+import math
+import pickle
+import logging
+import threading
+import time
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple, Iterable
+
+import snowballstemmer
+
+logger = logging.getLogger(__name__)
+
+# Words kept together: product codes such as "SKU-1234", "AB.12/3" or "v2_final"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+SPANISH_STOPWORDS = {
+    "a", "al", "algo", "ante", "como", "con", "cual", "de", "del", "desde", "donde", "e", "el",
+    "ella", "en", "entre", "es", "esa", "ese", "esta", "este", "esto", "fue", "ha", "hay", "la",
+    "las", "le", "les", "lo", "los", "mas", "me", "mi", "muy", "nos", "o", "para", "pero", "por",
+    "que", "se", "ser", "si", "sin", "sobre", "son", "su", "sus", "te", "tu", "un", "una", "uno",
+    "unos", "unas", "y", "ya", "yo", "the", "of", "and", "to", "in", "is", "for"
+}
+
+_stemmer = snowballstemmer.stemmer("spanish")
+
+
+def strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=100_000)
+def _stem(word: str) -> str:
+    return _stemmer.stemWord(word)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Spanish-aware tokenization: lowercase, strip accents, drop stopwords and stem words.
+    Tokens containing digits (codes, SKUs, contract numbers) are kept verbatim, and
+    compound codes are also indexed by their parts.
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(strip_accents(text.lower())):
+        if any(c.isdigit() for c in token):
+            tokens.append(token)
+            parts = re.split(r"[-_./]", token)
+            if len(parts) > 1:
+                tokens.extend(part for part in parts if part)
+        elif token not in SPANISH_STOPWORDS and len(token) > 1:
+            tokens.append(_stem(token))
+    return tokens
+
+
+class BM25Index:
+    """
+    Persistent BM25 (Okapi) inverted index over chunk texts, kept in sync with the
+    vector collection by chunk ID.
+    """
+
+    def __init__(self, index_path: Optional[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the index, loading it from disk if it exists.
+
+        Args:
+            index_path (Optional[str]): Path of the pickle file backing the index (None for
+                an in-memory index, e.g. one being rebuilt).
+            k1 (float): Term frequency saturation.
+            b (float): Document length normalization.
+        """
+        self.index_path = index_path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._last_save = 0.0
+        self.clear()
+        self.load()
+
+    def clear(self):
+        """Remove every document from the index."""
+        with self._lock:
+            self.postings: Dict[str, Dict[str, int]] = {}
+            self.doc_terms: Dict[str, List[str]] = {}
+            self.doc_lengths: Dict[str, int] = {}
+            self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def load(self):
+        """Load the index from disk. A missing or corrupt file yields an empty index."""
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                data = pickle.load(f)
+            with self._lock:
+                self.postings = data["postings"]
+                self.doc_terms = data["doc_terms"]
+                self.doc_lengths = data["doc_lengths"]
+                self.total_length = sum(self.doc_lengths.values())
+            logger.info(f"BM25 index loaded: {len(self)} chunks, {len(self.postings)} terms")
+        except Exception as e:
+            logger.warning(f"Could not load BM25 index {self.index_path}, starting empty: {e}")
+            self.clear()
+
+    def save(self):
+        """Persist the index atomically."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with self._lock:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {"postings": self.postings, "doc_terms": self.doc_terms, "doc_lengths": self.doc_lengths},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, self.index_path)
+            self._last_save = time.time()
+
+    def replace(self, other: "BM25Index"):
+        """Take over the documents of other in one step, so searches never see a partial index."""
+        with self._lock:
+            self.postings = other.postings
+            self.doc_terms = other.doc_terms
+            self.doc_lengths = other.doc_lengths
+            self.total_length = other.total_length
+
+    def save_if_due(self, interval_seconds: float = 5.0):
+        """Persist the index unless it was saved less than interval_seconds ago."""
+        if time.time() - self._last_save >= interval_seconds:
+            self.save()
+
+    def add(self, ids: List[str], texts: List[str]):
+        """Index (or re-index) chunks by ID."""
+        with self._lock:
+            for doc_id, text in zip(ids, texts):
+                if doc_id in self.doc_lengths:
+                    self._remove(doc_id)
+                counts = Counter(tokenize(text))
+                for term, tf in counts.items():
+                    self.postings.setdefault(term, {})[doc_id] = tf
+                self.doc_terms[doc_id] = list(counts)
+                length = sum(counts.values())
+                self.doc_lengths[doc_id] = length
+                self.total_length += length
+
+    def delete(self, ids: Iterable[str]):
+        """Remove chunks by ID (unknown IDs are ignored)."""
+        with self._lock:
+            for doc_id in ids:
+                if doc_id in self.doc_lengths:
+                    self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        for term in self.doc_terms.pop(doc_id, []):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+
+    def search(self, query: str, top_k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Score chunks against the query with BM25.
+
+        Returns:
+            List[Tuple[str, float]]: (chunk ID, score) pairs, best first.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self.doc_lengths)
+            if not terms or not n_docs:
+                return []
+            avg_length = self.total_length / n_docs
+            scores: Dict[str, float] = {}
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse several ranked ID lists: score(id) = sum over lists of 1 / (k + rank).
+
+    Returns:
+        List[Tuple[str, float]]: (ID, fused score) pairs, best first.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
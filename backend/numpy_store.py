@@ -0,0 +1,351 @@
+import os
+import pickle
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from backend.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+SCORE_BLOCK_ROWS = 65536
+
+
+def _comparable(value: Any, expected: Any) -> bool:
+    """Range operators only compare numbers with numbers and strings with strings."""
+    if isinstance(value, bool) or isinstance(expected, bool):
+        return False
+    if isinstance(value, (int, float)) and isinstance(expected, (int, float)):
+        return True
+    return isinstance(value, str) and isinstance(expected, str)
+
+
+def matches_where(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a Chroma-style metadata filter against one metadata dict.
+    Same semantics as pgvector_store.where_to_sql: missing keys only match $ne / $nin,
+    and range operators never match values of another type.
+    """
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, expected in condition.items():
+                if op == "$eq":
+                    if key not in metadata or value != expected:
+                        return False
+                elif op == "$ne":
+                    if key in metadata and value == expected:
+                        return False
+                elif op == "$in":
+                    if key not in metadata or value not in expected:
+                        return False
+                elif op == "$nin":
+                    if key in metadata and value in expected:
+                        return False
+                elif op in ("$gt", "$gte", "$lt", "$lte"):
+                    if not _comparable(value, expected):
+                        return False
+                    if op == "$gt" and not value > expected:
+                        return False
+                    if op == "$gte" and not value >= expected:
+                        return False
+                    if op == "$lt" and not value < expected:
+                        return False
+                    if op == "$lte" and not value <= expected:
+                        return False
+                else:
+                    raise ValueError(f"Unsupported metadata filter operator '{op}'")
+    return True
+
+
+def matches_where_document(document: str, where_document: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Chroma-style document content filter ($contains / $not_contains / $and / $or)."""
+    if not where_document:
+        return True
+    for op, operand in where_document.items():
+        if op == "$contains":
+            if operand not in document:
+                return False
+        elif op == "$not_contains":
+            if operand in document:
+                return False
+        elif op == "$and":
+            if not all(matches_where_document(document, clause) for clause in operand):
+                return False
+        elif op == "$or":
+            if not any(matches_where_document(document, clause) for clause in operand):
+                return False
+        else:
+            raise ValueError(f"Unsupported document filter operator '{op}'")
+    return True
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact-search vector store for small and medium corpora: a contiguous matrix of
+    normalized vectors scored with one matrix-vector product, top-k picked with
+    argpartition.
+
+    On disk (inside path):
+        vectors.npy  -> (rows x dim) float32/float16 matrix, memory-mapped when loaded
+        records.pkl  -> ids, documents and metadatas, one entry per row
+
+    Without a path the store lives only in memory (snapshot() is a no-op), which
+    makes it a cheap stand-in for tests and benchmarks.
+    """
+
+    name = "numpy"
+
+    def __init__(self, path: Optional[str], dtype: str = "float32"):
+        """
+        Initialize the store, loading it from disk if it exists.
+
+        Args:
+            path (Optional[str]): Directory holding the store files (None = in memory only).
+            dtype (str): Storage precision, "float32" or "float16".
+        """
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.vectors_path = os.path.join(path, "vectors.npy") if path else None
+        self.records_path = os.path.join(path, "records.pkl") if path else None
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None  # memmap or growable in-memory buffer
+        self._size = 0
+        self._writable = False
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._load()
+
+    def _load(self):
+        if not self.path or not (os.path.exists(self.vectors_path) and os.path.exists(self.records_path)):
+            return
+        try:
+            with open(self.records_path, "rb") as f:
+                records = pickle.load(f)
+            matrix = np.load(self.vectors_path, mmap_mode="r")
+            self.ids, self.documents, self.metadatas = records["ids"], records["documents"], records["metadatas"]
+            self._matrix = matrix
+            self._size = len(self.ids)
+            self._rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+            logger.info(f"NumPy vector store loaded: {self._size} vectors from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load NumPy vector store at {self.path}, starting empty: {e}")
+            self.reset()
+
+    def reset(self):
+        """Drop every vector (in memory; call snapshot() to persist)."""
+        with self._lock:
+            self._matrix = None
+            self._size = 0
+            self._writable = False
+            self.ids, self.documents, self.metadatas = [], [], []
+            self._rows = {}
+
+    def snapshot(self):
+        """Persist the store atomically (vectors first, then the sidecar)."""
+        if not self.path:
+            return
+        with self._lock:
+            dim = self._matrix.shape[1] if self._matrix is not None else 0
+            matrix = self._matrix[:self._size] if self._matrix is not None else np.zeros((0, dim), dtype=self.dtype)
+            tmp_vectors = os.path.join(self.path, "vectors.tmp.npy")
+            tmp_records = f"{self.records_path}.tmp"
+            np.save(tmp_vectors, np.ascontiguousarray(matrix, dtype=self.dtype))
+            with open(tmp_records, "wb") as f:
+                pickle.dump(
+                    {"ids": self.ids, "documents": self.documents, "metadatas": self.metadatas},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_vectors, self.vectors_path)
+            os.replace(tmp_records, self.records_path)
+
+    def drop(self):
+        """Drop every vector and delete the store files."""
+        with self._lock:
+            self.reset()
+            if not self.path:
+                return
+            for file_path in (self.vectors_path, self.records_path):
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            try:
+                os.rmdir(self.path)
+            except OSError:
+                pass
+
+    def count(self) -> int:
+        return self._size
+
+    def _ensure_writable(self, dim: int, extra_rows: int):
+        """Copy the memory-mapped matrix into a growable buffer with room for extra_rows."""
+        needed = self._size + extra_rows
+        if self._matrix is None:
+            self._matrix = np.zeros((max(needed, 1024), dim), dtype=self.dtype)
+            self._writable = True
+            return
+        if not self._writable or needed > self._matrix.shape[0]:
+            capacity = max(needed, 2 * self._matrix.shape[0], 1024)
+            buffer = np.zeros((capacity, self._matrix.shape[1]), dtype=self.dtype)
+            buffer[:self._size] = self._matrix[:self._size]
+            self._matrix = buffer
+            self._writable = True
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Insert or replace vectors by ID. Embeddings are required (no implicit embedding)."""
+        if not ids:
+            return
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+        documents = documents or [""] * len(ids)
+        metadatas = metadatas or [{} for _ in ids]
+        with self._lock:
+            self._ensure_writable(vectors.shape[1], len(ids))
+            for doc_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._rows[doc_id] = row
+                    self.ids.append(doc_id)
+                    self.documents.append(document)
+                    self.metadatas.append(metadata)
+                else:
+                    self.documents[row] = document
+                    self.metadatas[row] = metadata
+                self._matrix[row] = vector
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Remove vectors by ID and/or metadata filter."""
+        with self._lock:
+            if where is not None:
+                ids = self.get(ids=ids, where=where, include=[])["ids"]
+            rows = sorted({self._rows[doc_id] for doc_id in ids or [] if doc_id in self._rows})
+            if not rows:
+                return
+            keep = np.ones(self._size, dtype=bool)
+            keep[rows] = False
+            kept = np.flatnonzero(keep)
+            self._ensure_writable(self._matrix.shape[1], 0)
+            self._matrix[:len(kept)] = self._matrix[kept]
+            self.ids = [self.ids[i] for i in kept]
+            self.documents = [self.documents[i] for i in kept]
+            self.metadatas = [self.metadatas[i] for i in kept]
+            self._size = len(kept)
+            self._rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+
+    def _filter_rows(self, where, where_document) -> Optional[np.ndarray]:
+        """Rows matching the filters, or None when there is no filter."""
+        if not where and not where_document:
+            return None
+        return np.asarray([
+            row for row in range(self._size)
+            if matches_where(self.metadatas[row], where) and matches_where_document(self.documents[row], where_document)
+        ], dtype=np.int64)
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Fetch stored entries by ID and/or filters, Chroma-style."""
+        include = ["documents", "metadatas"] if include is None else include
+        with self._lock:
+            if ids is not None:
+                rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows]
+            else:
+                rows = list(range(self._size))
+            if where or where_document:
+                rows = [
+                    row for row in rows
+                    if matches_where(self.metadatas[row], where) and matches_where_document(self.documents[row], where_document)
+                ]
+            rows = rows[offset or 0:]
+            if limit is not None:
+                rows = rows[:limit]
+            return {
+                "ids": [self.ids[row] for row in rows],
+                "documents": [self.documents[row] for row in rows] if "documents" in include else None,
+                "metadatas": [self.metadatas[row] for row in rows] if "metadatas" in include else None,
+                "embeddings": [self._matrix[row].astype(np.float32).tolist() for row in rows] if "embeddings" in include else None
+            }
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Exact cosine top-k for each query, Chroma-style (distance = 1 - cosine)."""
+        include = ["documents", "metadatas", "distances"] if include is None else include
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True) + 1e-12
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": []}
+
+        with self._lock:
+            candidate_rows = self._filter_rows(where, where_document)
+            if self._size == 0 or (candidate_rows is not None and len(candidate_rows) == 0):
+                scores = np.zeros((len(queries), 0), dtype=np.float32)
+                candidate_rows = np.zeros(0, dtype=np.int64)
+            else:
+                scores = self._scores(queries, candidate_rows)
+                if candidate_rows is None:
+                    candidate_rows = np.arange(self._size)
+
+            k = min(n_results, scores.shape[1])
+            for query_scores in scores:
+                if k < len(query_scores):
+                    top = np.argpartition(-query_scores, k - 1)[:k]
+                else:
+                    top = np.arange(len(query_scores))
+                top = top[np.argsort(-query_scores[top])]
+                rows = candidate_rows[top]
+                results["ids"].append([self.ids[row] for row in rows])
+                results["documents"].append([self.documents[row] for row in rows])
+                results["metadatas"].append([self.metadatas[row] for row in rows])
+                results["distances"].append((1.0 - query_scores[top]).tolist())
+                results["embeddings"].append([self._matrix[row].astype(np.float32).tolist() for row in rows] if "embeddings" in include else None)
+
+        for field in ("documents", "metadatas", "distances", "embeddings"):
+            if field not in include:
+                results[field] = None
+        return results
+
+    def _scores(self, queries: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        """Cosine scores (queries x rows), computed block-wise in float32."""
+        total = self._size if rows is None else len(rows)
+        scores = np.empty((len(queries), total), dtype=np.float32)
+        for start in range(0, total, SCORE_BLOCK_ROWS):
+            end = min(start + SCORE_BLOCK_ROWS, total)
+            block = self._matrix[start:end] if rows is None else self._matrix[rows[start:end]]
+            scores[:, start:end] = queries @ np.asarray(block, dtype=np.float32).T
+        return scores
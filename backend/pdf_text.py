@@ -0,0 +1,121 @@
+import os
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import pypdf
+
+from backend.index_manifest import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Bump when the extraction output changes so cached texts are not reused
+EXTRACTION_VERSION = "pypdf-pages-1"
+
+
+class PdfTextCache:
+    """
+    On-disk cache of extracted PDF text, one JSON file of page texts per file
+    content hash, so unchanged PDFs are never parsed again (renames and copies
+    included).
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir (str): Directory holding the cached page texts.
+        """
+        self.cache_dir = cache_dir
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, sha256[:2], f"{sha256}.json")
+
+    def get(self, sha256: str) -> Optional[List[str]]:
+        path = self._path(sha256)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read cached PDF text {path}: {e}")
+            return None
+        return data["pages"] if data.get("version") == EXTRACTION_VERSION else None
+
+    def put(self, sha256: str, pages: List[str]):
+        path = self._path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name: several worker processes may extract the same content
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": EXTRACTION_VERSION, "pages": pages}, f)
+        os.replace(tmp_path, path)
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """Text of pages [start, end). Module-level so it can run in a worker process."""
+    reader = pypdf.PdfReader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def extract_pdf_pages(file_path: str, workers: int = 1, min_pages_parallel: int = 50) -> List[str]:
+    """
+    Extract the text of every page of a PDF.
+
+    Large PDFs are split into contiguous page ranges extracted in parallel
+    processes; each process opens the file itself, so no parsed state is pickled.
+
+    Args:
+        file_path (str): Path to the PDF.
+        workers (int): Processes used for large PDFs (1 = sequential).
+        min_pages_parallel (int): Page count from which extraction is parallelized.
+
+    Returns:
+        List[str]: One text per page ("" for pages without text).
+    """
+    reader = pypdf.PdfReader(file_path)
+    page_count = len(reader.pages)
+    workers = min(workers, page_count)
+    if workers <= 1 or page_count < min_pages_parallel:
+        return [page.extract_text() or "" for page in reader.pages]
+
+    step = -(-page_count // workers)
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [pool.submit(_extract_page_range, file_path, start, end) for start, end in ranges]
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+    return pages
+
+
+def load_pdf_pages(
+    file_path: str,
+    cache_dir: Optional[str] = None,
+    workers: int = 1,
+    min_pages_parallel: int = 50
+) -> List[str]:
+    """
+    Page texts of a PDF, read from the text cache when its content was already extracted.
+
+    Args:
+        file_path (str): Path to the PDF.
+        cache_dir (Optional[str]): Text cache directory (None = no cache).
+        workers (int): Processes used for large PDFs.
+        min_pages_parallel (int): Page count from which extraction is parallelized.
+    """
+    if cache_dir is None:
+        return extract_pdf_pages(file_path, workers, min_pages_parallel)
+
+    cache = PdfTextCache(cache_dir)
+    sha256 = file_sha256(file_path)
+    pages = cache.get(sha256)
+    if pages is None:
+        pages = extract_pdf_pages(file_path, workers, min_pages_parallel)
+        try:
+            cache.put(sha256, pages)
+        except OSError as e:
+            logger.warning(f"Could not cache PDF text of {file_path}: {e}")
+    return pages
+
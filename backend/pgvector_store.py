@@ -0,0 +1,361 @@
+import re
+import json
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from backend.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+IDENTIFIER_PATTERN = re.compile(r"^[a-z_][a-z0-9_]*$")
+COMPARISON_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+# IVFFlat is built with about one list per this many rows
+IVFFLAT_ROWS_PER_LIST = 1000
+# Upper bound pgvector accepts for hnsw.ef_search
+HNSW_MAX_EF_SEARCH = 1000
+# First pgvector release with iterative index scans (hnsw/ivfflat.iterative_scan)
+ITERATIVE_SCAN_VERSION = (0, 8, 0)
+
+
+def vector_literal(vector: List[float]) -> str:
+    """Text form of a vector accepted by CAST(... AS vector)."""
+    return "[" + ",".join(f"{float(x):.7g}" for x in vector) + "]"
+
+
+class _Params:
+    """Collects bound parameters while a filter is translated to SQL."""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+
+    def add(self, value: Any) -> str:
+        name = f"p{len(self.values)}"
+        self.values[name] = value
+        return f":{name}"
+
+
+def where_to_sql(where: Optional[Dict[str, Any]], params: _Params) -> str:
+    """
+    Translate a Chroma-style metadata filter into a SQL condition on the JSONB
+    "metadata" column. Values are compared as JSON, so numbers compare numerically.
+    """
+    if not where:
+        return "TRUE"
+    clauses = []
+    for key, condition in where.items():
+        if key in ("$and", "$or"):
+            joiner = " AND " if key == "$and" else " OR "
+            parts = [where_to_sql(clause, params) for clause in condition]
+            clauses.append("(" + (joiner.join(parts) or "TRUE") + ")")
+            continue
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        field = None
+        for op, expected in condition.items():
+            if op != "$eq" and field is None:
+                field = f"(metadata -> {params.add(key)})"
+            if op == "$eq":
+                # Containment can use the GIN index on metadata
+                clauses.append(f"metadata @> CAST({params.add(json.dumps({key: expected}))} AS jsonb)")
+            elif op == "$ne":
+                clauses.append(f"{field} IS DISTINCT FROM CAST({params.add(json.dumps(expected))} AS jsonb)")
+            elif op in ("$in", "$nin"):
+                options = " OR ".join(
+                    f"{field} = CAST({params.add(json.dumps(value))} AS jsonb)" for value in expected
+                ) or "FALSE"
+                clauses.append(f"({options})" if op == "$in" else f"NOT COALESCE(({options}), FALSE)")
+            elif op in COMPARISON_OPERATORS:
+                value = params.add(json.dumps(expected))
+                # jsonb orders values of different types by type, so require a matching type
+                clauses.append(
+                    f"(jsonb_typeof({field}) = jsonb_typeof(CAST({value} AS jsonb)) "
+                    f"AND {field} {COMPARISON_OPERATORS[op]} CAST({value} AS jsonb))"
+                )
+            else:
+                raise ValueError(f"Unsupported metadata filter operator '{op}'")
+    return " AND ".join(clauses)
+
+
+def where_document_to_sql(where_document: Optional[Dict[str, Any]], params: _Params) -> str:
+    """Translate a Chroma-style document filter ($contains / $not_contains / $and / $or) into SQL."""
+    if not where_document:
+        return "TRUE"
+    clauses = []
+    for op, operand in where_document.items():
+        if op == "$contains":
+            clauses.append(f"strpos(document, {params.add(operand)}) > 0")
+        elif op == "$not_contains":
+            clauses.append(f"strpos(document, {params.add(operand)}) = 0")
+        elif op in ("$and", "$or"):
+            joiner = " AND " if op == "$and" else " OR "
+            parts = [where_document_to_sql(clause, params) for clause in operand]
+            clauses.append("(" + (joiner.join(parts) or "TRUE") + ")")
+        else:
+            raise ValueError(f"Unsupported document filter operator '{op}'")
+    return " AND ".join(clauses)
+
+
+class PgVectorStore(VectorStore):
+    """
+    Vector store in PostgreSQL with the pgvector extension, so several stateless
+    backend instances can share one index.
+
+    One table per collection holds the chunk ID, text, JSONB metadata and the
+    embedding, with an approximate nearest neighbour index (HNSW or IVFFlat, cosine
+    distance) on the embedding and a GIN index on the metadata. Filtered retrieval
+    is a single SQL query.
+
+    IVFFlat trains its lists on the rows present when the index is built, so it is
+    built by snapshot() once the table is filled (and rebuilt when the table has
+    doubled since), never on the empty table. Until then queries scan exactly.
+    """
+
+    name = "pgvector"
+
+    def __init__(
+        self,
+        engine: Engine,
+        collection_name: str,
+        dimension: int,
+        index_type: str = "hnsw",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 64,
+        hnsw_ef_search: int = 40,
+        ivfflat_lists: int = 100,
+        ivfflat_probes: int = 10
+    ):
+        """
+        Create the extension, table and indexes if they do not exist.
+
+        Args:
+            engine (Engine): SQLAlchemy engine of a PostgreSQL database.
+            collection_name (str): Collection name; the table is "rag_<collection_name>".
+            dimension (int): Embedding dimension.
+            index_type (str): "hnsw" or "ivfflat".
+            hnsw_m (int): HNSW graph degree.
+            hnsw_ef_construction (int): HNSW build-time candidate list size.
+            hnsw_ef_search (int): HNSW query-time candidate list size (recall vs latency).
+            ivfflat_lists (int): IVFFlat inverted lists.
+            ivfflat_probes (int): IVFFlat lists scanned per query (recall vs latency).
+        """
+        if engine.dialect.name != "postgresql":
+            raise ValueError(f"The pgvector store needs a PostgreSQL database, got '{engine.dialect.name}'")
+        self.table = f"rag_{collection_name}".lower()
+        if not IDENTIFIER_PATTERN.match(self.table):
+            raise ValueError(f"Invalid collection name for a table: '{collection_name}'")
+        if index_type not in ("hnsw", "ivfflat"):
+            raise ValueError(f"Unknown pgvector index type '{index_type}'. Expected 'hnsw' or 'ivfflat'")
+
+        self.engine = engine
+        self.dimension = int(dimension)
+        self.index_type = index_type
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivfflat_lists = ivfflat_lists
+        self.ivfflat_probes = ivfflat_probes
+        self._iterative_scan: Optional[bool] = None
+        self._create_schema()
+
+    @property
+    def _vector_index_name(self) -> str:
+        return f"{self.table}_embedding_{self.index_type}_idx"
+
+    def _create_schema(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"id TEXT PRIMARY KEY, "
+                f"document TEXT NOT NULL DEFAULT '', "
+                f"metadata JSONB NOT NULL DEFAULT '{{}}'::jsonb, "
+                f"embedding vector({self.dimension}) NOT NULL)"
+            ))
+            if self.index_type == "hnsw":
+                # HNSW needs no training: built incrementally as rows arrive
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {self._vector_index_name} ON {self.table} "
+                    f"USING hnsw (embedding vector_cosine_ops) "
+                    f"WITH (m = {int(self.hnsw_m)}, ef_construction = {int(self.hnsw_ef_construction)})"
+                ))
+            # Equality filters (department, path, ...) are containment queries served by this index
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_metadata_idx ON {self.table} USING gin (metadata jsonb_path_ops)"
+            ))
+        logger.info(f"pgvector table '{self.table}' ready ({self.index_type}, dim {self.dimension})")
+
+    def _ivfflat_built_rows(self, conn) -> Optional[int]:
+        """Rows the IVFFlat index was trained on (stored in its comment), None if it does not exist."""
+        row = conn.execute(
+            text("SELECT obj_description(to_regclass(:name), 'pg_class'), to_regclass(:name) IS NOT NULL"),
+            {"name": self._vector_index_name}
+        ).one()
+        if not row[1]:
+            return None
+        match = re.match(r"rows=(\d+)", row[0] or "")
+        return int(match.group(1)) if match else 0
+
+    def snapshot(self):
+        """Build the IVFFlat index on the current rows, or rebuild it once the table has doubled."""
+        if self.index_type != "ivfflat":
+            return
+        with self.engine.begin() as conn:
+            # Replicas sharing the table must not build it concurrently
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": self.table})
+            rows = conn.execute(text(f"SELECT count(*) FROM {self.table}")).scalar_one()
+            if not rows:
+                return
+            built_rows = self._ivfflat_built_rows(conn)
+            if built_rows is not None and rows < 2 * max(built_rows, 1):
+                return
+            # About rows / 1000 lists, capped by PGVECTOR_IVFFLAT_LISTS
+            lists = min(int(self.ivfflat_lists), max(1, rows // IVFFLAT_ROWS_PER_LIST))
+            logger.info(f"Building IVFFlat index on {self.table} ({rows} rows, {lists} lists)...")
+            conn.execute(text(f"DROP INDEX IF EXISTS {self._vector_index_name}"))
+            conn.execute(text(
+                f"CREATE INDEX {self._vector_index_name} ON {self.table} "
+                f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {lists})"
+            ))
+            conn.execute(text(f"COMMENT ON INDEX {self._vector_index_name} IS 'rows={int(rows)}'"))
+
+    def _filters(self, ids, where, where_document) -> Tuple[str, _Params]:
+        params = _Params()
+        clauses = [where_to_sql(where, params), where_document_to_sql(where_document, params)]
+        if ids is not None:
+            clauses.append(f"id = ANY({params.add(list(ids))})")
+        return " AND ".join(clauses), params
+
+    def _search_settings(self, conn, n_results: int, filtered: bool):
+        """
+        Per-transaction recall/latency knobs of the ANN index.
+
+        An index scan returns at most ef_search (HNSW) or the rows of the probed lists
+        (IVFFlat) candidates before the WHERE clause is applied, so both are raised to
+        cover n_results. Filtered queries use iterative scans (pgvector >= 0.8), which
+        keep scanning until enough rows pass the filter; older versions scan exactly.
+        """
+        if self.index_type == "hnsw":
+            if n_results > HNSW_MAX_EF_SEARCH:
+                conn.execute(text("SET LOCAL enable_indexscan = off"))
+                return
+            ef_search = max(int(self.hnsw_ef_search), int(n_results))
+            conn.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+        else:
+            probes = max(int(self.ivfflat_probes), -(-int(n_results) // IVFFLAT_ROWS_PER_LIST))
+            conn.execute(text(f"SET LOCAL ivfflat.probes = {probes}"))
+        if filtered:
+            if self._supports_iterative_scan(conn):
+                # IVFFlat only supports relaxed ordering: query() sorts its rows again
+                order = "strict_order" if self.index_type == "hnsw" else "relaxed_order"
+                conn.execute(text(f"SET LOCAL {self.index_type}.iterative_scan = {order}"))
+            else:
+                conn.execute(text("SET LOCAL enable_indexscan = off"))
+
+    def _supports_iterative_scan(self, conn) -> bool:
+        if self._iterative_scan is None:
+            version = conn.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar_one_or_none() or "0"
+            parts = tuple(int(part) for part in re.findall(r"\d+", version)[:3])
+            self._iterative_scan = parts >= ITERATIVE_SCAN_VERSION
+        return self._iterative_scan
+
+    def count(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT count(*) FROM {self.table}")).scalar_one()
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        if not ids:
+            return
+        documents = documents or [""] * len(ids)
+        metadatas = metadatas or [{} for _ in ids]
+        rows = [
+            {
+                "id": doc_id,
+                "document": document,
+                "metadata": json.dumps(metadata or {}),
+                "embedding": vector_literal(embedding)
+            }
+            for doc_id, embedding, document, metadata in zip(ids, embeddings, documents, metadatas)
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"INSERT INTO {self.table} (id, document, metadata, embedding) "
+                    f"VALUES (:id, :document, CAST(:metadata AS jsonb), CAST(:embedding AS vector)) "
+                    f"ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document, "
+                    f"metadata = EXCLUDED.metadata, embedding = EXCLUDED.embedding"
+                ),
+                rows
+            )
+
+    def delete(self, ids=None, where=None):
+        if ids is None and not where:
+            return
+        condition, params = self._filters(ids, where, None)
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.table} WHERE {condition}"), params.values)
+
+    def get(self, ids=None, where=None, where_document=None, limit=None, offset=None, include=None):
+        include = ["documents", "metadatas"] if include is None else include
+        condition, params = self._filters(ids, where, where_document)
+        columns = "id, document, metadata" + (", CAST(embedding AS text)" if "embeddings" in include else "")
+        sql = f"SELECT {columns} FROM {self.table} WHERE {condition} ORDER BY id"
+        if limit is not None:
+            sql += f" LIMIT {params.add(int(limit))}"
+        if offset:
+            sql += f" OFFSET {params.add(int(offset))}"
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(sql), params.values).all()
+        return {
+            "ids": [row[0] for row in rows],
+            "documents": [row[1] for row in rows] if "documents" in include else None,
+            "metadatas": [row[2] for row in rows] if "metadatas" in include else None,
+            "embeddings": [json.loads(row[3]) for row in rows] if "embeddings" in include else None
+        }
+
+    def query(self, query_embeddings, n_results=10, where=None, where_document=None, include=None):
+        include = ["documents", "metadatas", "distances"] if include is None else include
+        condition, params = self._filters(None, where, where_document)
+        vector = params.add(None)
+        limit = params.add(int(n_results))
+        columns = f"id, document, metadata, embedding <=> CAST({vector} AS vector) AS distance"
+        if "embeddings" in include:
+            columns += ", CAST(embedding AS text)"
+        sql = text(
+            f"SELECT {columns} FROM {self.table} WHERE {condition} "
+            f"ORDER BY embedding <=> CAST({vector} AS vector) LIMIT {limit}"
+        )
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": []}
+        with self.engine.begin() as conn:
+            self._search_settings(conn, n_results, filtered=bool(where or where_document))
+            for embedding in query_embeddings:
+                values = dict(params.values)
+                values[vector[1:]] = vector_literal(embedding)
+                rows = sorted(conn.execute(sql, values).all(), key=lambda row: row[3])
+                results["ids"].append([row[0] for row in rows])
+                results["documents"].append([row[1] for row in rows])
+                results["metadatas"].append([row[2] for row in rows])
+                results["distances"].append([float(row[3]) for row in rows])
+                results["embeddings"].append([json.loads(row[4]) for row in rows] if "embeddings" in include else None)
+
+        for field in ("documents", "metadatas", "distances", "embeddings"):
+            if field not in include:
+                results[field] = None
+        return results
+
+    def reset(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE {self.table}"))
+            if self.index_type == "ivfflat":
+                # Its lists were trained on the old rows: rebuilt by the next snapshot()
+                conn.execute(text(f"DROP INDEX IF EXISTS {self._vector_index_name}"))
+
+    def drop(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {self.table}"))
@@ -1,143 +1,560 @@
 import os
 import logging
-import uuid
 import glob
-from typing import List, Dict, Any, Optional
+import hashlib
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Callable
 from datetime import datetime
 import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
-
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from chromadb.utils import embedding_functions
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
-import pypdf
 from docx import Document as DocxDocument
 import anthropic
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from backend.config import settings
+from backend.index_manifest import IndexManifest, file_sha256
+from backend.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from backend.lexical_index import BM25Index, reciprocal_rank_fusion
+from backend.reranker import CrossEncoderReranker
+from backend.reindex_jobs import ReindexJob, ReindexCancelled
+from backend.embeddings import load_embedding_model, embedding_model_id
+from backend.pdf_text import load_pdf_pages
+from backend.tokenizer import count_tokens
+from backend.document_structure import (
+    markdown_sections, docx_text_and_sections, split_sections, join_pages, page_at
+)
+from backend.vector_store import VectorStore, create_vector_store, validate_where, validate_where_document
+from backend.index_generations import IndexGeneration, create_collection_alias, new_generation_name
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# File types discovered and parsed by DocumentProcessor
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt", ".md")
+
+class ChunkIndexingError(Exception):
+    """Raised by index_documents when some batches could not be embedded or written."""
+
+    def __init__(self, failed_paths: List[str], written: int):
+        super().__init__(f"Could not index chunks of {len(failed_paths)} files")
+        self.failed_paths = failed_paths
+        self.written = written
+
+def make_chunk_id(path: str, ordinal: int, content: str) -> str:
+    """
+    Build a deterministic chunk ID from its source path, position and content,
+    so re-indexing the same file yields the same IDs.
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{path}|{ordinal}|{content_hash}".encode("utf-8")).hexdigest()[:32]
+
+def document_department(file_path: str, root_dir: Optional[str] = None) -> str:
+    """
+    Department of a document: its top-level folder under the documents root
+    ("general" for files directly in the root, parent folder name outside it).
+    """
+    if root_dir:
+        relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(root_dir))
+        if not relative.startswith(os.pardir):
+            parts = relative.split(os.sep)
+            return parts[0] if len(parts) > 1 else "general"
+    return os.path.basename(os.path.dirname(os.path.abspath(file_path))) or "general"
+
+def load_file(
+    file_path: str,
+    root_dir: Optional[str] = None,
+    pdf_cache_dir: Optional[str] = None,
+    pdf_page_workers: int = 1
+) -> Optional[Document]:
+    """
+    Load a single document file. Module-level so it can run in a worker process.
+    
+    PDF documents carry "page_starts" / "page_numbers" metadata (offsets of each page
+    in the text), turned into per-chunk page numbers when they are split. Markdown and
+    DOCX documents carry "section_starts" / "section_paths" from their headings.
+    
+    Args:
+        file_path (str): Path to the file.
+        root_dir (Optional[str]): Documents root, used to derive the department.
+        pdf_cache_dir (Optional[str]): Extracted PDF text cache (None = no cache).
+        pdf_page_workers (int): Processes used to extract the pages of large PDFs.
+        
+    Returns:
+        Optional[Document]: The loaded document, or None if it is empty or unreadable.
+    """
+    try:
+        ext = os.path.splitext(file_path)[1].lower()
+        content = ""
+        stat = os.stat(file_path)
+        # Flat, typed metadata so collection "where" filters can use it
+        metadata = {
+            "source": os.path.basename(file_path),
+            "path": file_path,
+            "size": stat.st_size,
+            "type": ext,
+            "department": document_department(file_path, root_dir),
+            "modified_at": stat.st_mtime
+        }
+        
+        if ext == '.pdf':
+            pages = load_pdf_pages(
+                file_path,
+                cache_dir=pdf_cache_dir,
+                workers=pdf_page_workers,
+                min_pages_parallel=settings.PDF_PARALLEL_MIN_PAGES
+            )
+            content, metadata["page_starts"], metadata["page_numbers"] = join_pages(pages)
+            metadata["page_count"] = len(pages)
+            
+        elif ext == '.docx':
+            doc = DocxDocument(file_path)
+            content, metadata["section_starts"], metadata["section_paths"] = docx_text_and_sections(doc.paragraphs)
+            
+        elif ext in ['.txt', '.md']:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            if ext == '.md':
+                metadata["section_starts"], metadata["section_paths"] = markdown_sections(content)
+        
+        if content.strip():
+            return Document(page_content=content, metadata=metadata)
+            
+    except Exception as e:
+        logger.error(f"Error loading file {file_path}: {e}")
+        
+    return None
+
+def mmr_select(
+    query_embedding: List[float],
+    candidates: List[Dict[str, Any]],
+    top_k: int,
+    lambda_mult: float = 0.7
+) -> List[Dict[str, Any]]:
+    """
+    Maximal marginal relevance: greedily pick candidates maximizing
+    lambda * sim(query, c) - (1 - lambda) * max sim(c, already picked).
+    
+    Args:
+        query_embedding (List[float]): Query vector.
+        candidates (List[Dict]): Results carrying an "embedding" key.
+        top_k (int): Number of candidates to pick.
+        lambda_mult (float): 1.0 = relevance only, 0.0 = diversity only.
+        
+    Returns:
+        List[Dict]: Picked candidates in selection order.
+    """
+    if len(candidates) <= 1:
+        return candidates[:top_k]
+        
+    vectors = np.array([c["embedding"] for c in candidates], dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-12
+    query = np.array(query_embedding, dtype=np.float32)
+    query /= np.linalg.norm(query) + 1e-12
+    
+    relevance = vectors @ query
+    similarity = vectors @ vectors.T
+    selected = [int(np.argmax(relevance))]
+    while len(selected) < min(top_k, len(candidates)):
+        redundancy = similarity[:, selected].max(axis=1)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[selected] = -np.inf
+        selected.append(int(np.argmax(scores)))
+    return [candidates[i] for i in selected]
+
 class DocumentProcessor:
     """
-    Handles document loading, chunking, embedding, and indexing into ChromaDB.
+    Handles document loading, chunking, embedding, and indexing into the configured vector store.
     """
     
-    def __init__(self, persistence_path: str = "data/chroma_db"):
+    def __init__(self, persistence_path: str = "data/chroma_db", documents_path: str = "data/documents"):
         """
         Initialize the DocumentProcessor.
         
         Args:
-            persistence_path (str): Path to persist ChromaDB data.
+            persistence_path (str): Path to persist ChromaDB data (and the other indexes).
+            documents_path (str): Documents root; top-level folders become the "department" metadata.
         """
         self.persistence_path = persistence_path
+        self.documents_path = os.path.abspath(documents_path)
         
-        # Initialize ChromaDB Client
-        # Using persistent client
-        logger.info(f"Initializing ChromaDB Client at {self.persistence_path}...")
-        try:
-            self.chroma_client = chromadb.PersistentClient(path=self.persistence_path)
-        except Exception as e:
-            logger.error(f"Failed to initialize ChromaDB: {e}")
-            raise
-
         # Initialize Embedding Model
         # using the requested model: sentence-transformers/all-MiniLM-L6-v2
         model_name = "sentence-transformers/all-MiniLM-L6-v2"
+        self.model_name = model_name
         logger.info(f"Loading embedding model: {model_name}...")
         try:
-            self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+            # Model used to embed chunks and queries explicitly (PyTorch or quantized ONNX)
+            self.embedding_model = load_embedding_model(
+                model_name, backend=settings.EMBEDDING_BACKEND, onnx_file=settings.EMBEDDING_ONNX_FILE
+            )
+            self.embedding_model_id = embedding_model_id(
+                model_name, backend=settings.EMBEDDING_BACKEND, onnx_file=settings.EMBEDDING_ONNX_FILE
+            )
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise
             
-        # Get or Create Collection
+        # Vector store selected in settings (Chroma by default). "company_docs" is an alias:
+        # full rebuilds create a new versioned generation and switch the alias to it.
+        # Shared stores keep the alias in the database so every replica follows the switch.
         self.collection_name = "company_docs"
-        self.collection = self.chroma_client.get_or_create_collection(
-            name=self.collection_name,
-            embedding_function=self.embedding_fn
+        self.aliases = create_collection_alias(self.persistence_path)
+        self._generation_lock = threading.Lock()
+        self._follow_lock = threading.Lock()
+        self._alias_checked_at = 0.0
+        # Change version of the served collection this replica's BM25 index reflects
+        name, self._index_version = self.aliases.state(self.collection_name)
+        self.generation = self.open_generation(name)
+        logger.info(f"Collection '{self.generation.name}' ready ({settings.VECTOR_STORE}). Count: {self.vector_store.count()}")
+
+        # Manifest of indexed files, used for incremental reindexing
+        self.manifest = IndexManifest(os.path.join(self.persistence_path, "index_manifest.json"))
+
+        # Cumulative embedding throughput counters
+        self.embedding_stats = {"chunks_embedded": 0, "embedding_seconds": 0.0}
+
+        # On-disk cache of chunk embeddings keyed by (model, normalized text hash)
+        self.embedding_cache = None
+        if settings.EMBEDDING_CACHE_ENABLED:
+            self.embedding_cache = EmbeddingCache(
+                os.path.join(self.persistence_path, "embedding_cache"), self.embedding_model_id
+            )
+
+        # Extracted PDF page texts keyed by file hash: unchanged PDFs are not parsed again
+        self.pdf_text_cache_dir = None
+        if settings.PDF_TEXT_CACHE_ENABLED:
+            self.pdf_text_cache_dir = os.path.join(self.persistence_path, "pdf_text_cache")
+
+        # LRU cache of query embeddings (users repeat the same questions)
+        self.query_cache = QueryEmbeddingCache(max_size=settings.QUERY_EMBEDDING_CACHE_SIZE)
+
+        # BM25 index kept in sync with the collection, for hybrid lexical + vector retrieval
+        if settings.HYBRID_SEARCH_ENABLED and len(self.lexical_index) != self.vector_store.count():
+            self.rebuild_lexical_index()
+
+    @property
+    def vector_store(self) -> VectorStore:
+        """Vector store of the generation currently served."""
+        return self.generation.vector_store
+
+    @property
+    def lexical_index(self) -> BM25Index:
+        """BM25 index of the generation currently served."""
+        return self.generation.lexical_index
+
+    def open_generation(self, name: str) -> IndexGeneration:
+        """
+        Open (or create) the vector store collection and BM25 index of a generation.
+        
+        Args:
+            name (str): Physical collection name.
+        """
+        vector_store = create_vector_store(
+            settings.VECTOR_STORE,
+            self.persistence_path,
+            name,
+            self.model_name,
+            dimension=self.embedding_model.get_sentence_embedding_dimension()
         )
-        logger.info(f"Collection '{self.collection_name}' ready. Count: {self.collection.count()}")
+        # Indexes built before generations existed keep their original file name
+        lexical_file = "bm25_index.pkl" if name == self.collection_name else f"bm25_index_{name}.pkl"
+        lexical_index = BM25Index(os.path.join(self.persistence_path, lexical_file))
+        return IndexGeneration(name, vector_store, lexical_index)
 
-    def load_documents(self, folder_path: str) -> List[Document]:
+    def create_generation(self) -> IndexGeneration:
         """
-        Load documents from the specified folder path recursively.
+        Create an empty, versioned shadow generation to build a full reindex into.
+        It is not searched until promote_generation() switches the alias to it.
+        """
+        name = new_generation_name(self.collection_name)
+        if name == self.generation.name:
+            # reset() below would empty the collection being served
+            raise RuntimeError(f"Shadow generation name '{name}' is the one being served")
+        generation = self.open_generation(name)
+        generation.vector_store.reset()
+        generation.lexical_index.clear()
+        logger.info(f"Building shadow generation '{generation.name}'")
+        return generation
+
+    @contextmanager
+    def reading(self) -> Iterator[IndexGeneration]:
+        """
+        Generation to search, kept alive (not dropped) until the block exits.
+        Also follows alias switches and index writes made by another process or replica.
+        """
+        self._follow_alias()
+        with self._generation_lock:
+            generation = self.generation
+            generation.acquire()
+        try:
+            yield generation
+        finally:
+            generation.release()
+
+    def _follow_alias(self, interval_seconds: float = 2.0):
+        now = time.time()
+        if now - self._alias_checked_at < interval_seconds:
+            return
+        self._alias_checked_at = now
+        # Searches arriving during a switch keep using the current generation
+        if not self._follow_lock.acquire(blocking=False):
+            return
+        try:
+            name, version = self.aliases.state(self.collection_name)
+            if name == self.generation.name:
+                # Another replica indexed or deleted documents in the shared store:
+                # the BM25 index on this replica's disk does not have them
+                if version != self._index_version and settings.HYBRID_SEARCH_ENABLED:
+                    self.rebuild_lexical_index()
+                self._index_version = version
+                return
+            logger.info(f"Collection alias now points to '{name}', switching.")
+            generation = self.open_generation(name)
+            # The BM25 index of a generation built by another replica is not on this disk
+            if settings.HYBRID_SEARCH_ENABLED and len(generation.lexical_index) != generation.vector_store.count():
+                self.rebuild_lexical_index(generation=generation)
+            with self._generation_lock:
+                self.generation = generation
+            self._index_version = version
+        except Exception as e:
+            logger.warning(f"Could not follow collection alias: {e}")
+        finally:
+            self._follow_lock.release()
+
+    def validate_generation(self, generation: IndexGeneration, expected_chunks: int, samples: int = 5) -> Tuple[bool, str]:
+        """
+        Check a shadow generation before serving it: chunk count, BM25 index in sync,
+        and sample queries (stored vectors must retrieve their own chunk).
+        
+        Returns:
+            Tuple[bool, str]: Whether it can be promoted, and why not.
+        """
+        count = generation.vector_store.count()
+        if count < expected_chunks:
+            return False, f"collection has {count} chunks, expected {expected_chunks}"
+        if count == 0 and self.vector_store.count() > 0:
+            return False, "new collection is empty"
+        if settings.HYBRID_SEARCH_ENABLED and len(generation.lexical_index) != count:
+            return False, f"BM25 index has {len(generation.lexical_index)} chunks, collection {count}"
+        if count == 0:
+            return True, ""
+            
+        sample = generation.vector_store.get(limit=samples, include=["embeddings"])
+        results = generation.vector_store.query(
+            query_embeddings=sample["embeddings"],
+            n_results=min(5, count),
+            include=["distances"]
+        )
+        found = sum(1 for doc_id, ids in zip(sample["ids"], results["ids"]) if doc_id in ids)
+        if found < len(sample["ids"]):
+            return False, f"sample queries found {found}/{len(sample['ids'])} chunks"
+        return True, ""
+
+    def promote_generation(self, generation: IndexGeneration, drain_timeout: float = 120.0):
+        """
+        Atomically switch searches to generation, then drop the previous one once its
+        in-flight searches have finished. With a shared vector store the previous one is
+        kept GENERATION_DROP_DELAY_SECONDS longer, until the other replicas have switched.
+        
+        Args:
+            generation (IndexGeneration): Validated shadow generation.
+            drain_timeout (float): Max seconds to wait for in-flight searches on the old generation.
+        """
+        with self._generation_lock:
+            previous = self.generation
+            self.aliases.set(self.collection_name, generation.name)
+            self.generation = generation
+            self._index_version = self.aliases.state(self.collection_name)[1]
+        logger.info(f"Collection alias '{self.collection_name}' -> '{generation.name}' (was '{previous.name}')")
+        
+        if previous.name == generation.name:
+            return
+        if self.aliases.shared:
+            time.sleep(settings.GENERATION_DROP_DELAY_SECONDS)
+        if not previous.wait_idle(timeout=drain_timeout):
+            logger.warning(f"{previous.readers} searches still running on '{previous.name}' after {drain_timeout}s; dropping it anyway.")
+        try:
+            previous.drop()
+        except Exception as e:
+            logger.warning(f"Could not drop old generation '{previous.name}': {e}")
+
+    def discard_generation(self, generation: IndexGeneration):
+        """Drop a shadow generation that will not be promoted."""
+        if generation.name == self.generation.name:
+            logger.error(f"Refusing to drop generation '{generation.name}': it is being served")
+            return
+        try:
+            generation.drop()
+        except Exception as e:
+            logger.warning(f"Could not drop shadow generation '{generation.name}': {e}")
+
+    def persist_indexes(self, generation: Optional[IndexGeneration] = None):
+        """
+        Flush in-process indexes to disk (a no-op snapshot for stores that persist every write).
+        
+        Args:
+            generation (Optional[IndexGeneration]): Generation to flush. Defaults to the one served.
+        """
+        served = generation is None or generation is self.generation
+        generation = generation or self.generation
+        generation.lexical_index.save()
+        generation.vector_store.snapshot()
+        if served and self.aliases.shared:
+            self._publish_write()
+
+    def _publish_write(self):
+        """Tell the other replicas the served collection changed, so they refresh their BM25 index."""
+        try:
+            version = self.aliases.bump(self.collection_name)
+        except Exception as e:
+            logger.warning(f"Could not publish index change to other replicas: {e}")
+            return
+        # Only skip our own refresh if no other replica wrote in between
+        if version == self._index_version + 1:
+            self._index_version = version
+
+    def discover_files(self, folder_path: str) -> List[str]:
+        """
+        List supported document files under the folder path recursively.
         Supports: .pdf, .docx, .txt, .md
         
         Args:
             folder_path (str): Path to the documents folder.
             
         Returns:
-            List[Document]: List of LangChain Document objects.
+            List[str]: Sorted absolute file paths.
         """
-        documents = []
         folder_path = os.path.abspath(folder_path)
         
         if not os.path.exists(folder_path):
             logger.warning(f"Folder path does not exist: {folder_path}")
             return []
 
-        # Supported extensions
-        extensions = ['*.pdf', '*.docx', '*.txt', '*.md']
         files = []
-        for ext in extensions:
+        for ext in SUPPORTED_EXTENSIONS:
             # Recursive search for each extension
-            files.extend(glob.glob(os.path.join(folder_path, '**', ext), recursive=True))
+            files.extend(glob.glob(os.path.join(folder_path, '**', f'*{ext}'), recursive=True))
             
         logger.info(f"Found {len(files)} documents in {folder_path}")
+        return sorted(files)
+
+    def load_file(self, file_path: str) -> Optional[Document]:
+        """
+        Load a single document file.
         
-        for file_path in tqdm(files, desc="Loading documents"):
-            try:
-                ext = os.path.splitext(file_path)[1].lower()
-                content = ""
-                metadata = {
-                    "source": os.path.basename(file_path),
-                    "path": file_path,
-                    "size": os.path.getsize(file_path),
-                    "type": ext
-                }
-                
-                if ext == '.pdf':
-                    reader = pypdf.PdfReader(file_path)
-                    for i, page in enumerate(reader.pages):
-                        text = page.extract_text()
-                        if text:
-                            content += text + "\n"
-                            
-                elif ext == '.docx':
-                    doc = DocxDocument(file_path)
-                    content = "\n".join([para.text for para in doc.paragraphs])
+        Args:
+            file_path (str): Path to the file.
+            
+        Returns:
+            Optional[Document]: The loaded document, or None if it is empty or unreadable.
+        """
+        return load_file(file_path, self.documents_path, self.pdf_text_cache_dir, self.pdf_page_workers)
+
+    @property
+    def pdf_page_workers(self) -> int:
+        """Processes used to extract the pages of a large PDF (0 in settings = one per CPU core)."""
+        return settings.PDF_PAGE_WORKERS or os.cpu_count() or 1
+
+    def iter_documents(self, file_paths: List[str], workers: Optional[int] = None) -> Iterator[Tuple[str, Optional[Document]]]:
+        """
+        Lazily load files, parsing them in a process pool.
+        At most settings.INGEST_QUEUE_SIZE files are parsed ahead of the consumer, so memory
+        stays bounded while parsing overlaps with chunking/embedding downstream.
+        
+        Args:
+            file_paths (List[str]): Files to load.
+            workers (Optional[int]): Pool size. Defaults to settings.INGEST_WORKERS (0 = CPU count).
+            
+        Yields:
+            Tuple[str, Optional[Document]]: (file path, document or None if empty/unreadable), in input order.
+        """
+        if workers is None:
+            workers = settings.INGEST_WORKERS
+        workers = min(workers or os.cpu_count() or 1, len(file_paths))
+        
+        if workers <= 1:
+            # Files one at a time (e.g. a single upload): large PDFs use the cores page by page
+            for path in file_paths:
+                yield path, self.load_file(path)
+            return
+            
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            def submit(path):
+                try:
+                    return pool.submit(load_file, path, self.documents_path, self.pdf_text_cache_dir)
+                except Exception:
+                    # Pool is broken; the file will be loaded in-process
+                    return None
                     
-                elif ext in ['.txt', '.md']:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                
-                if content.strip():
-                    documents.append(Document(page_content=content, metadata=metadata))
+            paths = iter(file_paths)
+            in_flight = deque(
+                (path, submit(path)) for path in islice(paths, max(workers, settings.INGEST_QUEUE_SIZE))
+            )
+            while in_flight:
+                path, future = in_flight.popleft()
+                try:
+                    document = future.result() if future is not None else load_file(path, self.documents_path, self.pdf_text_cache_dir)
+                except Exception as e:
+                    # A worker died (e.g. killed by the OS); retry this file in-process
+                    logger.error(f"Parallel loading of {path} failed, retrying in-process: {e}")
+                    document = load_file(path, self.documents_path, self.pdf_text_cache_dir)
                     
-            except Exception as e:
-                logger.error(f"Error loading file {file_path}: {e}")
-                continue
-                
+                next_path = next(paths, None)
+                if next_path is not None:
+                    in_flight.append((next_path, submit(next_path)))
+                yield path, document
+
+    def load_files(self, file_paths: List[str], workers: Optional[int] = None) -> List[Document]:
+        """
+        Load several files, parsing them in a process pool.
+        Output order follows the input order; unreadable files are skipped.
+        
+        Args:
+            file_paths (List[str]): Files to load.
+            workers (Optional[int]): Pool size. Defaults to settings.INGEST_WORKERS (0 = CPU count).
+            
+        Returns:
+            List[Document]: Loaded documents.
+        """
+        documents = tqdm(self.iter_documents(file_paths, workers), total=len(file_paths), desc="Loading documents")
+        return [document for _, document in documents if document is not None]
+
+    def load_documents(self, folder_path: str) -> List[Document]:
+        """
+        Load documents from the specified folder path recursively.
+        Supports: .pdf, .docx, .txt, .md
+        
+        Args:
+            folder_path (str): Path to the documents folder.
+            
+        Returns:
+            List[Document]: List of LangChain Document objects.
+        """
+        files = self.discover_files(folder_path)
+        documents = self.load_files(files)
+        
         logger.info(f"Successfully loaded {len(documents)} documents.")
         return documents
 
-    def chunk_documents(self, documents: List[Document], chunk_size: int = 500, overlap: int = 50) -> List[Document]:
+    def chunk_documents(self, documents: List[Document], chunk_size: Optional[int] = None, overlap: Optional[int] = None) -> List[Document]:
         """
         Split documents into chunks.
         
         Args:
             documents (List[Document]): List of documents to chunk.
-            chunk_size (int): Max token/character size for chunks.
-            overlap (int): Overlap between chunks.
+            chunk_size (Optional[int]): Max chunk size, in characters or tokens depending on
+                settings.CHUNKING_MODE. Defaults to the size configured for that mode.
+            overlap (Optional[int]): Overlap between chunks, in the same unit.
             
         Returns:
             List[Document]: List of chunked documents.
@@ -145,41 +562,165 @@ class DocumentProcessor:
         if not documents:
             return []
             
+        chunks = self._split_documents(documents, chunk_size, overlap)
+        logger.info(f"Split {len(documents)} documents into {len(chunks)} chunks.")
+        return chunks
+
+    def _count_tokens(self, text: str) -> int:
+        return count_tokens(text, settings.CHUNK_TOKENIZER)
+
+    def _split_documents(self, documents: List[Document], chunk_size: Optional[int] = None, overlap: Optional[int] = None) -> List[Document]:
+        """
+        Split documents, number the chunks of each source file, tag PDF chunks with their
+        pages and Markdown/DOCX chunks with their heading path, and record the token count
+        of every chunk (used to budget the prompt context).
+        """
+        if settings.CHUNKING_MODE == "tokens":
+            length_function = self._count_tokens
+            chunk_size = chunk_size or settings.CHUNK_SIZE_TOKENS
+            overlap = settings.CHUNK_OVERLAP_TOKENS if overlap is None else overlap
+        else:
+            length_function = len
+            chunk_size = chunk_size or settings.CHUNK_SIZE
+            overlap = settings.CHUNK_OVERLAP if overlap is None else overlap
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=overlap,
-            length_function=len, # Can use tiktoken if precise token counting is needed, but len is fast approx
-            separators=["\n\n", "\n", " ", ""]
+            length_function=length_function,
+            separators=["\n\n", "\n", " ", ""],
+            add_start_index=True
         )
         
-        chunks = text_splitter.split_documents(documents)
-        logger.info(f"Split {len(documents)} documents into {len(chunks)} chunks.")
+        chunks = []
+        for document in documents:
+            # Page and section offsets are lists (not valid collection metadata): keep them out of the chunks
+            metadata = dict(document.metadata)
+            page_starts = metadata.pop("page_starts", None)
+            page_numbers = metadata.pop("page_numbers", None)
+            section_starts = metadata.pop("section_starts", None)
+            section_paths = metadata.pop("section_paths", None)
+            
+            # Structure-aware: split each heading section on its own so chunks never mix sections
+            if settings.STRUCTURED_CHUNKING_ENABLED and section_starts:
+                sections = split_sections(document.page_content, section_starts, section_paths)
+            else:
+                sections = [(0, document.page_content, "")]
+                
+            for offset, text, section in sections:
+                section_metadata = dict(metadata, section=section) if section else metadata
+                for chunk in text_splitter.split_documents([Document(page_content=text, metadata=section_metadata)]):
+                    start = chunk.metadata.pop("start_index", -1)
+                    if start >= 0:
+                        start += offset
+                    if page_starts and start >= 0:
+                        chunk.metadata["page"] = page_at(start, page_starts, page_numbers)
+                        chunk.metadata["page_end"] = page_at(start + len(chunk.page_content) - 1, page_starts, page_numbers)
+                    chunk.metadata["token_count"] = self._count_tokens(chunk.page_content)
+                    chunks.append(chunk)
+        
+        # Number chunks per source file (used for deterministic IDs)
+        ordinals: Dict[str, int] = {}
+        for chunk in chunks:
+            path = chunk.metadata.get("path", chunk.metadata.get("source", ""))
+            chunk.metadata["chunk_index"] = ordinals.get(path, 0)
+            ordinals[path] = chunk.metadata["chunk_index"] + 1
+            
         return chunks
 
-    def index_documents(self, chunks: List[Document]) -> int:
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts with the sentence-transformers model in batches of
+        settings.EMBEDDING_BATCH_SIZE, returning L2-normalized vectors.
+        Texts already in the embedding cache are not sent to the model.
+        
+        Args:
+            texts (List[str]): Texts to embed.
+            
+        Returns:
+            List[List[float]]: One vector per text.
+        """
+        if not texts:
+            return []
+            
+        vectors = self.embedding_cache.get_many(texts) if self.embedding_cache else [None] * len(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if not missing:
+            return vectors
+            
+        missing_texts = [texts[i] for i in missing]
+        start = time.perf_counter()
+        encoded = self.embedding_model.encode(
+            missing_texts,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).tolist()
+        elapsed = time.perf_counter() - start
+        
+        self.embedding_stats["chunks_embedded"] += len(missing_texts)
+        self.embedding_stats["embedding_seconds"] += elapsed
+        logger.debug(f"Embedded {len(missing_texts)} chunks in {elapsed:.2f}s ({len(missing_texts) / max(elapsed, 1e-9):.1f} chunks/sec)")
+        
+        if self.embedding_cache:
+            self.embedding_cache.put_many(missing_texts, encoded)
+        for i, vector in zip(missing, encoded):
+            vectors[i] = vector
+        return vectors
+
+    def embedding_throughput(self, since: Optional[Dict[str, float]] = None) -> float:
+        """
+        Chunks embedded per second, overall or since a previous snapshot of embedding_stats.
+        """
+        since = since or {"chunks_embedded": 0, "embedding_seconds": 0.0}
+        chunks = self.embedding_stats["chunks_embedded"] - since["chunks_embedded"]
+        seconds = self.embedding_stats["embedding_seconds"] - since["embedding_seconds"]
+        return round(chunks / seconds, 1) if seconds > 0 else 0.0
+
+    def embedding_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the embedding cache (zeros when disabled)."""
+        if self.embedding_cache is None:
+            return {"hits": 0, "misses": 0, "size": 0}
+        return self.embedding_cache.stats()
+
+    def index_documents(self, chunks: List[Document], generation: Optional[IndexGeneration] = None) -> int:
         """
-        Index chunks into ChromaDB.
+        Index chunks into the vector store, embedding them explicitly in batches.
         
         Args:
             chunks (List[Document]): List of document chunks.
+            generation (Optional[IndexGeneration]): Target generation. Defaults to the one served.
             
         Returns:
             int: Number of chunks indexed.
+            
+        Raises:
+            ChunkIndexingError: If some batches failed. The other batches are still written;
+                the error carries the paths of the files with missing chunks.
         """
         if not chunks:
             logger.warning("No chunks to index.")
             return 0
             
-        logger.info(f"Indexing {len(chunks)} chunks into ChromaDB...")
+        logger.info(f"Indexing {len(chunks)} chunks into the vector store...")
+        generation = generation or self.generation
+        vector_store, lexical_index = generation.vector_store, generation.lexical_index
         
         ids = []
+        paths = []
         documents_content = []
         metadatas = []
+        seen_ids = set()
         
-        for chunk in tqdm(chunks, desc="Preparing chunks"):
-            # Generate a unique ID for each chunk
-            chunk_id = str(uuid.uuid4())
+        for ordinal, chunk in enumerate(tqdm(chunks, desc="Preparing chunks")):
+            # Deterministic ID: same file, position and content -> same ID
+            path = chunk.metadata.get("path", chunk.metadata.get("source", ""))
+            chunk_id = make_chunk_id(path, chunk.metadata.get("chunk_index", ordinal), chunk.page_content)
+            if chunk_id in seen_ids:
+                continue
+            seen_ids.add(chunk_id)
             ids.append(chunk_id)
+            paths.append(path)
             
             documents_content.append(chunk.page_content)
             
@@ -187,62 +728,408 @@ class DocumentProcessor:
             meta = chunk.metadata.copy()
             meta["chunk_id"] = chunk_id
             meta["timestamp"] = datetime.now().isoformat()
+            meta["indexed_at"] = time.time()
             metadatas.append(meta)
             
-        # Add to collection in batches (Chroma handles batching reasonably well, but explicit batching is safer for huge datasets)
-        batch_size = 100
+        # Upsert in batches, skipping chunks whose ID is already stored (no re-embedding needed)
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        written = 0
+        skipped = 0
+        failed_paths = set()
         for i in tqdm(range(0, len(ids), batch_size), desc="Indexing batches"):
             end_idx = i + batch_size
             try:
-                self.collection.add(
-                    documents=documents_content[i:end_idx],
-                    metadatas=metadatas[i:end_idx],
-                    ids=ids[i:end_idx]
+                existing = set(vector_store.get(ids=ids[i:end_idx], include=[])["ids"])
+                batch = [j for j in range(i, min(end_idx, len(ids))) if ids[j] not in existing]
+                skipped += len(existing)
+                if not batch:
+                    continue
+                batch_documents = [documents_content[j] for j in batch]
+                vector_store.upsert(
+                    documents=batch_documents,
+                    embeddings=self.embed_texts(batch_documents),
+                    metadatas=[metadatas[j] for j in batch],
+                    ids=[ids[j] for j in batch]
                 )
+                lexical_index.add([ids[j] for j in batch], batch_documents)
+                written += len(batch)
             except Exception as e:
                 logger.error(f"Error indexing batch {i}-{end_idx}: {e}")
+                failed_paths.update(paths[i:end_idx])
+                
+        count = vector_store.count()
+        logger.info(f"Indexing complete. Written: {written}, already present: {skipped}. Total documents in collection: {count}")
+        if failed_paths:
+            raise ChunkIndexingError(sorted(failed_paths), written)
+        return written
+
+    def ingest_files(
+        self,
+        file_paths: List[str],
+        batch_size: Optional[int] = None,
+        on_files_committed: Optional[Callable[[List[str]], None]] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        generation: Optional[IndexGeneration] = None
+    ) -> Dict[str, int]:
+        """
+        Stream files through load -> chunk -> embed -> index.
+        Chunks are buffered only up to one batch, and each batch is written to the
+        collection as soon as it is full, so memory does not grow with corpus size
+        and an interrupted run keeps everything committed so far.
+        
+        Args:
+            file_paths (List[str]): Files to ingest.
+            batch_size (Optional[int]): Chunks per write. Defaults to settings.INGEST_BATCH_SIZE.
+            on_files_committed (Optional[Callable]): Called with the paths whose chunks are
+                all stored after each write (including empty/unreadable files). Files with
+                a chunk that failed to be written are never passed, so they are retried.
+            on_progress (Optional[Callable]): Called with (files, chunks) increments after
+                each file is read and after each write. Exceptions it raises (e.g. a
+                cancellation) stop the run; everything committed so far is kept.
+            generation (Optional[IndexGeneration]): Target generation. Defaults to the one served.
+                
+        Returns:
+            Dict: documents_loaded and chunks_indexed counts, and failed_files (paths
+            with chunks that could not be indexed).
+        """
+        batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        buffer: List[Document] = []
+        completed: List[str] = []
+        failed = set()
+        stats = {"documents_loaded": 0, "chunks_indexed": 0, "failed_files": []}
+        
+        def flush():
+            written = 0
+            if buffer:
+                try:
+                    written = self.index_documents(buffer, generation=generation)
+                except ChunkIndexingError as e:
+                    written = e.written
+                    failed.update(e.failed_paths)
+                stats["chunks_indexed"] += written
+                buffer.clear()
+            # A file whose chunks spanned several writes stays failed if any of them failed
+            committed = [path for path in completed if path not in failed]
+            if committed and on_files_committed:
+                on_files_committed(committed)
+            completed.clear()
+            if on_progress:
+                on_progress(0, written)
+            
+        try:
+            for path, document in tqdm(self.iter_documents(file_paths), total=len(file_paths), desc="Ingesting documents"):
+                if document is not None:
+                    stats["documents_loaded"] += 1
+                    for chunk in self._split_documents([document]):
+                        buffer.append(chunk)
+                        if len(buffer) >= batch_size:
+                            flush()
+                completed.append(path)
+                if on_progress:
+                    on_progress(1, 0)
                 
-        count = self.collection.count()
-        logger.info(f"Indexing complete. Total documents in collection: {count}")
+            flush()
+        finally:
+            self.persist_indexes(generation)
+        stats["failed_files"] = sorted(failed)
+        if failed:
+            logger.error(f"{len(failed)} files could not be indexed: {stats['failed_files']}")
+        logger.info(f"Ingested {stats['documents_loaded']} documents into {stats['chunks_indexed']} chunks.")
+        return stats
+
+    def delete_by_path(self, file_path: str, generation: Optional[IndexGeneration] = None) -> int:
+        """
+        Remove every chunk that was indexed from the given file.
+        
+        Args:
+            file_path (str): Absolute path stored in the chunk "path" metadata.
+            generation (Optional[IndexGeneration]): Generation to delete from. Defaults to the one served.
+            
+        Returns:
+            int: Number of chunks removed.
+        """
+        generation = generation or self.generation
+        existing = generation.vector_store.get(where={"path": file_path}, include=[])
+        ids = existing.get("ids", []) if existing else []
+        if ids:
+            generation.vector_store.delete(ids=ids)
+            generation.lexical_index.delete(ids)
+            generation.lexical_index.save_if_due()
         return len(ids)
 
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def rebuild_lexical_index(self, page_size: int = 1000, generation: Optional[IndexGeneration] = None):
+        """
+        Rebuild the BM25 index from the chunks stored in the collection.
+        
+        Args:
+            page_size (int): Chunks fetched per request.
+            generation (Optional[IndexGeneration]): Generation to rebuild. Defaults to the one served.
+        """
+        generation = generation or self.generation
+        logger.info(f"Rebuilding BM25 index from collection '{generation.name}'...")
+        # Built aside and swapped in, so searches meanwhile use the previous index
+        rebuilt = BM25Index(None)
+        offset = 0
+        while True:
+            page = generation.vector_store.get(include=["documents"], limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            rebuilt.add(page["ids"], page["documents"])
+            offset += len(page["ids"])
+        generation.lexical_index.replace(rebuilt)
+        generation.lexical_index.save()
+        logger.info(f"BM25 index rebuilt with {len(rebuilt)} chunks.")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retrieval metrics: collection size and cache counters.
+        """
+        return {
+            "generation": self.generation.name,
+            "collection_count": self.vector_store.count(),
+            "embedding_cache": self.embedding_cache_stats(),
+            "query_embedding_cache": self.query_cache.stats(),
+            "lexical_index_count": len(self.lexical_index)
+        }
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query, serving repeated queries from the LRU cache.
+        
+        Args:
+            query (str): The query string.
+            
+        Returns:
+            List[float]: Normalized query embedding.
+        """
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed several queries, encoding the ones missing from the LRU cache in one batch.
+        
+        Args:
+            queries (List[str]): Query strings.
+            
+        Returns:
+            List[List[float]]: Normalized query embeddings, in input order.
+        """
+        vectors: List[Optional[List[float]]] = [self.query_cache.get(query) for query in queries]
+        missing = list(dict.fromkeys(query for query, vector in zip(queries, vectors) if vector is None))
+        
+        if missing:
+            start = time.perf_counter()
+            encoded = self.embedding_model.encode(
+                missing,
+                batch_size=settings.EMBEDDING_BATCH_SIZE,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            by_query = {query: vector.tolist() for query, vector in zip(missing, encoded)}
+            for query, vector in by_query.items():
+                self.query_cache.put(query, vector, elapsed_ms / len(missing))
+            vectors = [vector if vector is not None else by_query[query] for query, vector in zip(queries, vectors)]
+        
+        stats = self.query_cache.stats()
+        if (stats["hits"] + stats["misses"]) % 100 < len(queries):
+            logger.info(f"Query embedding cache: {stats}")
+        return vectors
+
+    def _format_results(self, results: Dict[str, Any], query_index: int = 0) -> List[Dict[str, Any]]:
+        """Convert one query's entry of a collection.query() response into result dicts."""
+        formatted_results = []
+        if results and results['documents']:
+            embeddings = results.get('embeddings')
+            for i in range(len(results['documents'][query_index])):
+                metadata = results['metadatas'][query_index][i]
+                result = {
+                    "id": results['ids'][query_index][i],
+                    "content": results['documents'][query_index][i],
+                    "metadata": metadata,
+                    "similarity_score": 1.0 - (results['distances'][query_index][i] if results['distances'] else 0), # Approx convert distance to similarity if using cosine/l2
+                    "source": metadata.get("source", "Unknown")
+                }
+                if embeddings is not None:
+                    result["embedding"] = embeddings[query_index][i]
+                formatted_results.append(result)
+        return formatted_results
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        hybrid: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        include_embeddings: bool = False,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Search for relevant documents in ChromaDB.
+        Search for relevant documents in the vector store.
+        In hybrid mode, dense results are fused with BM25 results using reciprocal rank fusion.
+        With MMR, a larger candidate pool is retrieved and top_k chunks are picked trading
+        relevance against redundancy with the chunks already picked.
         
         Args:
             query (str): The query string.
             top_k (int): Number of top results to return.
+            hybrid (Optional[bool]): Use hybrid retrieval. Defaults to settings.HYBRID_SEARCH_ENABLED.
+            mmr_lambda (Optional[float]): MMR trade-off (1.0 = relevance only, 0.0 = diversity only).
+                Defaults to settings.MMR_LAMBDA when settings.MMR_ENABLED, otherwise no MMR.
+            include_embeddings (bool): Keep each chunk's vector under "embedding".
+            where (Optional[Dict]): Chroma metadata filter, e.g. {"department": "ventas"},
+                {"type": ".pdf"} or {"modified_at": {"$gte": 1700000000}}.
+            where_document (Optional[Dict]): Chroma content filter, e.g. {"$contains": "SKU-1234"}.
             
         Returns:
             List[Dict[str, Any]]: List of results with content and metadata.
         """
-        if not query:
-            return []
+        return self.search_many(
+            [query],
+            top_k=top_k,
+            hybrid=hybrid,
+            mmr_lambda=mmr_lambda,
+            include_embeddings=include_embeddings,
+            where=where,
+            where_document=where_document
+        )[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        hybrid: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        include_embeddings: bool = False,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries at once: all queries are embedded in one batch and
+        sent to the vector store in a single query call. Lexical fusion and MMR are then
+        applied per query, exactly as in search().
+        
+        Args:
+            queries (List[str]): Query strings.
+            (other arguments as in search())
             
-        try:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=top_k,
-                include=["documents", "metadatas", "distances"]
-            )
+        Returns:
+            List[List[Dict[str, Any]]]: One result list per query, in input order
+            (empty for empty queries).
             
-            # Formatting results
-            formatted_results = []
-            if results and results['documents']:
-                for i in range(len(results['documents'][0])):
-                    formatted_results.append({
-                        "content": results['documents'][0][i],
-                        "metadata": results['metadatas'][0][i],
-                        "similarity_score": 1.0 - (results['distances'][0][i] if results['distances'] else 0), # Approx convert distance to similarity if using cosine/l2
-                        "source": results['metadatas'][0][i].get("source", "Unknown")
-                    })
+        Raises:
+            ValueError: If where / where_document is not a valid filter.
+        """
+        all_results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        positions = [i for i, query in enumerate(queries) if query]
+        if not positions:
+            return all_results
             
-            return formatted_results
+        if hybrid is None:
+            hybrid = settings.HYBRID_SEARCH_ENABLED
+        if mmr_lambda is None and settings.MMR_ENABLED:
+            mmr_lambda = settings.MMR_LAMBDA
+        use_mmr = mmr_lambda is not None and mmr_lambda < 1.0
+        with_embeddings = include_embeddings or use_mmr
+        candidate_k = max(top_k, settings.MMR_FETCH_K) if use_mmr else top_k
+        include = ["documents", "metadatas", "distances"] + (["embeddings"] if with_embeddings else [])
             
-        except Exception as e:
-            logger.error(f"Error during search: {e}")
-            return []
+        # Invalid filters are the caller's error, not a search failure returning no results
+        validate_where(where)
+        validate_where_document(where_document)
+            
+        # The served generation stays alive until this search is done, even if a rebuild switches it
+        with self.reading() as generation:
+            try:
+                query_embeddings = self.embed_queries([queries[i] for i in positions])
+                results = generation.vector_store.query(
+                    query_embeddings=query_embeddings,
+                    # HYBRID_DENSE_K is a floor: callers asking for more candidates (reranking,
+                    # MMR, batch search) must get them, only small top_k searches stay cheap
+                    n_results=max(settings.HYBRID_DENSE_K, candidate_k) if hybrid else candidate_k,
+                    where=where or None,
+                    where_document=where_document or None,
+                    include=include
+                )
+            except Exception as e:
+                logger.error(f"Error during search: {e}")
+                return all_results
+                
+            for query_index, position in enumerate(positions):
+                query = queries[position]
+                try:
+                    formatted_results = self._format_results(results, query_index)
+                    if hybrid:
+                        formatted_results = self._fuse_lexical(
+                            generation, query, formatted_results, candidate_k, with_embeddings, where, where_document
+                        )
+                    if use_mmr:
+                        formatted_results = mmr_select(query_embeddings[query_index], formatted_results, top_k, mmr_lambda)
+                    if not include_embeddings:
+                        for result in formatted_results:
+                            result.pop("embedding", None)
+                    all_results[position] = formatted_results
+                except Exception as e:
+                    logger.error(f"Error during search: {e}")
+        return all_results
+
+    def _fuse_lexical(
+        self,
+        generation: IndexGeneration,
+        query: str,
+        dense_results: List[Dict[str, Any]],
+        candidate_k: int,
+        with_embeddings: bool,
+        where: Optional[Dict[str, Any]],
+        where_document: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Fuse dense results with BM25 results (RRF), fetching lexical-only hits from the store."""
+        # Lexical candidates are cheap, so dense top_k can stay small without losing recall
+        lexical_results = generation.lexical_index.search(query, top_k=max(settings.HYBRID_LEXICAL_K, candidate_k))
+        if lexical_results and (where or where_document):
+            # The BM25 index has no metadata: keep only candidates matching the filters
+            allowed = set(generation.vector_store.get(
+                ids=[doc_id for doc_id, _ in lexical_results],
+                where=where or None,
+                where_document=where_document or None,
+                include=[]
+            )["ids"])
+            lexical_results = [(doc_id, score) for doc_id, score in lexical_results if doc_id in allowed]
+        fused = reciprocal_rank_fusion(
+            [[r["id"] for r in dense_results], [doc_id for doc_id, _ in lexical_results]],
+            k=settings.RRF_K
+        )[:candidate_k]
+        
+        by_id = {r["id"]: r for r in dense_results}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+        if missing:
+            fetched = generation.vector_store.get(
+                ids=missing,
+                include=["documents", "metadatas"] + (["embeddings"] if with_embeddings else [])
+            )
+            for i, doc_id in enumerate(fetched["ids"]):
+                metadata = fetched["metadatas"][i]
+                by_id[doc_id] = {
+                    "id": doc_id,
+                    "content": fetched["documents"][i],
+                    "metadata": metadata,
+                    "similarity_score": 0.0,
+                    "source": metadata.get("source", "Unknown")
+                }
+                if with_embeddings:
+                    by_id[doc_id]["embedding"] = fetched["embeddings"][i]
+                
+        bm25_scores = dict(lexical_results)
+        fused_results = []
+        for doc_id, rrf_score in fused:
+            if doc_id in by_id:
+                result = by_id[doc_id]
+                result["bm25_score"] = round(bm25_scores.get(doc_id, 0.0), 4)
+                result["rrf_score"] = round(rrf_score, 6)
+                fused_results.append(result)
+        return fused_results
 
 class ClaudeRAG:
     """
@@ -273,6 +1160,9 @@ class ClaudeRAG:
         # Using the specific model requested by user
         self.model = "claude-sonnet-4-20250514" 
 
+        # Optional cross-encoder rerank stage (model loads on first use)
+        self.reranker = CrossEncoderReranker(settings.RERANK_MODEL, batch_size=settings.RERANK_BATCH_SIZE)
+
     def _calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
         """
         Calculate cost in USD based on token usage.
@@ -306,13 +1196,101 @@ class ClaudeRAG:
             logger.error(f"Error calling Anthropic API: {e}")
             raise e
 
-    def ask(self, query: str, conversation_history: List[Dict[str, str]] = None) -> Dict[str, Any]:
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        rerank: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve context chunks for a query, optionally reranking a larger candidate set
+        and/or diversifying the result with MMR.
+
+        Args:
+            query (str): User's question.
+            top_k (int): Chunks to return without reranking.
+            rerank (Optional[bool]): Use the cross-encoder stage. Defaults to settings.RERANK_ENABLED.
+            mmr_lambda (Optional[float]): MMR trade-off, see DocumentProcessor.search.
+            where (Optional[Dict]): Metadata filter, see DocumentProcessor.search.
+            where_document (Optional[Dict]): Content filter, see DocumentProcessor.search.
+
+        Returns:
+            List[Dict]: Context chunks, best first.
+        """
+        if rerank is None:
+            rerank = settings.RERANK_ENABLED
+        if not rerank:
+            return self.doc_processor.search(
+                query, top_k=top_k, mmr_lambda=mmr_lambda, where=where, where_document=where_document
+            )
+
+        if mmr_lambda is None and settings.MMR_ENABLED:
+            mmr_lambda = settings.MMR_LAMBDA
+        use_mmr = mmr_lambda is not None and mmr_lambda < 1.0
+        
+        candidates = self.doc_processor.search(
+            query,
+            top_k=settings.RERANK_CANDIDATES,
+            mmr_lambda=1.0,
+            include_embeddings=use_mmr,
+            where=where,
+            where_document=where_document
+        )
+        reranked = self.reranker.rerank(
+            query,
+            candidates,
+            top_k=max(settings.RERANK_TOP_K, settings.MMR_FETCH_K) if use_mmr else settings.RERANK_TOP_K,
+            time_budget_ms=settings.RERANK_TIME_BUDGET_MS
+        )
+        if use_mmr:
+            # Diversify among the precise candidates kept by the reranker
+            reranked = mmr_select(self.doc_processor.embed_query(query), reranked, settings.RERANK_TOP_K, mmr_lambda)
+            for chunk in reranked:
+                chunk.pop("embedding", None)
+        return reranked
+
+    def _fit_context(self, chunks: List[Dict[str, Any]], max_tokens: int) -> List[Dict[str, Any]]:
+        """
+        Keep the best-ranked chunks whose token counts fit in max_tokens (at least one).
+        Counts come from the "token_count" metadata stored at indexing time; chunks
+        indexed before it existed are counted on the fly (estimated from characters
+        when the tokenizer is unavailable).
+        """
+        selected, total = [], 0
+        for chunk in chunks:
+            tokens = (chunk.get("metadata") or {}).get("token_count")
+            if tokens is None:
+                tokens = count_tokens(chunk.get("content") or "", settings.CHUNK_TOKENIZER)
+            if selected and total + tokens > max_tokens:
+                continue
+            selected.append(chunk)
+            total += tokens
+        if len(selected) < len(chunks):
+            logger.info(f"Context budget: kept {len(selected)}/{len(chunks)} chunks ({total}/{max_tokens} tokens)")
+        return selected
+
+    def ask(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]] = None,
+        rerank: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Ask a question to the RAG system.
 
         Args:
             query (str): User's question.
             conversation_history (List[Dict]): Previous messages [{"role": "user", "content": "..."}, ...]
+            rerank (Optional[bool]): Rerank retrieved chunks. Defaults to settings.RERANK_ENABLED.
+            mmr_lambda (Optional[float]): Diversify retrieved chunks with MMR (1.0 = off).
+            where (Optional[Dict]): Restrict retrieval by chunk metadata (source, type, department, dates).
+            where_document (Optional[Dict]): Restrict retrieval by chunk content.
 
         Returns:
             Dict: Answer, sources, usage stats, and cost.
@@ -321,14 +1299,28 @@ class ClaudeRAG:
         
         # 1. Retrieve context
         logger.info(f"Searching context for query: {query}")
-        context_chunks = self.doc_processor.search(query, top_k=5)
+        context_chunks = self.retrieve(
+            query, top_k=5, rerank=rerank, mmr_lambda=mmr_lambda, where=where, where_document=where_document
+        )
+        
+        try:
+            context_chunks = self._fit_context(context_chunks, settings.CONTEXT_MAX_TOKENS)
+        except Exception as e:
+            # The budget only trims context: answer with the retrieved chunks rather than fail
+            logger.warning(f"Could not apply the context token budget: {e}")
         
         context_text = ""
         sources = set()
         for chunk in context_chunks:
             source = chunk.get('source', 'Unknown')
             sources.add(source)
-            context_text += f"---\nSource: {source}\nContent: {chunk.get('content')}\n\n"
+            metadata = chunk.get('metadata') or {}
+            location = source
+            if metadata.get('section'):
+                location += f", section {metadata['section']}"
+            if metadata.get('page'):
+                location += f", page {metadata['page']}"
+            context_text += f"---\nSource: {location}\nContent: {chunk.get('content')}\n\n"
         
         # 2. Construct Prompt
         system_prompt = f"""Eres un asistente comercial experto. Responde basándote ÚNICAMENTE 
@@ -387,52 +1379,363 @@ INSTRUCCIONES:
                 "context_used": []
             }
 
-    def reindex_all(self, folder_path: str = "data/documents/") -> Dict[str, Any]:
+    def reindex_all(self, folder_path: str = "data/documents/", job: Optional[ReindexJob] = None) -> Dict[str, Any]:
         """
-        Clear the database and re-index all documents.
+        Re-index all documents into a new shadow generation, validate it and switch
+        searches to it atomically. The current index keeps serving queries until the
+        switch, and is dropped once its in-flight searches finish.
 
         Args:
             folder_path (str): Path to documents folder.
+            job (Optional[ReindexJob]): Background job receiving progress and carrying cancellation.
 
         Returns:
             Dict: Statistics of re-indexing.
         """
         start_time = time.time()
         logger.info("Starting full re-indexing...")
+        processor = self.doc_processor
+        embedding_before = dict(processor.embedding_stats)
+        cache_before = processor.embedding_cache_stats()
+        stats = {"status": "success", "mode": "full", "documents_found": 0, "documents_added": 0, "chunks_indexed": 0}
+        shadow = None
+        # The manifest of the new generation is built aside and swapped in with it
+        shadow_manifest = IndexManifest(f"{processor.manifest.manifest_path}.building")
+        shadow_manifest.clear()
         
         try:
-            # 1. Reset Collection (Delete and Recreate)
-            try:
-                self.doc_processor.chroma_client.delete_collection(self.doc_processor.collection_name)
-                logger.info("Collection deleted.")
-            except Exception as e:
-                logger.warning(f"Collection deletion failed (might not exist): {e}")
+            files = processor.discover_files(folder_path)
+            stats["documents_found"] = len(files)
+            if job:
+                job.check_cancelled()
+                job.update(files_total=len(files))
+                
+            # 1. Build a fresh generation next to the one being served
+            shadow = processor.create_generation()
+            
+            removed_chunks = 0
 
-            # Re-initialize collection
-            self.doc_processor.collection = self.doc_processor.chroma_client.get_or_create_collection(
-                name=self.doc_processor.collection_name,
-                embedding_function=self.doc_processor.embedding_fn
+            def forget(file_path: str):
+                nonlocal removed_chunks
+                removed_chunks += processor.delete_by_path(file_path, generation=shadow)
+                shadow_manifest.remove(file_path)
+
+            def record_files(paths: List[str]):
+                for file_path in paths:
+                    try:
+                        stat = os.stat(file_path)
+                        sha256 = file_sha256(file_path)
+                    except FileNotFoundError:
+                        # Deleted while the rebuild was running
+                        forget(file_path)
+                        continue
+                    shadow_manifest.update(file_path, stat.st_size, stat.st_mtime, sha256)
+                    
+            def report(files_done: int, chunks: int):
+                stats["chunks_indexed"] += chunks
+                if job:
+                    job.add_progress(files_done, chunks)
+                    job.check_cancelled()
+                    
+            if job:
+                job.update(phase="indexing")
+            ingest = processor.ingest_files(
+                files, on_files_committed=record_files, on_progress=report, generation=shadow
             )
+            stats["documents_added"] = ingest["documents_loaded"]
+            stats["chunks_indexed"] = ingest["chunks_indexed"]
+            if ingest["failed_files"]:
+                # A generation missing documents must not replace the current one
+                raise RuntimeError(
+                    f"{len(ingest['failed_files'])} files could not be indexed; the current index is kept"
+                )
             
-            # 2. Load and Index
-            documents = self.doc_processor.load_documents(folder_path)
-            chunks = self.doc_processor.chunk_documents(documents)
-            count = self.doc_processor.index_documents(chunks)
-            
-            elapsed = round(time.time() - start_time, 2)
-            stats = {
-                "status": "success",
-                "documents_found": len(documents),
-                "chunks_indexed": count,
-                "elapsed_time_seconds": elapsed
-            }
-            logger.info(f"Re-indexing complete: {stats}")
-            return stats
+            # Files deleted after they were ingested must not come back with the new generation
+            for file_path in shadow_manifest.paths():
+                if not os.path.exists(file_path):
+                    forget(file_path)
+            if removed_chunks:
+                processor.persist_indexes(shadow)
+                
+            # 2. Validate before serving it
+            if job:
+                job.check_cancelled()
+                job.update(phase="validating")
+            valid, reason = processor.validate_generation(
+                shadow, expected_chunks=ingest["chunks_indexed"] - removed_chunks
+            )
+            if not valid:
+                raise RuntimeError(f"New index failed validation ({reason}); the current index is kept")
+                
+            # 3. Switch manifest and alias, then drop the old generation
+            if job:
+                job.update(phase="switching")
+            shadow_manifest.save()
+            os.replace(shadow_manifest.manifest_path, processor.manifest.manifest_path)
+            processor.manifest.load()
+            processor.promote_generation(shadow)
+            stats["generation"] = shadow.name
             
+        except ReindexCancelled:
+            logger.warning("Re-indexing cancelled; the current index is kept.")
+            self._discard_rebuild(shadow, shadow_manifest)
+            stats["status"] = "cancelled"
         except Exception as e:
             logger.error(f"Re-indexing failed: {e}")
+            self._discard_rebuild(shadow, shadow_manifest)
+            return {
+                "status": "error",
+                "mode": "full",
+                "error": str(e),
+                "elapsed_time_seconds": round(time.time() - start_time, 2)
+            }
+            
+        stats.update({
+            "embedding_chunks_per_second": processor.embedding_throughput(since=embedding_before),
+            "embedding_cache_hits": processor.embedding_cache_stats()["hits"] - cache_before["hits"],
+            "embedding_cache_misses": processor.embedding_cache_stats()["misses"] - cache_before["misses"],
+            "elapsed_time_seconds": round(time.time() - start_time, 2)
+        })
+        logger.info(f"Re-indexing finished: {stats}")
+        return stats
+
+    def _discard_rebuild(self, shadow, shadow_manifest: IndexManifest):
+        """Remove what an aborted full rebuild left behind."""
+        if shadow is not None:
+            self.doc_processor.discard_generation(shadow)
+        if os.path.exists(shadow_manifest.manifest_path):
+            os.remove(shadow_manifest.manifest_path)
+
+    def reindex_incremental(self, folder_path: str = "data/documents/", job: Optional[ReindexJob] = None) -> Dict[str, Any]:
+        """
+        Re-index only files that are new or changed since the last run, and remove
+        the chunks of files that no longer exist. The collection stays queryable throughout.
+
+        Args:
+            folder_path (str): Path to documents folder.
+            job (Optional[ReindexJob]): Background job receiving progress and carrying cancellation.
+
+        Returns:
+            Dict: Statistics of re-indexing (added, updated, skipped, removed).
+        """
+        start_time = time.time()
+        logger.info("Starting incremental re-indexing...")
+        processor = self.doc_processor
+        manifest = processor.manifest
+        embedding_before = dict(processor.embedding_stats)
+        cache_before = processor.embedding_cache_stats()
+        stats = {
+            "status": "success",
+            "mode": "incremental",
+            "documents_found": 0,
+            "documents_added": 0,
+            "documents_updated": 0,
+            "documents_skipped": 0,
+            "documents_removed": 0,
+            "documents_failed": 0,
+            "chunks_indexed": 0
+        }
+        
+        try:
+            files = processor.discover_files(folder_path)
+            stats["documents_found"] = len(files)
+            added, updated, skipped = [], [], 0
+            fingerprints = {}
+            
+            # 1. Classify files against the manifest (size/mtime first, hash only when needed)
+            present = set(files)
+            for file_path in files:
+                if job:
+                    job.check_cancelled()
+                try:
+                    stat = os.stat(file_path)
+                    if manifest.is_unchanged(file_path, stat.st_size, stat.st_mtime):
+                        skipped += 1
+                        continue
+                    sha256 = file_sha256(file_path)
+                except FileNotFoundError:
+                    # Deleted since it was listed: handled with the other deleted files
+                    present.discard(file_path)
+                    continue
+                    
+                entry = manifest.get(file_path)
+                if entry is None:
+                    added.append(file_path)
+                elif entry["sha256"] == sha256:
+                    # Touched but identical content: just refresh the fingerprint
+                    manifest.update(file_path, stat.st_size, stat.st_mtime, sha256)
+                    skipped += 1
+                    continue
+                else:
+                    updated.append(file_path)
+                fingerprints[file_path] = (stat.st_size, stat.st_mtime, sha256)
+            stats.update(documents_added=len(added), documents_updated=len(updated), documents_skipped=skipped)
+            if job:
+                job.update(phase="removing", files_total=len(added) + len(updated))
+                
+            # 2. Remove chunks of deleted files
+            deleted = [path for path in manifest.paths() if path not in present]
+            for file_path in deleted:
+                if job:
+                    job.check_cancelled()
+                processor.delete_by_path(file_path)
+                manifest.remove(file_path)
+                stats["documents_removed"] += 1
+                
+            # 3. Drop stale chunks of changed files, then stream them back in
+            for file_path in updated:
+                processor.delete_by_path(file_path)
+                
+            def record_files(paths: List[str]):
+                for file_path in paths:
+                    manifest.update(file_path, *fingerprints[file_path])
+                if manifest.is_save_due():
+                    # The manifest must never list files whose vectors are not on disk yet
+                    # (the NumPy store only writes on snapshot), or a crash loses them for good
+                    processor.persist_indexes()
+                    manifest.save()
+                
+            def report(files_done: int, chunks: int):
+                stats["chunks_indexed"] += chunks
+                if job:
+                    job.add_progress(files_done, chunks)
+                    job.check_cancelled()
+                    
+            if job:
+                job.update(phase="indexing")
+            ingest = processor.ingest_files(added + updated, on_files_committed=record_files, on_progress=report)
+            stats["chunks_indexed"] = ingest["chunks_indexed"]
+            # Not recorded in the manifest: the next run retries them
+            stats["documents_failed"] = len(ingest["failed_files"])
+            if job:
+                job.update(phase="finalizing")
+            manifest.save()
+            
+        except ReindexCancelled:
+            # Files not yet committed keep their old manifest entry (or none) and are picked up next run
+            logger.warning("Incremental re-indexing cancelled; chunks committed so far are kept.")
+            manifest.save()
+            stats["status"] = "cancelled"
+        except Exception as e:
+            logger.error(f"Incremental re-indexing failed: {e}")
+            return {
+                "status": "error",
+                "mode": "incremental",
+                "error": str(e),
+                "elapsed_time_seconds": round(time.time() - start_time, 2)
+            }
+            
+        stats.update({
+            "embedding_chunks_per_second": processor.embedding_throughput(since=embedding_before),
+            "embedding_cache_hits": processor.embedding_cache_stats()["hits"] - cache_before["hits"],
+            "embedding_cache_misses": processor.embedding_cache_stats()["misses"] - cache_before["misses"],
+            "elapsed_time_seconds": round(time.time() - start_time, 2)
+        })
+        logger.info(f"Incremental re-indexing finished: {stats}")
+        return stats
+
+    def remove_file(self, file_path: str) -> int:
+        """
+        Remove a document from the index: its chunks in the vector store and the
+        BM25 index, and its manifest entry.
+
+        Args:
+            file_path (str): Path of the file (it may already be gone from disk).
+
+        Returns:
+            int: Number of chunks removed.
+        """
+        processor = self.doc_processor
+        file_path = os.path.abspath(file_path)
+        removed = processor.delete_by_path(file_path)
+        processor.persist_indexes()
+        processor.manifest.remove(file_path)
+        processor.manifest.save()
+        logger.info(f"Removed {removed} chunks of {file_path}")
+        return removed
+
+    def index_file(self, file_path: str, job: Optional[ReindexJob] = None) -> Dict[str, Any]:
+        """
+        Incrementally index a single file (e.g. right after it was uploaded), replacing
+        the chunks of a previous version. Unchanged content is skipped.
+
+        Args:
+            file_path (str): Path of the file.
+            job (Optional[ReindexJob]): Background job receiving progress and carrying cancellation.
+
+        Returns:
+            Dict: Statistics in the same shape as reindex_incremental.
+        """
+        start_time = time.time()
+        processor = self.doc_processor
+        manifest = processor.manifest
+        file_path = os.path.abspath(file_path)
+        stats = {
+            "status": "success",
+            "mode": "file",
+            "documents_found": 1,
+            "documents_added": 0,
+            "documents_updated": 0,
+            "documents_skipped": 0,
+            "documents_removed": 0,
+            "chunks_indexed": 0
+        }
+
+        try:
+            if not os.path.exists(file_path):
+                # Deleted before its turn came (or while another job indexed it):
+                # make sure nothing of it stays indexed
+                stats["documents_found"] = 0
+                entry = manifest.get(file_path)
+                if processor.delete_by_path(file_path) or entry is not None:
+                    processor.persist_indexes()
+                    manifest.remove(file_path)
+                    manifest.save()
+                    stats["documents_removed"] = 1
+                return stats
+
+            stat = os.stat(file_path)
+            sha256 = file_sha256(file_path)
+            entry = manifest.get(file_path)
+            if entry is not None and entry["sha256"] == sha256:
+                manifest.update(file_path, stat.st_size, stat.st_mtime, sha256)
+                manifest.save()
+                stats["documents_skipped"] = 1
+                return stats
+
+            if job:
+                job.update(phase="indexing", files_total=1)
+            if entry is not None:
+                processor.delete_by_path(file_path)
+                stats["documents_updated"] = 1
+            else:
+                stats["documents_added"] = 1
+
+            def report(files_done: int, chunks: int):
+                if job:
+                    job.add_progress(files_done, chunks)
+                    job.check_cancelled()
+
+            ingest = processor.ingest_files([file_path], on_progress=report)
+            stats["chunks_indexed"] = ingest["chunks_indexed"]
+            if ingest["failed_files"]:
+                # Left out of the manifest so the next incremental reindex retries it
+                raise RuntimeError(f"Some chunks of {file_path} could not be indexed")
+            manifest.update(file_path, stat.st_size, stat.st_mtime, sha256)
+            manifest.save()
+
+        except ReindexCancelled:
+            # Without a manifest entry the next incremental reindex picks the file up again
+            stats["status"] = "cancelled"
+        except Exception as e:
+            logger.error(f"Indexing {file_path} failed: {e}")
             return {
                 "status": "error",
+                "mode": "file",
                 "error": str(e),
                 "elapsed_time_seconds": round(time.time() - start_time, 2)
             }
+
+        stats["elapsed_time_seconds"] = round(time.time() - start_time, 2)
+        logger.info(f"Indexed {file_path}: {stats}")
+        return stats
@@ -0,0 +1,253 @@
+import time
+import uuid
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class ReindexCancelled(Exception):
+    """Raised inside a reindex run when its job has been cancelled."""
+
+
+class ReindexInProgress(Exception):
+    """Raised when a reindex is requested while another one is running."""
+
+    def __init__(self, job: Optional["ReindexJob"]):
+        # job is None for an instant while a queued file job takes the run lock
+        super().__init__(f"Reindex job {job.id if job else ''} is already running")
+        self.job = job
+
+
+class ReindexJob:
+    """
+    State and progress of one background reindex run.
+
+    The reindex code reports through update() / add_progress() and calls
+    check_cancelled() at safe points (between files and after each committed batch).
+    """
+
+    def __init__(self, mode: str):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.status = "queued"
+        self.phase = "queued"
+        self.files_total = 0
+        self.files_processed = 0
+        self.chunks_indexed = 0
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.indexing_started_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def update(self, **fields):
+        """Set progress fields (phase, files_total, ...)."""
+        with self._lock:
+            if fields.get("phase") == "indexing" and self.indexing_started_at is None:
+                self.indexing_started_at = time.time()
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def add_progress(self, files: int = 0, chunks: int = 0):
+        with self._lock:
+            self.files_processed += files
+            self.chunks_indexed += chunks
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise ReindexCancelled(f"Reindex job {self.id} cancelled")
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Remaining time extrapolated from the file rate of the indexing phase."""
+        if self.status != "running" or self.indexing_started_at is None or not self.files_processed:
+            return None
+        remaining = max(self.files_total - self.files_processed, 0)
+        rate = self.files_processed / max(time.time() - self.indexing_started_at, 1e-6)
+        return round(remaining / rate, 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                "job_id": self.id,
+                "mode": self.mode,
+                "status": self.status,
+                "phase": self.phase,
+                "files_total": self.files_total,
+                "files_processed": self.files_processed,
+                "chunks_indexed": self.chunks_indexed,
+                "eta_seconds": self.eta_seconds,
+                "elapsed_seconds": round(end - self.started_at, 2) if self.started_at else 0.0,
+                "cancel_requested": self.cancel_requested,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "result": self.result
+            }
+
+
+class ReindexJobManager:
+    """
+    Runs reindexes in a background thread, one at a time, and keeps the most
+    recent jobs for status polling. Single-file indexing jobs (uploads) are queued
+    and run after the reindex in progress, if any.
+    """
+
+    def __init__(self, rag_engine, history_size: int = 20):
+        """
+        Args:
+            rag_engine (ClaudeRAG): Engine whose reindex_all / reindex_incremental are run.
+            history_size (int): Finished jobs kept for status queries.
+        """
+        self.rag_engine = rag_engine
+        self.history_size = history_size
+        self.jobs: "OrderedDict[str, ReindexJob]" = OrderedDict()
+        self._run_lock = threading.Lock()
+        self._jobs_lock = threading.Lock()
+        self._current: Optional[ReindexJob] = None
+        self._file_queue: "queue.Queue" = queue.Queue()
+        self._file_worker: Optional[threading.Thread] = None
+        # SHA-256 of uploaded files whose indexing job has not finished yet -> file path
+        self._pending_hashes: Dict[str, str] = {}
+
+    def _register(self, job: ReindexJob):
+        with self._jobs_lock:
+            self.jobs[job.id] = job
+            finished = [job_id for job_id, old in self.jobs.items() if old.status in FINISHED_STATUSES]
+            for job_id in finished[:max(len(finished) - self.history_size, 0)]:
+                del self.jobs[job_id]
+
+    def start(self, mode: str = "incremental", folder_path: str = "data/documents/") -> ReindexJob:
+        """
+        Start a reindex in the background.
+
+        Raises:
+            ReindexInProgress: If another reindex is running.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            raise ReindexInProgress(self._current)
+
+        job = ReindexJob(mode)
+        self._current = job
+        self._register(job)
+
+        thread = threading.Thread(target=self._run, args=(job, folder_path), name=f"reindex-{job.id[:8]}", daemon=True)
+        try:
+            thread.start()
+        except Exception:
+            self._current = None
+            self._run_lock.release()
+            raise
+        return job
+
+    def enqueue_file(self, file_path: str) -> ReindexJob:
+        """
+        Queue incremental indexing of a single file. Queued files are indexed one by
+        one, each as its own job, and wait while a reindex is running.
+        """
+        job = ReindexJob("file")
+        self._register(job)
+        self._file_queue.put((job, file_path))
+        with self._jobs_lock:
+            if self._file_worker is None or not self._file_worker.is_alive():
+                self._file_worker = threading.Thread(target=self._process_files, name="reindex-files", daemon=True)
+                self._file_worker.start()
+        return job
+
+    def claim_hash(self, sha256: str, file_path: str) -> bool:
+        """
+        Reserve the content hash of an uploaded file until its indexing job finishes.
+
+        Returns:
+            bool: False if the same content is already waiting to be indexed.
+        """
+        with self._jobs_lock:
+            if sha256 in self._pending_hashes:
+                return False
+            self._pending_hashes[sha256] = file_path
+            return True
+
+    def release_hash(self, sha256: str):
+        """Drop a reservation whose file was never queued."""
+        with self._jobs_lock:
+            self._pending_hashes.pop(sha256, None)
+
+    def _release_hashes(self, file_path: str):
+        with self._jobs_lock:
+            for sha256 in [sha for sha, path in self._pending_hashes.items() if path == file_path]:
+                del self._pending_hashes[sha256]
+
+    def _process_files(self):
+        while True:
+            job, file_path = self._file_queue.get()
+            try:
+                if job.cancel_requested:
+                    job.update(status="cancelled", phase="done", finished_at=time.time())
+                    continue
+                self._run_lock.acquire()
+                # The job may have been cancelled while waiting for a running reindex
+                if job.cancel_requested:
+                    job.update(status="cancelled", phase="done", finished_at=time.time())
+                    self._run_lock.release()
+                    continue
+                self._current = job
+                self._run(job, file_path)
+            finally:
+                # Indexed files are in the manifest now; failed or cancelled ones may be uploaded again
+                self._release_hashes(file_path)
+
+    def _run(self, job: ReindexJob, target: str):
+        job.update(status="running", phase="scanning", started_at=time.time())
+        logger.info(f"Reindex job {job.id} started ({job.mode})")
+        try:
+            if job.mode == "file":
+                stats = self.rag_engine.index_file(target, job=job)
+            elif job.mode == "full":
+                stats = self.rag_engine.reindex_all(target, job=job)
+            else:
+                stats = self.rag_engine.reindex_incremental(target, job=job)
+            status = {"success": "completed", "cancelled": "cancelled"}.get(stats.get("status"), "failed")
+            job.update(status=status, phase="done", result=stats, error=stats.get("error"))
+        except Exception as e:
+            logger.error(f"Reindex job {job.id} failed: {e}")
+            job.update(status="failed", phase="done", error=str(e))
+        finally:
+            job.update(finished_at=time.time())
+            self._current = None
+            self._run_lock.release()
+            logger.info(f"Reindex job {job.id} finished: {job.status}")
+
+    def get(self, job_id: str) -> Optional[ReindexJob]:
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[ReindexJob]:
+        """Known jobs, newest first."""
+        with self._jobs_lock:
+            return list(reversed(self.jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[ReindexJob]:
+        """Request cancellation; the run stops at its next safe point."""
+        job = self.get(job_id)
+        if job is not None and job.status not in FINISHED_STATUSES:
+            job.cancel()
+            logger.info(f"Cancellation requested for reindex job {job_id}")
+        return job
@@ -0,0 +1,86 @@
+import time
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+
+from sentence_transformers import CrossEncoder
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores retrieved chunks with a cross-encoder and keeps the best ones.
+    The model is loaded on first use.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 16):
+        """
+        Args:
+            model_name (str): Hugging Face cross-encoder model.
+            batch_size (int): (query, chunk) pairs scored per forward pass.
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model: Optional[CrossEncoder] = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> CrossEncoder:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    logger.info(f"Loading reranker model: {self.model_name}...")
+                    self._model = CrossEncoder(self.model_name)
+        return self._model
+
+    def rerank(
+        self,
+        query: str,
+        candidates: List[Dict[str, Any]],
+        top_k: int,
+        time_budget_ms: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Score candidates in batches, in their retrieval order, until all are scored or
+        the time budget runs out. Unscored candidates keep their retrieval order after
+        the scored ones, so a tight budget degrades to plain retrieval ranking.
+
+        Args:
+            query (str): The user question.
+            candidates (List[Dict]): Results from DocumentProcessor.search, best first.
+            top_k (int): Number of chunks to keep.
+            time_budget_ms (Optional[float]): Max time spent scoring (None = no limit).
+
+        Returns:
+            List[Dict]: Best top_k candidates, with "rerank_score" on scored ones.
+        """
+        if len(candidates) <= 1:
+            return candidates[:top_k]
+
+        model = self.model
+        start = time.perf_counter()
+        deadline = start + time_budget_ms / 1000 if time_budget_ms else None
+        scored = []
+        position = 0
+        while position < len(candidates):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            batch = candidates[position:position + self.batch_size]
+            scores = model.predict(
+                [(query, candidate["content"]) for candidate in batch],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            )
+            for candidate, score in zip(batch, scores):
+                candidate["rerank_score"] = float(score)
+                scored.append(candidate)
+            position += len(batch)
+
+        scored.sort(key=lambda candidate: candidate["rerank_score"], reverse=True)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if position < len(candidates):
+            logger.info(f"Rerank budget reached: scored {position}/{len(candidates)} candidates in {elapsed_ms:.0f}ms")
+        else:
+            logger.debug(f"Reranked {len(candidates)} candidates in {elapsed_ms:.0f}ms")
+        return (scored + candidates[position:])[:top_k]
@@ -2,7 +2,9 @@ from datetime import datetime, date
 from typing import List, Optional, Literal, Dict, Any
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field, ConfigDict, validator
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, validator, field_validator
+
+from backend.vector_store import validate_where, validate_where_document
 
 # ==========================================
 # AUTH SCHEMAS
@@ -81,6 +83,29 @@ class QueryRequest(BaseModel):
     """Schema para realizar una consulta RAG."""
     question: str = Field(..., min_length=1, description="La pregunta del usuario")
     conversation_id: Optional[UUID] = Field(None, description="ID de conversación existente (opcional)")
+    rerank: Optional[bool] = Field(None, description="Reordenar el contexto con cross-encoder (por defecto según configuración)")
+    mmr_lambda: Optional[float] = Field(None, ge=0.0, le=1.0, description="Diversificación MMR: 1.0 = solo relevancia, 0.0 = máxima diversidad")
+    where: Optional[Dict[str, Any]] = Field(
+        None,
+        description='Filtro por metadatos (sintaxis Chroma), ej. {"department": "ventas"} o {"modified_at": {"$gte": 1700000000}}'
+    )
+    where_document: Optional[Dict[str, Any]] = Field(
+        None,
+        description='Filtro por contenido (sintaxis Chroma), ej. {"$contains": "SKU-1234"}'
+    )
+
+    # Un filtro inválido devuelve 422 en vez de una búsqueda vacía (y una respuesta de Claude sin contexto)
+    @field_validator("where")
+    @classmethod
+    def check_where(cls, value):
+        validate_where(value)
+        return value
+
+    @field_validator("where_document")
+    @classmethod
+    def check_where_document(cls, value):
+        validate_where_document(value)
+        return value
 
 class QueryResponse(BaseModel):
     """Schema para la respuesta del motor RAG."""
@@ -152,12 +177,91 @@ class DocumentInfo(BaseModel):
 class DocumentUploadResponse(BaseModel):
     uploaded: int
     files: List[str]
+    skipped: List[str] = []
+    index_jobs: List[str] = []
+
+class DocumentDeleteResponse(BaseModel):
+    filename: str
+    vectors_removed: int
 
 class ReindexResponse(BaseModel):
     status: str
     chunks_indexed: int
     time_seconds: float
     documents_processed: Optional[int] = 0
+    mode: Literal['incremental', 'full', 'file'] = 'incremental'
+    documents_added: int = 0
+    documents_updated: int = 0
+    documents_skipped: int = 0
+    documents_removed: int = 0
+    documents_failed: int = 0
+    embedding_chunks_per_second: float = 0.0
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
+
+class ReindexJobResponse(BaseModel):
+    """Schema para el estado de un reindexado en segundo plano."""
+    job_id: str
+    mode: Literal['incremental', 'full', 'file']
+    status: Literal['queued', 'running', 'completed', 'failed', 'cancelled']
+    phase: str
+    files_total: int = 0
+    files_processed: int = 0
+    chunks_indexed: int = 0
+    eta_seconds: Optional[float] = None
+    elapsed_seconds: float = 0.0
+    cancel_requested: bool = False
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[ReindexResponse] = None
+
+class RagStatsResponse(BaseModel):
+    """Schema para métricas del motor de recuperación."""
+    generation: str = ""
+    collection_count: int
+    embedding_cache: Dict[str, int]
+    query_embedding_cache: Dict[str, float]
+    lexical_index_count: int = 0
+
+class BatchSearchRequest(BaseModel):
+    """Schema para recuperar contexto de varias preguntas a la vez (sin llamar a Claude)."""
+    queries: List[str] = Field(..., min_length=1, max_length=200, description="Preguntas a buscar")
+    top_k: int = Field(5, ge=1, le=50, description="Chunks devueltos por pregunta")
+    hybrid: Optional[bool] = Field(None, description="Búsqueda híbrida BM25 + vectorial (por defecto según configuración)")
+    mmr_lambda: Optional[float] = Field(None, ge=0.0, le=1.0, description="Diversificación MMR: 1.0 = solo relevancia, 0.0 = máxima diversidad")
+    where: Optional[Dict[str, Any]] = Field(None, description="Filtro por metadatos (sintaxis Chroma)")
+    where_document: Optional[Dict[str, Any]] = Field(None, description="Filtro por contenido (sintaxis Chroma)")
+
+    @field_validator("where")
+    @classmethod
+    def check_where(cls, value):
+        validate_where(value)
+        return value
+
+    @field_validator("where_document")
+    @classmethod
+    def check_where_document(cls, value):
+        validate_where_document(value)
+        return value
+
+class SearchChunk(BaseModel):
+    id: str
+    content: str
+    source: str
+    similarity_score: float
+    metadata: Dict[str, Any]
+    bm25_score: Optional[float] = None
+    rrf_score: Optional[float] = None
+
+class BatchSearchResult(BaseModel):
+    query: str
+    chunks: List[SearchChunk]
+
+class BatchSearchResponse(BaseModel):
+    results: List[BatchSearchResult]
+    time_seconds: float
 
 # ==========================================
 # UTILITY SCHEMAS
@@ -0,0 +1,50 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a character estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Average characters per token of cl100k_base on Spanish/English prose
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str) -> Optional["tiktoken.Encoding"]:
+    """
+    Load a tiktoken encoding once per process.
+
+    Returns None when tiktoken is not installed or the encoding cannot be loaded
+    (tiktoken downloads it on first use, which fails in offline containers).
+    """
+    if tiktoken is None:
+        logger.warning("tiktoken is not installed; token counts are estimated from characters")
+        return None
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        logger.warning(f"Could not load tiktoken encoding '{name}', token counts are estimated from characters: {e}")
+        return None
+
+
+def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """
+    Number of tokens of a text with a fast local BPE tokenizer.
+
+    Claude's tokenizer is not available offline; cl100k_base tracks it closely enough
+    to size chunks and budget prompt context consistently. Without the encoding the
+    count is estimated as one token per CHARS_PER_TOKEN characters.
+
+    Args:
+        text (str): Text to count.
+        encoding_name (str): tiktoken encoding.
+    """
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    # disallowed_special=() so documents containing "<|endoftext|>" etc. are counted as plain text
+    return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,222 @@
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+VECTOR_STORES = ("chroma", "numpy", "memory", "pgvector")
+
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+WHERE_OPERATORS = ("$eq", "$ne", "$in", "$nin") + RANGE_OPERATORS
+
+
+def _check_clauses(operator: str, clauses: Any, validate: Callable[[Any], None]):
+    if not isinstance(clauses, list) or len(clauses) < 2:
+        raise ValueError(f"'{operator}' expects a list of at least two filters")
+    for clause in clauses:
+        validate(clause)
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+
+def validate_where(where: Optional[Dict[str, Any]]):
+    """
+    Check a metadata filter against the Chroma syntax every store supports: one key
+    per level ("$and"/"$or" to combine), known operators and operand types.
+
+    Raises:
+        ValueError: With the reason the filter is invalid.
+    """
+    if not where:
+        return
+    if not isinstance(where, dict) or len(where) != 1:
+        raise ValueError("A metadata filter must have exactly one key; combine conditions with '$and' / '$or'")
+    key, condition = next(iter(where.items()))
+    if key in ("$and", "$or"):
+        _check_clauses(key, condition, validate_where)
+        return
+    if key.startswith("$"):
+        raise ValueError(f"Unsupported metadata filter operator '{key}'")
+    if not isinstance(condition, dict):
+        if not _is_scalar(condition):
+            raise ValueError(f"Filter value of '{key}' must be a string, number or boolean")
+        return
+    if len(condition) != 1:
+        raise ValueError(f"Condition on '{key}' must have exactly one operator")
+    op, expected = next(iter(condition.items()))
+    if op not in WHERE_OPERATORS:
+        raise ValueError(f"Unsupported metadata filter operator '{op}'")
+    if op in ("$in", "$nin"):
+        if not isinstance(expected, list) or not expected or not all(_is_scalar(value) for value in expected):
+            raise ValueError(f"'{op}' on '{key}' expects a non-empty list of values")
+    elif op in RANGE_OPERATORS:
+        if isinstance(expected, bool) or not isinstance(expected, (int, float)):
+            raise ValueError(f"'{op}' on '{key}' expects a number")
+    elif not _is_scalar(expected):
+        raise ValueError(f"'{op}' on '{key}' expects a string, number or boolean")
+
+
+def validate_where_document(where_document: Optional[Dict[str, Any]]):
+    """
+    Check a document filter: one of "$contains" / "$not_contains" with a non-empty
+    string, or "$and" / "$or" of such filters.
+
+    Raises:
+        ValueError: With the reason the filter is invalid.
+    """
+    if not where_document:
+        return
+    if not isinstance(where_document, dict) or len(where_document) != 1:
+        raise ValueError("A document filter must have exactly one operator; combine them with '$and' / '$or'")
+    op, operand = next(iter(where_document.items()))
+    if op in ("$and", "$or"):
+        _check_clauses(op, operand, validate_where_document)
+    elif op in ("$contains", "$not_contains"):
+        if not isinstance(operand, str) or not operand:
+            raise ValueError(f"'{op}' expects a non-empty string")
+    else:
+        raise ValueError(f"Unsupported document filter operator '{op}'")
+
+
+class VectorStore(ABC):
+    """
+    Interface DocumentProcessor uses to store and search chunk vectors.
+
+    Results follow the Chroma collection shapes: get() returns flat lists keyed by
+    "ids"/"documents"/"metadatas"/"embeddings", query() returns one list per query
+    embedding plus "distances" (1 - cosine). Embeddings are always passed explicitly.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored vectors."""
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Insert or replace vectors by ID."""
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Insert new vectors. Stores without a distinct insert path upsert."""
+        self.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    @abstractmethod
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Remove vectors by ID and/or metadata filter."""
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Fetch stored entries by ID and/or filters."""
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Nearest neighbours of each query embedding."""
+
+    @abstractmethod
+    def reset(self):
+        """Drop every vector."""
+
+    def snapshot(self):
+        """Make pending writes durable. No-op for stores that persist every write."""
+
+    def drop(self):
+        """Delete the collection and its storage. Stores without separate storage just reset."""
+        self.reset()
+
+
+def create_vector_store(
+    kind: str,
+    persistence_path: str,
+    collection_name: str,
+    model_name: str,
+    dimension: Optional[int] = None
+) -> VectorStore:
+    """
+    Build the vector store selected in settings (VECTOR_STORE).
+
+    Args:
+        kind (str): "chroma" (default; embedded or client/server, see CHROMA_MODE), "numpy" (in-process exact search persisted under
+            persistence_path), "memory" (same, never written to disk; for tests and benchmarks)
+            or "pgvector" (PostgreSQL database from DATABASE_URL, shared by every backend instance).
+        persistence_path (str): Base data directory.
+        collection_name (str): Name of the chunk collection.
+        model_name (str): Embedding model name (used by stores that bind an embedding function).
+        dimension (Optional[int]): Embedding dimension (needed by stores with a typed vector column).
+
+    Returns:
+        VectorStore: The opened store.
+    """
+    # Implementations are imported on demand so unused backends need not be installed
+    if kind == "chroma":
+        from backend.chroma_store import ChromaVectorStore, create_http_client, create_persistent_client
+        if settings.CHROMA_MODE == "http":
+            client = create_http_client(
+                settings.CHROMA_HOST,
+                settings.CHROMA_PORT,
+                ssl=settings.CHROMA_SSL,
+                auth_token=settings.CHROMA_AUTH_TOKEN,
+                timeout_seconds=settings.CHROMA_TIMEOUT_SECONDS,
+                connect_timeout_seconds=settings.CHROMA_CONNECT_TIMEOUT_SECONDS,
+                max_connections=settings.CHROMA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CHROMA_MAX_KEEPALIVE_CONNECTIONS
+            )
+        else:
+            client = create_persistent_client(persistence_path)
+        return ChromaVectorStore(client, collection_name, model_name)
+    if kind == "pgvector":
+        from backend.database import engine
+        from backend.pgvector_store import PgVectorStore
+        return PgVectorStore(
+            engine,
+            collection_name,
+            dimension,
+            index_type=settings.PGVECTOR_INDEX,
+            hnsw_m=settings.PGVECTOR_HNSW_M,
+            hnsw_ef_construction=settings.PGVECTOR_HNSW_EF_CONSTRUCTION,
+            hnsw_ef_search=settings.PGVECTOR_HNSW_EF_SEARCH,
+            ivfflat_lists=settings.PGVECTOR_IVFFLAT_LISTS,
+            ivfflat_probes=settings.PGVECTOR_IVFFLAT_PROBES
+        )
+
+    from backend.numpy_store import NumpyVectorStore
+    if kind == "numpy":
+        return NumpyVectorStore(
+            os.path.join(persistence_path, "numpy_store", collection_name),
+            dtype=settings.NUMPY_STORE_DTYPE
+        )
+    if kind == "memory":
+        return NumpyVectorStore(None, dtype=settings.NUMPY_STORE_DTYPE)
+    raise ValueError(f"Unknown vector store '{kind}'. Expected one of {VECTOR_STORES}")
@@ -101,7 +101,12 @@ class APIClient:
         return res.json() if res.status_code == 201 else None
 
     def admin_reindex(self):
+        # Returns the background job; poll admin_reindex_status(job["job_id"]) for progress
         res = requests.post(f"{self.base_url}/admin/documents/reindex", headers=self._get_headers())
+        return res.json() if res.status_code == 202 else None
+
+    def admin_reindex_status(self, job_id: str):
+        res = requests.get(f"{self.base_url}/admin/documents/reindex/jobs/{job_id}", headers=self._get_headers())
         return res.json() if res.status_code == 200 else None
 
     def admin_update_user_password(self, user_id: str, new_password: str) -> bool:
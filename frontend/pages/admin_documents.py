@@ -7,17 +7,24 @@ def show_admin_documents():
     
     # --- Top Actions (Reindex) ---
     col1, col2 = st.columns([4, 2])
+    with col1:
+        full_rebuild = st.checkbox(
+            "Reconstrucción completa",
+            help="Vuelve a procesar todos los documentos en un índice nuevo, que sustituye al actual cuando está completo y validado (las búsquedas siguen funcionando mientras tanto). Por defecto solo se procesan los cambios."
+        )
     with col2:
-        if st.button("🔄 Reindexar Base de Datos", use_container_width=True, type="primary"):
-            with st.spinner("Reindexando documentos... esto puede tomar tiempo."):
-                success, response = api_request("POST", "/admin/documents/reindex")
-                if success:
-                    st.toast("¡Reindexado completo!", icon="✅")
-                    st.success(f"Procesado en {response.get('time_seconds')}s. Chunks: {response.get('chunks_indexed')}")
-                    time.sleep(2)
-                    st.rerun()
-                else:
-                    show_error(f"Error al reindexar: {response}")
+        running = st.session_state.get("reindex_job_id") is not None
+        if st.button("🔄 Reindexar Base de Datos", use_container_width=True, type="primary", disabled=running):
+            mode = "full" if full_rebuild else "incremental"
+            success, response = api_request("POST", f"/admin/documents/reindex?mode={mode}")
+            if success:
+                st.session_state["reindex_job_id"] = response["job_id"]
+                st.session_state.pop("reindex_last_job", None)
+                st.rerun()
+            else:
+                show_error(f"Error al reindexar: {response}")
+
+    show_reindex_progress()
 
     st.markdown("---")
     
@@ -44,7 +51,10 @@ def show_admin_documents():
                 
                 if success:
                     st.success(f"Se subieron {response.get('uploaded')} archivos correctamente.")
-                    st.info("Recuerda pulsar 'Reindexar' para que el sistema aprenda el nuevo contenido.")
+                    if response.get("skipped"):
+                        st.info(f"Omitidos por estar ya indexados (mismo contenido): {', '.join(response['skipped'])}")
+                    if response.get("uploaded"):
+                        st.info("Los archivos nuevos se están indexando y estarán disponibles para consultas en breve.")
                     time.sleep(2)
                     st.rerun()
                 else:
@@ -92,6 +102,81 @@ def show_admin_documents():
     else:
         st.info("No hay documentos en la biblioteca o no se pudieron cargar.")
 
+PHASE_LABELS = {
+    "queued": "En cola",
+    "scanning": "Analizando archivos",
+    "removing": "Eliminando chunks obsoletos",
+    "indexing": "Indexando",
+    "finalizing": "Guardando índices",
+    "validating": "Validando el nuevo índice",
+    "switching": "Activando el nuevo índice",
+    "done": "Terminado"
+}
+
+@st.fragment(run_every=2)
+def show_reindex_progress():
+    """
+    Progreso del reindexado en curso. El fragmento se refresca solo cada 2 segundos,
+    sin recargar el resto de la página.
+    """
+    job_id = st.session_state.get("reindex_job_id")
+    if job_id:
+        success, job = api_request("GET", f"/admin/documents/reindex/jobs/{job_id}")
+        if not success:
+            st.session_state.pop("reindex_job_id", None)
+            show_error(f"No se pudo consultar el reindexado: {job}")
+            return
+            
+        if job["status"] in ("queued", "running"):
+            total = job["files_total"] or 0
+            fraction = min(job["files_processed"] / total, 1.0) if total else 0.0
+            eta = f" · Restante: ~{job['eta_seconds']:.0f}s" if job.get("eta_seconds") is not None else ""
+            st.progress(
+                fraction,
+                text=(
+                    f"{PHASE_LABELS.get(job['phase'], job['phase'])}: {job['files_processed']}/{total} archivos · "
+                    f"{job['chunks_indexed']} chunks{eta}"
+                )
+            )
+            if job.get("cancel_requested"):
+                st.info("Cancelando... se detendrá tras el lote en curso.")
+            elif st.button("⏹️ Cancelar reindexado"):
+                api_request("POST", f"/admin/documents/reindex/jobs/{job_id}/cancel")
+            return
+            
+        # Finished: keep showing the outcome until the next reindex and re-enable the button
+        st.session_state.pop("reindex_job_id", None)
+        st.session_state["reindex_last_job"] = job
+        st.rerun()
+            
+    job = st.session_state.get("reindex_last_job")
+    if not job:
+        return
+    result = job.get("result") or {}
+    if job["status"] == "completed":
+        st.success(
+            f"Procesado en {result.get('time_seconds')}s. Chunks: {result.get('chunks_indexed')} · "
+            f"Nuevos: {result.get('documents_added')} · Actualizados: {result.get('documents_updated')} · "
+            f"Sin cambios: {result.get('documents_skipped')} · Eliminados: {result.get('documents_removed')} · "
+            f"Embeddings: {result.get('embedding_chunks_per_second')} chunks/s "
+            f"(caché: {result.get('embedding_cache_hits')} aciertos / {result.get('embedding_cache_misses')} fallos)"
+        )
+        if result.get("documents_failed"):
+            st.warning(
+                f"{result['documents_failed']} archivos no se pudieron indexar; "
+                "se reintentarán en el próximo reindexado incremental."
+            )
+    elif job["status"] == "cancelled":
+        if job["mode"] == "full":
+            detail = "Se mantiene el índice anterior; la reconstrucción a medias se ha descartado."
+        else:
+            detail = "Lo indexado se conserva; el próximo reindexado incremental completará el resto."
+        st.warning(
+            f"Reindexado cancelado tras {job['files_processed']} archivos y {job['chunks_indexed']} chunks. {detail}"
+        )
+    else:
+        show_error(f"Error al reindexar: {job.get('error')}")
+
 @st.dialog("Eliminar Documento")
 def show_delete_doc_dialog(doc):
     st.warning(f"¿Estás seguro que deseas eliminar **{doc['filename']}**?")
@@ -104,8 +189,7 @@ def show_delete_doc_dialog(doc):
         if st.button("Sí, Eliminar", type="primary", use_container_width=True):
              success, response = api_request("DELETE", f"/admin/documents/{doc['filename']}")
              if success:
-                 st.success("Archivo eliminado.")
-                 st.info("Se recomienda reindexar para actualizar la base de conocimientos.")
+                 st.success(f"Archivo eliminado ({response.get('vectors_removed', 0)} fragmentos retirados del índice).")
                  time.sleep(2)
                  st.rerun()
              else:
@@ -53,7 +53,7 @@ def api_request(
         except ValueError:
             response_data = response.text
 
-        if response.status_code in (200, 201, 204):
+        if response.status_code in (200, 201, 202, 204):
             return True, response_data
         else:
             error_msg = response_data.get("detail", "Error desconocido") if isinstance(response_data, dict) else str(response_data)
@@ -0,0 +1,20 @@
+"""
+Configuración común de los tests.
+
+Los tests unitarios importan módulos del backend, que cargan `Settings` al importarse:
+se dan valores de prueba a las variables obligatorias si no vienen del entorno o de .env.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+for name, value in {
+    "ANTHROPIC_API_KEY": "test-key",
+    "DATABASE_URL": "sqlite://",
+    "JWT_SECRET_KEY": "test-secret-key-for-unit-tests-only",
+    "ADMIN_EMAIL": "admin@example.com",
+    "ADMIN_PASSWORD": "test-password",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,58 @@
+"""
+Tests unitarios del alias de la colección (archivo JSON y tabla compartida).
+Ejecutar con: pytest tests/test_collection_alias.py -v
+"""
+
+import pytest
+from sqlalchemy import create_engine
+
+from backend.index_generations import CollectionAlias, DatabaseCollectionAlias
+from backend.lexical_index import BM25Index
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+
+
+def test_file_alias(tmp_path):
+    alias = CollectionAlias(str(tmp_path / "collection_alias.json"))
+    assert alias.resolve("company_docs") == "company_docs"
+    alias.set("company_docs", "company_docs_1")
+    assert CollectionAlias(alias.path).state("company_docs") == ("company_docs_1", 0)
+    assert not alias.shared
+
+
+def test_database_alias_is_shared_between_instances(engine):
+    first, second = DatabaseCollectionAlias(engine), DatabaseCollectionAlias(engine)
+    assert first.resolve("company_docs") == "company_docs"
+    first.set("company_docs", "company_docs_1")
+    assert second.resolve("company_docs") == "company_docs_1"
+
+
+def test_database_alias_falls_back_to_file(engine, tmp_path):
+    legacy = CollectionAlias(str(tmp_path / "collection_alias.json"))
+    legacy.set("company_docs", "company_docs_0")
+    alias = DatabaseCollectionAlias(engine, fallback=legacy)
+    assert alias.resolve("company_docs") == "company_docs_0"
+    # El primer cambio registrado en la tabla mantiene la colección servida
+    alias.bump("company_docs")
+    assert alias.state("company_docs") == ("company_docs_0", 1)
+
+
+def test_writes_bump_the_version(engine):
+    first, second = DatabaseCollectionAlias(engine), DatabaseCollectionAlias(engine)
+    first.set("company_docs", "company_docs_1")
+    _, version = second.state("company_docs")
+    assert first.bump("company_docs") == version + 1
+    assert second.bump("company_docs") == version + 2
+    assert first.state("company_docs") == ("company_docs_1", version + 2)
+
+
+def test_bm25_replace_swaps_documents():
+    live, rebuilt = BM25Index(None), BM25Index(None)
+    live.add(["old"], ["documento antiguo"])
+    rebuilt.add(["a", "b"], ["contrato CT-2024/015", "tarifa SKU-1234"])
+    live.replace(rebuilt)
+    assert len(live) == 2
+    assert live.search("SKU-1234")[0][0] == "b"
@@ -295,6 +295,119 @@ class TestAdminFunctions:
         data = response.json()
         assert isinstance(data, list)
     
+    def _run_reindex(self, mode="incremental", timeout=600):
+        """Lanza un reindexado en segundo plano y espera a que termine"""
+        response = requests.post(
+            f"{API_URL}/admin/documents/reindex?mode={mode}",
+            headers=self.headers
+        )
+        assert response.status_code == 202
+        return self._wait_for_job(response.json()["job_id"], timeout)
+    
+    def _wait_for_job(self, job_id, timeout=600):
+        """Espera a que un trabajo de indexado termine"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = requests.get(
+                f"{API_URL}/admin/documents/reindex/jobs/{job_id}",
+                headers=self.headers
+            ).json()
+            if job["status"] not in ("queued", "running"):
+                return job
+            time.sleep(1)
+        pytest.fail("El reindexado no terminó a tiempo")
+    
+    def test_incremental_reindex_is_idempotent(self):
+        """Test que un segundo reindexado incremental no reprocesa nada"""
+        first = self._run_reindex()
+        assert first["status"] == "completed"
+        
+        job = self._run_reindex()
+        assert job["status"] == "completed"
+        data = job["result"]
+        assert data["mode"] == "incremental"
+        assert data["documents_added"] == 0
+        assert data["documents_updated"] == 0
+        assert data["documents_removed"] == 0
+        assert data["documents_skipped"] == data["documents_processed"]
+
+    def test_concurrent_reindex_is_rejected(self):
+        """Test que no se pueden lanzar dos reindexados a la vez, y que se pueden cancelar"""
+        response = requests.post(
+            f"{API_URL}/admin/documents/reindex?mode=full",
+            headers=self.headers
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        
+        second = requests.post(
+            f"{API_URL}/admin/documents/reindex",
+            headers=self.headers
+        )
+        # 409 mientras el primero sigue en curso (puede haber terminado ya si hay pocos documentos)
+        assert second.status_code in (202, 409)
+        
+        cancel = requests.post(
+            f"{API_URL}/admin/documents/reindex/jobs/{job_id}/cancel",
+            headers=self.headers
+        )
+        assert cancel.status_code == 200
+        
+        # Esperar a que se detengan y dejar el índice completo para el resto de tests
+        job_ids = [job_id] + ([second.json()["job_id"]] if second.status_code == 202 else [])
+        for pending_id in job_ids:
+            while requests.get(
+                f"{API_URL}/admin/documents/reindex/jobs/{pending_id}",
+                headers=self.headers
+            ).json()["status"] in ("queued", "running"):
+                time.sleep(1)
+        assert self._run_reindex()["status"] == "completed"
+
+    def test_upload_indexes_file_and_skips_duplicates(self):
+        """Test que un archivo subido se indexa solo, que un duplicado se omite y que al borrarlo se eliminan sus vectores"""
+        content = f"Documento de prueba de subida {time.time()}".encode("utf-8")
+        name = f"test_upload_{int(time.time())}.txt"
+        response = requests.post(
+            f"{API_URL}/admin/documents/upload",
+            files=[("files", (name, content, "text/plain"))],
+            headers=self.headers
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert data["files"] == [name]
+        assert len(data["index_jobs"]) == 1
+        
+        job = self._wait_for_job(data["index_jobs"][0])
+        assert job["status"] == "completed"
+        assert job["result"]["chunks_indexed"] > 0
+        
+        # Mismo contenido con otro nombre: no se guarda ni se vuelve a indexar
+        duplicate = requests.post(
+            f"{API_URL}/admin/documents/upload",
+            files=[("files", (f"copia_{name}", content, "text/plain"))],
+            headers=self.headers
+        ).json()
+        assert duplicate["uploaded"] == 0
+        assert duplicate["skipped"] == [f"copia_{name}"]
+        
+        # Al eliminarlo se retiran también sus vectores
+        deleted = requests.delete(f"{API_URL}/admin/documents/{name}", headers=self.headers)
+        assert deleted.status_code == 200
+        assert deleted.json()["vectors_removed"] == job["result"]["chunks_indexed"]
+
+    def test_batch_search(self):
+        """Test búsqueda en lote: un resultado por pregunta, en el mismo orden"""
+        queries = ["¿Cuáles son los precios?", "Política de devoluciones"]
+        response = requests.post(
+            f"{API_URL}/admin/search/batch",
+            json={"queries": queries, "top_k": 3},
+            headers=self.headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["query"] for r in data["results"]] == queries
+        assert all(len(r["chunks"]) <= 3 for r in data["results"])
+
     def test_non_admin_cannot_access_admin_endpoints(self):
         """Test que usuario normal no puede acceder a endpoints admin"""
         # Login como usuario normal
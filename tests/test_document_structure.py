@@ -0,0 +1,124 @@
+"""
+Tests unitarios de la detección de secciones y del mapeo offset -> página.
+Ejecutar con: pytest tests/test_document_structure.py -v
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend.document_structure import (
+    docx_heading_level,
+    docx_text_and_sections,
+    join_pages,
+    markdown_sections,
+    page_at,
+    split_sections,
+)
+
+MARKDOWN = (
+    "Intro text\n"
+    "# Manual\n"
+    "## Precios\n"
+    "Tarifa base.\n"
+    "### Descuentos\n"
+    "10% anual.\n"
+    "```\n"
+    "# no es un título\n"
+    "```\n"
+    "## Envíos\n"
+    "Gratis desde 50 EUR.\n"
+)
+
+
+def paragraph(text, style=None):
+    return SimpleNamespace(text=text, style=SimpleNamespace(name=style) if style else None)
+
+
+class TestMarkdownSections:
+    """Secciones a partir de títulos ATX"""
+
+    def test_heading_paths(self):
+        starts, paths = markdown_sections(MARKDOWN)
+        assert paths == ["Manual > Precios", "Manual > Precios > Descuentos", "Manual > Envíos"]
+        # Un título seguido directamente de un subtítulo se agrupa con él
+        assert MARKDOWN[starts[0]:].startswith("# Manual")
+        assert MARKDOWN[starts[1]:].startswith("### Descuentos")
+        assert MARKDOWN[starts[2]:].startswith("## Envíos")
+
+    def test_fenced_code_is_not_a_heading(self):
+        _, paths = markdown_sections(MARKDOWN)
+        assert not any("no es un título" in path for path in paths)
+
+    def test_no_headings(self):
+        assert markdown_sections("solo texto\nsin títulos\n") == ([], [])
+
+    def test_closing_hashes_are_stripped(self):
+        _, paths = markdown_sections("## Precios ##\ntexto\n")
+        assert paths == ["Precios"]
+
+
+class TestSplitSections:
+    """Corte del documento por secciones"""
+
+    def test_offsets_and_text_cover_document(self):
+        starts, paths = markdown_sections(MARKDOWN)
+        sections = split_sections(MARKDOWN, starts, paths)
+        assert [path for _, _, path in sections] == [""] + paths
+        assert "".join(text for _, text, _ in sections) == MARKDOWN
+        for offset, text, _ in sections:
+            assert MARKDOWN[offset:offset + len(text)] == text
+
+    def test_without_sections(self):
+        assert split_sections("abc", [], []) == [(0, "abc", "")]
+
+    def test_blank_sections_are_skipped(self):
+        content = "# A\n   \n# B\ntexto\n"
+        assert split_sections(content, [0, 8], ["A", "B"]) == [(0, "# A\n   \n", "A"), (8, "# B\ntexto\n", "B")]
+        assert split_sections("\n\n# B\nx", [2], ["B"]) == [(2, "# B\nx", "B")]
+
+
+class TestDocxSections:
+    """Secciones a partir de los estilos de párrafo de Word"""
+
+    @pytest.mark.parametrize("style, level", [
+        ("Title", 0), ("Heading 1", 1), ("Heading 3", 3), ("Título 2", 2), ("Normal", None), (None, None),
+    ])
+    def test_heading_level(self, style, level):
+        assert docx_heading_level(style) == level
+
+    def test_text_and_sections(self):
+        paragraphs = [
+            paragraph("Guía", "Title"),
+            paragraph("Alcance", "Heading 1"),
+            paragraph("Texto del alcance."),
+            paragraph("Detalle", "Heading 2"),
+            paragraph("Más texto.", "Normal"),
+            paragraph("", "Heading 1"),
+        ]
+        content, starts, paths = docx_text_and_sections(paragraphs)
+        assert content == "Guía\nAlcance\nTexto del alcance.\nDetalle\nMás texto.\n"
+        assert paths == ["Guía > Alcance", "Guía > Alcance > Detalle"]
+        assert starts == [0, content.index("Detalle")]
+
+
+class TestPages:
+    """Unión de páginas y mapeo de offsets a número de página"""
+
+    def test_join_pages_skips_empty_pages(self):
+        content, starts, numbers = join_pages(["uno", "", "tres", "cuatro"])
+        assert content == "uno\ntres\ncuatro"
+        assert starts == [0, 4, 9]
+        assert numbers == [1, 3, 4]
+
+    def test_page_at(self):
+        content, starts, numbers = join_pages(["uno", "", "tres", "cuatro"])
+        expected = {0: 1, 2: 1, 3: 1, 4: 3, 8: 3, 9: 4, len(content) - 1: 4}
+        for offset, page in expected.items():
+            assert page_at(offset, starts, numbers) == page
+
+    def test_page_at_before_first_page(self):
+        assert page_at(0, [5], [2]) == 2
+
+    def test_no_pages(self):
+        assert join_pages([]) == ("", [], [])
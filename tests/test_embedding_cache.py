@@ -0,0 +1,134 @@
+"""
+Tests unitarios de las cachés de embeddings (en disco, compartida entre procesos, y LRU de consultas).
+Ejecutar con: pytest tests/test_embedding_cache.py -v
+"""
+
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from backend.embedding_cache import KEY_SIZE, EmbeddingCache, QueryEmbeddingCache, fcntl
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DIM = 4
+
+
+def vector(seed):
+    return [float(seed + i) for i in range(DIM)]
+
+
+def append_texts(cache_dir, start, count):
+    """Proceso hijo: añade `count` textos distintos y algunos compartidos"""
+    cache = EmbeddingCache(cache_dir, MODEL)
+    for i in range(start, start + count):
+        cache.put_many([f"texto {i}", "compartido"], [vector(i), vector(-1)])
+
+
+class TestEmbeddingCache:
+    """Caché de embeddings de chunks en disco"""
+
+    def test_round_trip_and_reopen(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), MODEL)
+        assert cache.get_many(["hola"]) == [None]
+        cache.put_many(["hola", "adiós"], [vector(1), vector(2)])
+        assert cache.get_many(["adiós", "hola", "otro"]) == [vector(2), vector(1), None]
+
+        reopened = EmbeddingCache(str(tmp_path), MODEL)
+        assert reopened.get_many(["hola", "adiós"]) == [vector(1), vector(2)]
+        assert reopened.stats() == {"hits": 2, "misses": 0, "size": 2}
+
+    def test_whitespace_is_normalized(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), MODEL)
+        cache.put_many(["precio  base\n2024"], [vector(3)])
+        assert cache.get_many(["precio base 2024"]) == [vector(3)]
+
+    def test_models_do_not_share_entries(self, tmp_path):
+        EmbeddingCache(str(tmp_path), MODEL).put_many(["hola"], [vector(1)])
+        assert EmbeddingCache(str(tmp_path), "otro-modelo").get_many(["hola"]) == [None]
+
+    def test_duplicates_are_stored_once(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), MODEL)
+        cache.put_many(["hola", "hola"], [vector(1), vector(9)])
+        cache.put_many(["hola"], [vector(5)])
+        assert cache.rows == 1
+        assert cache.get_many(["hola"]) == [vector(1)]
+
+    def test_reopen_after_torn_tail(self, tmp_path):
+        cache = EmbeddingCache(str(tmp_path), MODEL)
+        cache.put_many(["uno", "dos"], [vector(1), vector(2)])
+        # Caída a mitad de una escritura: vector incompleto y clave a medias
+        with open(cache.vectors_path, "ab") as f:
+            f.write(np.asarray(vector(3), dtype=np.float32).tobytes()[:6])
+        with open(cache.keys_path, "ab") as f:
+            f.write(b"\x01" * (KEY_SIZE // 2))
+
+        reopened = EmbeddingCache(str(tmp_path), MODEL)
+        assert reopened.rows == 2
+        assert os.path.getsize(reopened.keys_path) == 2 * KEY_SIZE
+        assert os.path.getsize(reopened.vectors_path) == 2 * DIM * 4
+        # Las nuevas filas quedan alineadas con sus claves
+        reopened.put_many(["tres"], [vector(3)])
+        assert EmbeddingCache(str(tmp_path), MODEL).get_many(["uno", "dos", "tres"]) == [vector(1), vector(2), vector(3)]
+
+    def test_two_instances_share_the_files(self, tmp_path):
+        first = EmbeddingCache(str(tmp_path), MODEL)
+        second = EmbeddingCache(str(tmp_path), MODEL)
+        first.put_many(["a", "compartido"], [vector(1), vector(7)])
+        second.put_many(["b", "compartido"], [vector(2), vector(8)])
+        first.put_many(["c"], [vector(3)])
+
+        # Cada instancia ve lo que añadió la otra, y "compartido" se guardó una sola vez
+        assert second.get_many(["a", "b", "c", "compartido"]) == [vector(1), vector(2), vector(3), vector(7)]
+        assert first.get_many(["a", "b", "c", "compartido"]) == [vector(1), vector(2), vector(3), vector(7)]
+        assert first.rows == second.rows == 4
+
+    def test_instance_created_before_the_first_write(self, tmp_path):
+        reader = EmbeddingCache(str(tmp_path), MODEL)
+        EmbeddingCache(str(tmp_path), MODEL).put_many(["a"], [vector(1)])
+        assert reader.get_many(["a"]) == [vector(1)]
+
+    @pytest.mark.skipif(fcntl is None, reason="Sin bloqueo entre procesos en esta plataforma")
+    def test_concurrent_processes(self, tmp_path):
+        cache_dir = str(tmp_path)
+        EmbeddingCache(cache_dir, MODEL).put_many(["inicial"], [vector(0)])
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=append_texts, args=(cache_dir, start, 20)) for start in (100, 200, 300)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+            assert worker.exitcode == 0
+
+        cache = EmbeddingCache(cache_dir, MODEL)
+        texts = [f"texto {i}" for start in (100, 200, 300) for i in range(start, start + 20)]
+        assert cache.get_many(texts) == [vector(i) for start in (100, 200, 300) for i in range(start, start + 20)]
+        assert cache.get_many(["inicial", "compartido"]) == [vector(0), vector(-1)]
+
+
+class TestQueryEmbeddingCache:
+    """LRU de embeddings de consultas"""
+
+    def test_lru_eviction(self):
+        cache = QueryEmbeddingCache(max_size=2)
+        cache.put("a", [1.0], elapsed_ms=10)
+        cache.put("b", [2.0], elapsed_ms=10)
+        assert cache.get("a") == [1.0]
+        cache.put("c", [3.0], elapsed_ms=10)
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0] and cache.get("c") == [3.0]
+
+    def test_disabled(self):
+        cache = QueryEmbeddingCache(max_size=0)
+        cache.put("a", [1.0], elapsed_ms=5)
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_stats(self):
+        cache = QueryEmbeddingCache(max_size=4)
+        assert cache.get("precio  del SKU") is None
+        cache.put("precio del SKU", [1.0], elapsed_ms=20)
+        assert cache.get("precio del  SKU") == [1.0]
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"], stats["saved_ms"]) == (1, 1, 0.5, 20.0)
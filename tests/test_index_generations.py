@@ -0,0 +1,130 @@
+"""
+Tests unitarios del ciclo de vida de las generaciones del índice (crear, validar,
+promocionar y descartar) con el almacén `memory`.
+Ejecutar con: pytest tests/test_index_generations.py -v
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+rag_engine = pytest.importorskip("backend.rag_engine")
+
+from backend.config import settings
+from backend.index_generations import CollectionAlias, new_generation_name
+
+DIMENSION = 8
+
+
+class FixedDimensionModel:
+    """Solo se consulta la dimensión al abrir una generación"""
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    """DocumentProcessor sobre el almacén `memory`, sin cargar el modelo de embeddings"""
+    monkeypatch.setattr(settings, "VECTOR_STORE", "memory")
+    monkeypatch.setattr(settings, "HYBRID_SEARCH_ENABLED", True)
+    processor = rag_engine.DocumentProcessor.__new__(rag_engine.DocumentProcessor)
+    processor.persistence_path = str(tmp_path)
+    processor.model_name = "test-model"
+    processor.embedding_model = FixedDimensionModel()
+    processor.collection_name = "company_docs"
+    processor.aliases = CollectionAlias(str(tmp_path / "collection_alias.json"))
+    processor._generation_lock = threading.Lock()
+    processor._follow_lock = threading.Lock()
+    processor._alias_checked_at = 0.0
+    processor._index_version = 0
+    processor.generation = processor.open_generation(processor.aliases.resolve(processor.collection_name))
+    return processor
+
+
+def fill(generation, count, prefix="chunk"):
+    ids = [f"{prefix}-{i}" for i in range(count)]
+    embeddings = np.eye(DIMENSION, dtype=np.float32)[:count].tolist()
+    documents = [f"texto {i}" for i in range(count)]
+    generation.vector_store.upsert(ids=ids, embeddings=embeddings, documents=documents)
+    generation.lexical_index.add(ids, documents)
+
+
+def test_generation_names_are_unique_within_a_second():
+    assert len({new_generation_name("company_docs") for _ in range(100)}) == 100
+
+
+def test_create_validate_promote(processor):
+    served = processor.generation
+    fill(served, 2, prefix="old")
+
+    shadow = processor.create_generation()
+    assert shadow.name != served.name
+    fill(shadow, 4)
+    assert processor.validate_generation(shadow, expected_chunks=4) == (True, "")
+
+    processor.promote_generation(shadow, drain_timeout=0.1)
+    assert processor.generation is shadow
+    assert processor.aliases.resolve("company_docs") == shadow.name
+    assert processor.vector_store.count() == 4
+
+
+def test_validation_rejects_incomplete_generation(processor):
+    fill(processor.generation, 2, prefix="old")
+    shadow = processor.create_generation()
+
+    valid, reason = processor.validate_generation(shadow, expected_chunks=3)
+    assert not valid and "expected 3" in reason
+
+    fill(shadow, 3)
+    shadow.lexical_index.delete(["chunk-0"])
+    valid, reason = processor.validate_generation(shadow, expected_chunks=3)
+    assert not valid and "BM25" in reason
+
+
+def test_discard_keeps_served_generation(processor):
+    fill(processor.generation, 2, prefix="old")
+    shadow = processor.create_generation()
+    fill(shadow, 3)
+
+    processor.discard_generation(shadow)
+    assert processor.vector_store.count() == 2
+    assert len(processor.lexical_index) == 2
+
+
+def test_served_generation_is_never_reset_or_dropped(processor, monkeypatch):
+    fill(processor.generation, 2, prefix="old")
+
+    # Un nombre repetido no debe vaciar la generación servida
+    monkeypatch.setattr(rag_engine, "new_generation_name", lambda alias: processor.generation.name)
+    with pytest.raises(RuntimeError):
+        processor.create_generation()
+    assert processor.vector_store.count() == 2
+
+    processor.discard_generation(processor.generation)
+    assert processor.vector_store.count() == 2
+
+
+def test_writes_of_other_replicas_refresh_bm25(processor, tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from backend.index_generations import DatabaseCollectionAlias
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    processor.aliases = DatabaseCollectionAlias(engine)
+    processor._follow_alias(interval_seconds=0)
+    fill(processor.generation, 2, prefix="old")
+
+    # Otra réplica escribe en el almacén compartido: aquí solo llega el vector
+    processor.vector_store.upsert(ids=["nuevo"], embeddings=[[0.5] * DIMENSION], documents=["tarifa SKU-1234"])
+    DatabaseCollectionAlias(engine).bump("company_docs")
+    assert len(processor.lexical_index) == 2
+
+    processor._follow_alias(interval_seconds=0)
+    assert len(processor.lexical_index) == 3
+    assert processor.lexical_index.search("SKU-1234")[0][0] == "nuevo"
+
+    # Las escrituras propias no provocan una reconstrucción
+    monkeypatch.setattr(processor, "rebuild_lexical_index", lambda *args, **kwargs: pytest.fail("rebuilt"))
+    processor.persist_indexes()
+    processor._follow_alias(interval_seconds=0)
@@ -0,0 +1,122 @@
+"""
+Tests unitarios del índice léxico BM25 y de la fusión RRF.
+Ejecutar con: pytest tests/test_lexical_index.py -v
+"""
+
+import pytest
+
+from backend.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCUMENTS = {
+    "sku": "Tarifa del producto SKU-1234: 25 EUR por unidad.",
+    "sku-otro": "El producto SKU-9999 se vende por cajas.",
+    "contrato": "Renovación del contrato CT-2024/015 con el cliente.",
+    "envios": "Los envíos son gratuitos a partir de 50 EUR.",
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25_index.pkl"))
+    index.add(list(DOCUMENTS), list(DOCUMENTS.values()))
+    return index
+
+
+def ids(results):
+    return [doc_id for doc_id, _ in results]
+
+
+class TestTokenize:
+    """Tokenización en español con códigos"""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("SKU-1234", ["sku-1234", "sku", "1234"]),
+        ("CT-2024/015", ["ct-2024/015", "ct", "2024", "015"]),
+        ("v2_final", ["v2_final", "v2", "final"]),
+        ("1234", ["1234"]),
+    ])
+    def test_codes_are_kept_whole_and_by_parts(self, text, expected):
+        assert tokenize(text) == expected
+
+    def test_accents_case_and_stemming(self):
+        assert tokenize("Canción") == tokenize("cancion")
+        assert tokenize("ENVÍOS") == tokenize("envíos") == tokenize("envios")
+        assert tokenize("tarifas") == tokenize("tarifa")
+
+    def test_stopwords_and_single_letters_are_dropped(self):
+        assert tokenize("de la y los a para") == []
+        assert tokenize("el precio de la tarifa") == tokenize("precio tarifa")
+
+
+class TestBM25Index:
+    """Índice BM25 sincronizado por ID de chunk"""
+
+    def test_exact_code_ranks_first(self, index):
+        assert ids(index.search("SKU-1234"))[0] == "sku"
+        assert ids(index.search("contrato CT-2024/015"))[0] == "contrato"
+        # Un número de contrato parcial también encuentra el documento
+        assert ids(index.search("2024/015")) == ["contrato"]
+
+    def test_accent_insensitive_search(self, index):
+        assert ids(index.search("envios gratuitos"))[0] == "envios"
+
+    def test_no_match(self, index):
+        assert index.search("garantía") == []
+        assert index.search("de la") == []
+        assert BM25Index(None).search("SKU-1234") == []
+
+    def test_top_k(self, index):
+        assert len(index.search("producto", top_k=1)) == 1
+
+    def test_delete_and_readd(self, index):
+        total_length = index.total_length
+        index.delete(["sku", "desconocido"])
+        assert len(index) == 3
+        assert "sku" not in ids(index.search("SKU-1234"))
+        assert "1234" not in index.postings
+
+        index.add(["sku"], [DOCUMENTS["sku"]])
+        assert len(index) == 4
+        assert index.total_length == total_length
+        assert ids(index.search("SKU-1234"))[0] == "sku"
+
+    def test_readd_replaces_previous_text(self, index):
+        index.add(["sku"], ["Producto descatalogado"])
+        assert len(index) == 4
+        assert "sku" not in ids(index.search("1234"))
+        assert ids(index.search("descatalogado")) == ["sku"]
+        assert index.total_length == sum(index.doc_lengths.values())
+
+    def test_save_and_load(self, index):
+        index.save()
+        loaded = BM25Index(index.index_path)
+        assert len(loaded) == len(index)
+        assert loaded.total_length == index.total_length
+        assert loaded.search("CT-2024/015") == index.search("CT-2024/015")
+
+    def test_corrupt_file_loads_empty(self, tmp_path):
+        path = tmp_path / "bm25_index.pkl"
+        path.write_bytes(b"no es un pickle")
+        assert len(BM25Index(str(path))) == 0
+
+    def test_clear(self, index):
+        index.clear()
+        assert len(index) == 0 and index.total_length == 0
+        assert index.search("SKU-1234") == []
+
+
+class TestReciprocalRankFusion:
+    """Fusión de rankings densos y léxicos"""
+
+    def test_documents_in_both_rankings_come_first(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a", "d"]])
+        assert ids(fused) == ["a", "c", "b", "d"]
+
+    def test_scores(self):
+        fused = dict(reciprocal_rank_fusion([["a", "b"], ["b"]], k=60))
+        assert fused["a"] == pytest.approx(1 / 61)
+        assert fused["b"] == pytest.approx(1 / 62 + 1 / 61)
+
+    def test_empty(self):
+        assert reciprocal_rank_fusion([]) == []
+        assert reciprocal_rank_fusion([[], []]) == []
@@ -0,0 +1,153 @@
+"""
+Tests unitarios de la traducción de filtros a SQL y de los parámetros de búsqueda del almacén pgvector.
+No necesitan PostgreSQL: comprueban el SQL generado y sus parámetros.
+Ejecutar con: pytest tests/test_pgvector_filters.py -v
+"""
+
+import json
+
+import pytest
+
+from backend.pgvector_store import PgVectorStore, _Params, vector_literal, where_document_to_sql, where_to_sql
+
+
+def translate(where):
+    params = _Params()
+    return where_to_sql(where, params), params.values
+
+
+class TestWhereToSql:
+    """Filtros de metadatos sobre la columna JSONB"""
+
+    def test_empty_filter(self):
+        assert translate(None) == ("TRUE", {})
+        assert translate({}) == ("TRUE", {})
+
+    def test_equality_uses_containment(self):
+        """$eq (y el valor directo) se traduce a @> para usar el índice GIN"""
+        sql, values = translate({"department": "ventas"})
+        assert sql == "metadata @> CAST(:p0 AS jsonb)"
+        assert json.loads(values["p0"]) == {"department": "ventas"}
+        assert translate({"department": {"$eq": "ventas"}}) == (sql, values)
+
+    def test_ne_matches_missing_keys(self):
+        sql, values = translate({"department": {"$ne": "ventas"}})
+        assert "IS DISTINCT FROM" in sql
+        assert values["p0"] == "department"
+        assert json.loads(values["p1"]) == "ventas"
+
+    def test_in_and_nin(self):
+        sql, values = translate({"type": {"$in": [".pdf", ".md"]}})
+        assert sql.count(" = CAST(") == 2 and " OR " in sql
+        assert [json.loads(values[name]) for name in ("p1", "p2")] == [".pdf", ".md"]
+        sql, _ = translate({"type": {"$nin": [".pdf"]}})
+        assert sql.startswith("NOT COALESCE(")
+
+    def test_empty_in_matches_nothing(self):
+        assert translate({"type": {"$in": []}})[0] == "(FALSE)"
+        assert translate({"type": {"$nin": []}})[0] == "NOT COALESCE((FALSE), FALSE)"
+
+    @pytest.mark.parametrize("op, sql_op", [("$gt", ">"), ("$gte", ">="), ("$lt", "<"), ("$lte", "<=")])
+    def test_ranges_require_same_json_type(self, op, sql_op):
+        sql, values = translate({"size": {op: 1000}})
+        assert "jsonb_typeof" in sql
+        assert f" {sql_op} CAST(" in sql
+        assert json.loads(values["p1"]) == 1000
+
+    def test_values_are_bound_not_inlined(self):
+        """Claves y valores van como parámetros (sin inyección SQL)"""
+        sql, values = translate({"x'; DROP TABLE users; --": {"$ne": "'; --"}})
+        assert "DROP TABLE" not in sql
+        assert "x'; DROP TABLE users; --" in values.values()
+
+    def test_and_or_nesting(self):
+        sql, _ = translate({"$or": [{"department": "ventas"}, {"$and": [{"type": ".pdf"}, {"size": {"$gt": 1}}]}]})
+        assert sql.startswith("(") and " OR " in sql and " AND " in sql
+        assert translate({"$and": []})[0] == "(TRUE)"
+
+    def test_several_keys_are_anded(self):
+        sql, _ = translate({"department": "ventas", "type": ".pdf"})
+        assert sql.count("metadata @>") == 2 and " AND " in sql
+
+    def test_unknown_operator_raises(self):
+        with pytest.raises(ValueError):
+            translate({"size": {"$between": [1, 2]}})
+
+
+class TestWhereDocumentToSql:
+    """Filtros sobre el texto del chunk"""
+
+    def test_contains(self):
+        params = _Params()
+        assert where_document_to_sql({"$contains": "IVA"}, params) == "strpos(document, :p0) > 0"
+        assert params.values == {"p0": "IVA"}
+
+    def test_not_contains_and_nesting(self):
+        params = _Params()
+        sql = where_document_to_sql({"$or": [{"$not_contains": "IVA"}, {"$contains": "EUR"}]}, params)
+        assert sql == "(strpos(document, :p0) = 0 OR strpos(document, :p1) > 0)"
+
+    def test_unknown_operator_raises(self):
+        with pytest.raises(ValueError):
+            where_document_to_sql({"$regex": "a.*"}, _Params())
+
+
+def test_vector_literal():
+    assert vector_literal([1, 0.5, -0.25]) == "[1,0.5,-0.25]"
+
+
+class RecordingConnection:
+    """Conexión que guarda las sentencias ejecutadas"""
+
+    def __init__(self, extversion="0.8.0"):
+        self.statements = []
+        self.extversion = extversion
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        return self
+
+    def scalar_one_or_none(self):
+        return self.extversion
+
+
+def make_store(index_type, **options):
+    store = PgVectorStore.__new__(PgVectorStore)
+    store.index_type = index_type
+    store.hnsw_ef_search = options.get("hnsw_ef_search", 40)
+    store.ivfflat_probes = options.get("ivfflat_probes", 10)
+    store._iterative_scan = None
+    return store
+
+
+class TestSearchSettings:
+    """Parámetros de búsqueda por transacción"""
+
+    def test_ef_search_covers_requested_results(self):
+        conn = RecordingConnection()
+        make_store("hnsw")._search_settings(conn, n_results=50, filtered=False)
+        assert conn.statements == ["SET LOCAL hnsw.ef_search = 50"]
+        conn = RecordingConnection()
+        make_store("hnsw")._search_settings(conn, n_results=5, filtered=False)
+        assert conn.statements == ["SET LOCAL hnsw.ef_search = 40"]
+
+    def test_beyond_max_ef_search_scans_exactly(self):
+        conn = RecordingConnection()
+        make_store("hnsw")._search_settings(conn, n_results=5000, filtered=False)
+        assert conn.statements == ["SET LOCAL enable_indexscan = off"]
+
+    def test_probes_cover_requested_results(self):
+        conn = RecordingConnection()
+        make_store("ivfflat")._search_settings(conn, n_results=25_000, filtered=False)
+        assert conn.statements == ["SET LOCAL ivfflat.probes = 25"]
+
+    @pytest.mark.parametrize("index_type, order", [("hnsw", "strict_order"), ("ivfflat", "relaxed_order")])
+    def test_filtered_queries_use_iterative_scan(self, index_type, order):
+        conn = RecordingConnection("0.8.0")
+        make_store(index_type)._search_settings(conn, n_results=10, filtered=True)
+        assert conn.statements[-1] == f"SET LOCAL {index_type}.iterative_scan = {order}"
+
+    def test_filtered_queries_without_iterative_scan_scan_exactly(self):
+        conn = RecordingConnection("0.7.4")
+        make_store("hnsw")._search_settings(conn, n_results=10, filtered=True)
+        assert conn.statements[-1] == "SET LOCAL enable_indexscan = off"
@@ -0,0 +1,241 @@
+"""
+Tests unitarios del gestor de reindexados en segundo plano (ReindexJobManager),
+con un motor de prueba en lugar de ClaudeRAG.
+Ejecutar con: pytest tests/test_reindex_jobs.py -v
+"""
+
+import io
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.reindex_jobs import ReindexCancelled, ReindexInProgress, ReindexJob, ReindexJobManager
+
+TIMEOUT = 5.0
+
+
+class StubEngine:
+    """Registra las llamadas; cada ejecución espera a `release` revisando la cancelación"""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.fail = False
+
+    def _run(self, mode, target, job):
+        self.calls.append((mode, target))
+        self.started.set()
+        job.update(phase="indexing", files_total=2)
+        while not self.release.wait(0.01):
+            try:
+                job.check_cancelled()
+            except ReindexCancelled:
+                return {"status": "cancelled", "mode": mode}
+        if self.fail:
+            raise RuntimeError("disk full")
+        job.add_progress(files=2, chunks=10)
+        return {"status": "success", "mode": mode, "chunks_indexed": 10}
+
+    def reindex_all(self, folder_path, job=None):
+        return self._run("full", folder_path, job)
+
+    def reindex_incremental(self, folder_path, job=None):
+        return self._run("incremental", folder_path, job)
+
+    def index_file(self, file_path, job=None):
+        return self._run("file", file_path, job)
+
+
+def wait_for(predicate, timeout=TIMEOUT):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def finished(job):
+    return lambda: job.finished_at is not None
+
+
+@pytest.fixture
+def engine():
+    engine = StubEngine()
+    yield engine
+    engine.release.set()
+
+
+@pytest.fixture
+def manager(engine):
+    return ReindexJobManager(engine)
+
+
+class TestReindexJobManager:
+
+    def test_runs_in_background(self, manager, engine):
+        job = manager.start("full", "docs/")
+        assert engine.started.wait(TIMEOUT)
+        assert job.to_dict()["status"] == "running"
+        engine.release.set()
+        assert wait_for(finished(job))
+        assert job.status == "completed"
+        assert job.result["chunks_indexed"] == 10
+        assert (job.files_processed, job.chunks_indexed) == (2, 10)
+        assert engine.calls == [("full", "docs/")]
+
+    def test_second_reindex_is_rejected(self, manager, engine):
+        job = manager.start("incremental")
+        assert engine.started.wait(TIMEOUT)
+        with pytest.raises(ReindexInProgress) as error:
+            manager.start("full")
+        assert error.value.job is job
+
+        engine.release.set()
+        assert wait_for(finished(job))
+        # Terminado el primero, se puede lanzar otro
+        assert wait_for(lambda: manager._current is None)
+        second = manager.start("incremental")
+        assert wait_for(finished(second))
+
+    def test_cancel(self, manager, engine):
+        job = manager.start("full")
+        assert engine.started.wait(TIMEOUT)
+        assert manager.cancel(job.id) is job
+        assert wait_for(finished(job))
+        assert job.status == "cancelled"
+        assert job.to_dict()["cancel_requested"]
+
+    def test_failure_is_reported(self, manager, engine):
+        engine.fail = True
+        engine.release.set()
+        job = manager.start("incremental")
+        assert wait_for(finished(job))
+        assert job.status == "failed"
+        assert job.error == "disk full"
+
+    def test_file_jobs_wait_for_running_reindex(self, manager, engine):
+        reindex = manager.start("full", "docs/")
+        assert engine.started.wait(TIMEOUT)
+        first = manager.enqueue_file("docs/a.pdf")
+        second = manager.enqueue_file("docs/b.pdf")
+        time.sleep(0.1)
+        assert first.status == second.status == "queued"
+        assert engine.calls == [("full", "docs/")]
+
+        engine.release.set()
+        assert wait_for(finished(second))
+        assert [reindex.status, first.status, second.status] == ["completed"] * 3
+        assert engine.calls == [("full", "docs/"), ("file", "docs/a.pdf"), ("file", "docs/b.pdf")]
+
+    def test_running_file_job_blocks_reindex(self, manager, engine):
+        job = manager.enqueue_file("docs/a.pdf")
+        assert engine.started.wait(TIMEOUT)
+        with pytest.raises(ReindexInProgress):
+            manager.start("incremental")
+        engine.release.set()
+        assert wait_for(finished(job))
+
+    def test_cancelled_queued_file_job_is_skipped(self, manager, engine):
+        manager.start("full")
+        assert engine.started.wait(TIMEOUT)
+        queued = manager.enqueue_file("docs/a.pdf")
+        manager.cancel(queued.id)
+        engine.release.set()
+        assert wait_for(finished(queued))
+        assert queued.status == "cancelled"
+        assert ("file", "docs/a.pdf") not in engine.calls
+
+    def test_history_is_bounded(self, engine):
+        manager = ReindexJobManager(engine, history_size=2)
+        engine.release.set()
+        jobs = []
+        for _ in range(4):
+            assert wait_for(lambda: manager._current is None)
+            jobs.append(manager.start("incremental"))
+            assert wait_for(finished(jobs[-1]))
+        manager.start("incremental")
+        listed = [job.id for job in manager.list()]
+        assert len(listed) == 3
+        assert manager.get(jobs[0].id) is None
+
+    def test_pending_hash_is_released_when_the_file_job_ends(self, manager, engine):
+        assert manager.claim_hash("abc", "docs/a.pdf")
+        job = manager.enqueue_file("docs/a.pdf")
+        assert engine.started.wait(TIMEOUT)
+        # Mismo contenido con otro nombre mientras el primero sigue pendiente
+        assert not manager.claim_hash("abc", "docs/b.pdf")
+
+        engine.release.set()
+        assert wait_for(finished(job))
+        assert wait_for(lambda: manager.claim_hash("abc", "docs/b.pdf"))
+
+    def test_pending_hash_of_cancelled_job_is_released(self, manager, engine):
+        manager.start("full")
+        assert engine.started.wait(TIMEOUT)
+        manager.claim_hash("abc", "docs/a.pdf")
+        queued = manager.enqueue_file("docs/a.pdf")
+        manager.cancel(queued.id)
+        engine.release.set()
+        assert wait_for(finished(queued))
+        assert wait_for(lambda: manager.claim_hash("abc", "docs/a.pdf"))
+
+    def test_release_hash(self, manager):
+        assert manager.claim_hash("abc", "docs/a.pdf")
+        manager.release_hash("abc")
+        assert manager.claim_hash("abc", "docs/a.pdf")
+
+
+class TestUploadDocuments:
+    """Duplicados de subidas cuyo indexado sigue en cola"""
+
+    @pytest.fixture
+    def admin_service(self, tmp_path, monkeypatch):
+        admin_service = pytest.importorskip("backend.admin_service")
+        monkeypatch.setattr(admin_service, "DOCS_DIR", str(tmp_path))
+        return admin_service
+
+    def upload(self, name, content):
+        return SimpleNamespace(filename=name, file=io.BytesIO(content))
+
+    def test_same_content_queued_under_another_name_is_skipped(self, admin_service, manager, engine, tmp_path):
+        from backend.index_manifest import IndexManifest
+        manifest = IndexManifest(str(tmp_path / "manifest.json"))
+
+        first = admin_service.upload_documents([self.upload("a.txt", b"tarifa SKU-1234")], manifest, manager)
+        assert first["skipped"] == []
+        job = manager.enqueue_file(first["saved"][0])
+        assert engine.started.wait(TIMEOUT)
+
+        second = admin_service.upload_documents([self.upload("b.txt", b"tarifa SKU-1234")], manifest, manager)
+        assert second == {"saved": [], "skipped": ["b.txt"]}
+        assert sorted(os.listdir(tmp_path)) == ["a.txt"]
+
+        engine.release.set()
+        assert wait_for(finished(job))
+
+
+class TestReindexJob:
+
+    def test_eta_and_serialization(self):
+        job = ReindexJob("full")
+        assert job.eta_seconds is None
+        job.update(status="running", started_at=time.time(), phase="indexing", files_total=10)
+        job.add_progress(files=5, chunks=50)
+        assert job.eta_seconds is not None and job.eta_seconds >= 0
+        data = job.to_dict()
+        assert (data["mode"], data["files_processed"], data["chunks_indexed"]) == ("full", 5, 50)
+
+    def test_check_cancelled(self):
+        job = ReindexJob("incremental")
+        job.check_cancelled()
+        job.cancel()
+        with pytest.raises(ReindexCancelled):
+            job.check_cancelled()
+
+    def test_in_progress_without_job(self):
+        assert ReindexInProgress(None).job is None
@@ -0,0 +1,164 @@
+"""
+Tests unitarios de los filtros de metadatos y contenido: validación y almacén NumPy.
+Ejecutar con: pytest tests/test_vector_filters.py -v
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from backend.numpy_store import NumpyVectorStore, matches_where, matches_where_document
+from backend.schemas import BatchSearchRequest, QueryRequest
+from backend.vector_store import validate_where, validate_where_document
+
+METADATA = {"department": "ventas", "type": ".pdf", "size": 1200, "modified_at": 1700000000.5, "page": 3}
+
+
+class TestMatchesWhere:
+    """Semántica de los filtros `where` (igual que pgvector_store.where_to_sql)"""
+
+    @pytest.mark.parametrize("where, expected", [
+        (None, True),
+        ({}, True),
+        ({"department": "ventas"}, True),
+        ({"department": "legal"}, False),
+        ({"department": {"$eq": "ventas"}}, True),
+        ({"department": {"$ne": "ventas"}}, False),
+        ({"department": {"$in": ["legal", "ventas"]}}, True),
+        ({"department": {"$nin": ["legal", "ventas"]}}, False),
+        ({"size": {"$gt": 1000}}, True),
+        ({"size": {"$gte": 1200}}, True),
+        ({"size": {"$lt": 1200}}, False),
+        ({"size": {"$lte": 1200, "$gt": 100}}, True),
+        ({"modified_at": {"$gte": 1700000000}}, True),
+    ])
+    def test_operators(self, where, expected):
+        assert matches_where(METADATA, where) is expected
+
+    @pytest.mark.parametrize("where, expected", [
+        ({"owner": "ana"}, False),
+        ({"owner": {"$ne": "ana"}}, True),
+        ({"owner": {"$in": ["ana"]}}, False),
+        ({"owner": {"$nin": ["ana"]}}, True),
+        ({"owner": {"$gt": 0}}, False),
+    ])
+    def test_missing_key(self, where, expected):
+        """Una clave ausente solo cumple $ne / $nin"""
+        assert matches_where(METADATA, where) is expected
+
+    @pytest.mark.parametrize("where", [
+        {"department": {"$gt": 5}},
+        {"size": {"$lt": "2000"}},
+        {"page": {"$gte": True}},
+    ])
+    def test_range_on_other_type_never_matches(self, where):
+        """Las comparaciones entre tipos distintos no coinciden (ni lanzan TypeError)"""
+        assert matches_where(METADATA, where) is False
+
+    def test_and_or(self):
+        assert matches_where(METADATA, {"$and": [{"department": "ventas"}, {"size": {"$gt": 1000}}]})
+        assert not matches_where(METADATA, {"$and": [{"department": "ventas"}, {"size": {"$gt": 5000}}]})
+        assert matches_where(METADATA, {"$or": [{"department": "legal"}, {"type": ".pdf"}]})
+        assert not matches_where(METADATA, {"$or": [{"department": "legal"}, {"type": ".md"}]})
+        assert matches_where(METADATA, {
+            "$or": [{"$and": [{"department": "ventas"}, {"page": {"$lt": 2}}]}, {"type": {"$in": [".pdf"]}}]
+        })
+
+    def test_unknown_operator_raises(self):
+        with pytest.raises(ValueError):
+            matches_where(METADATA, {"size": {"$between": [1, 2]}})
+
+
+class TestMatchesWhereDocument:
+    """Filtros sobre el contenido del chunk"""
+
+    def test_contains(self):
+        text = "Descuento del 5% en pedidos superiores a 1000 EUR"
+        assert matches_where_document(text, {"$contains": "Descuento"})
+        assert not matches_where_document(text, {"$contains": "descuento gratis"})
+        assert matches_where_document(text, {"$not_contains": "IVA"})
+        assert matches_where_document(text, {"$and": [{"$contains": "5%"}, {"$not_contains": "IVA"}]})
+        assert matches_where_document(text, {"$or": [{"$contains": "IVA"}, {"$contains": "EUR"}]})
+
+    def test_unknown_operator_raises(self):
+        with pytest.raises(ValueError):
+            matches_where_document("texto", {"$regex": "t.*"})
+
+
+class TestMemoryStoreFilters:
+    """Los filtros se aplican en get/query/delete del almacén en memoria"""
+
+    @pytest.fixture
+    def store(self):
+        store = NumpyVectorStore(None)
+        store.upsert(
+            ids=["a", "b", "c"],
+            embeddings=[[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]],
+            documents=["precios ventas", "precios legal", "contrato legal"],
+            metadatas=[{"department": "ventas"}, {"department": "legal"}, {"department": "legal"}]
+        )
+        return store
+
+    def test_query_respects_where(self, store):
+        results = store.query(query_embeddings=[[1.0, 0.0]], n_results=3, where={"department": "legal"})
+        assert results["ids"][0] == ["b", "c"]
+
+    def test_query_respects_where_document(self, store):
+        results = store.query(query_embeddings=[[0.0, 1.0]], n_results=3, where_document={"$contains": "precios"})
+        assert results["ids"][0] == ["b", "a"]
+
+    def test_get_and_delete_by_where(self, store):
+        assert sorted(store.get(where={"department": "legal"}, include=[])["ids"]) == ["b", "c"]
+        store.delete(where={"department": "legal"})
+        assert store.count() == 1
+        assert store.get(include=[])["ids"] == ["a"]
+
+
+class TestFilterValidation:
+    """Validación de filtros antes de buscar (422 en la API)"""
+
+    @pytest.mark.parametrize("where", [
+        None,
+        {},
+        {"department": "ventas"},
+        {"department": {"$in": ["ventas", "legal"]}},
+        {"modified_at": {"$gte": 1700000000}},
+        {"$and": [{"department": "ventas"}, {"size": {"$lt": 5000}}]},
+        {"$or": [{"type": ".pdf"}, {"$and": [{"type": ".md"}, {"page": {"$ne": 1}}]}]},
+    ])
+    def test_valid_where(self, where):
+        validate_where(where)
+
+    @pytest.mark.parametrize("where", [
+        {"size": {"$between": [1, 2]}},
+        {"$foo": 1},
+        {"department": "ventas", "type": ".pdf"},
+        {"size": {"$gt": 1, "$lt": 5}},
+        {"department": {"$in": []}},
+        {"size": {"$gt": "1000"}},
+        {"$and": [{"department": "ventas"}]},
+        {"department": ["ventas"]},
+    ])
+    def test_invalid_where(self, where):
+        with pytest.raises(ValueError):
+            validate_where(where)
+
+    @pytest.mark.parametrize("where_document, valid", [
+        ({"$contains": "SKU-1234"}, True),
+        ({"$or": [{"$contains": "IVA"}, {"$not_contains": "borrador"}]}, True),
+        ({"$regex": "SKU.*"}, False),
+        ({"$contains": ""}, False),
+        ({"$contains": "a", "$not_contains": "b"}, False),
+    ])
+    def test_where_document(self, where_document, valid):
+        if valid:
+            validate_where_document(where_document)
+        else:
+            with pytest.raises(ValueError):
+                validate_where_document(where_document)
+
+    def test_schema_rejects_invalid_filters(self):
+        assert QueryRequest(question="precio", where={"department": "ventas"}).where == {"department": "ventas"}
+        with pytest.raises(ValidationError):
+            QueryRequest(question="precio", where={"size": {"$between": [1, 2]}})
+        with pytest.raises(ValidationError):
+            BatchSearchRequest(queries=["precio"], where_document={"$foo": "x"})